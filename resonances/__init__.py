@@ -1,4 +1,5 @@
 __version__ = '0.5.0'
+import importlib
 import logging
 
 from .config import config
@@ -19,19 +20,35 @@ from .resonance import (
     detect_resonance_type,
     create_resonance,
 )
-from resonances.matrix.three_body_matrix import ThreeBodyMatrix
-from resonances.matrix.two_body_matrix import TwoBodyMatrix
 from resonances.body import Body
 from .simulation import Simulation
 
 from .resonance.libration import libration
 
-import resonances.resonance.plot
-
 # import resonances.data.const
 from resonances.finder import find
 from resonances.finder import check
 from resonances.finder import find_asteroids_in_mmr
 from resonances.finder import find_mmrs
+from resonances.finder import find_mmrs_batch
 from resonances.finder.secular_finder import check as secular_check
 from resonances.data.util import datetime_from_string
+
+# plotting, Horizons, the results catalog, the reports, the surveys and the service need matplotlib, astroquery,
+# pandas and sqlite: they are imported at the first access (i.e. resonances.results), not by ``import resonances``
+# the matrices of MMRs (pandas) are imported when they are needed too
+LAZY_MODULES = ['horizons', 'results', 'report', 'survey', 'service']
+LAZY_ATTRIBUTES = {
+    'ThreeBodyMatrix': 'resonances.matrix.three_body_matrix',
+    'TwoBodyMatrix': 'resonances.matrix.two_body_matrix',
+}
+
+
+def __getattr__(name):
+    if name in LAZY_MODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    if name in LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(LAZY_ATTRIBUTES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
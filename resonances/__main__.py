@@ -1,2 +1,186 @@
+"""
+Command line interface:
+
+- ``python -m resonances survey CATALOG --output DIRECTORY [options]`` runs a survey with local workers
+  (or only creates the queue of its chunks with ``--queue``);
+- ``python -m resonances worker DIRECTORY`` runs the chunks from the queue (on any node with the shared filesystem);
+- ``python -m resonances status DIRECTORY`` shows the progress of the survey and merges the summaries;
+- ``python -m resonances serve [--port PORT | --socket PATH]`` runs the resident service of checks (``resonances.service``).
+
+See ``python -m resonances <command> --help`` and ``resonances.survey``.
+"""
+
+import argparse
+import json
+import sys
+
+
+def _value(text: str):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def _simulation_settings(args) -> dict:
+    settings = {
+        name: getattr(args, name)
+        for name in ['date', 'tmax', 'dt', 'Nout', 'integrator', 'save', 'plot']
+        if getattr(args, name, None) is not None
+    }
+    for item in args.set or []:
+        key, _, value = item.partition('=')
+        settings[key] = _value(value)
+    return settings
+
+
+def create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m resonances', description='Identification of resonances of asteroids.')
+    commands = parser.add_subparsers(dest='command')
+
+    survey = commands.add_parser('survey', help='check all asteroids of a catalog, resumable')
+    survey.add_argument('catalog', help='CSV file with the columns num,a,e,inc,Omega,omega,M (angles in radians)')
+    survey.add_argument('-o', '--output', required=True, help='directory of the survey (the same directory resumes it)')
+    survey.add_argument('-r', '--resonance', action='append', help='resonance to check for every asteroid (repeatable)')
+    survey.add_argument('--planets', nargs='+', help='planets for the MMRs found for every asteroid (without --resonance)')
+    survey.add_argument('--sigma2', type=float, default=0.1, help='width for the two-body MMRs found for every asteroid')
+    survey.add_argument('--sigma3', type=float, default=0.02, help='width for the three-body MMRs found for every asteroid')
+    survey.add_argument('--chunk-size', type=int, default=500, help='number of asteroids in one simulation')
+    survey.add_argument('-w', '--workers', type=int, default=1, help='number of local worker processes')
+    survey.add_argument('--schedule', choices=['fixed', 'lpt'], default='fixed', help='consecutive asteroids or chunks of the same cost')
+    survey.add_argument('--calibrate', nargs='+', metavar='DIRECTORY', help='previous surveys to calibrate the cost model')
+    survey.add_argument('--predict', action='store_true', help='only print the predicted wall time and peak memory')
+    survey.add_argument('--previous', metavar='DIRECTORY', help='previous survey: only new and changed asteroids are run')
+    survey.add_argument(
+        '--tolerance', action='append', metavar='ELEMENT=VALUE', help='maximum change of an element of an unchanged asteroid (repeatable)'
+    )
+    survey.add_argument('--date', help='date of the initial elements (YYYY-MM-DD)')
+    survey.add_argument('--tmax', type=float)
+    survey.add_argument('--dt', type=float)
+    survey.add_argument('--Nout', type=int)
+    survey.add_argument('--integrator')
+    survey.add_argument('--save', help='save mode of the simulations (nonzero, resonant, candidates, all)')
+    survey.add_argument('--plot', help='plot mode of the simulations (nonzero, resonant, candidates, all)')
+    survey.add_argument('--set', action='append', metavar='KEY=VALUE', help='any other parameter of Simulation (repeatable)')
+    survey.add_argument('--queue', action='store_true', help='only create the queue of the chunks for the worker command')
+
+    worker = commands.add_parser('worker', help='run the chunks of a survey from the queue on the shared filesystem')
+    worker.add_argument('directory', help='directory of the survey')
+    worker.add_argument('--name', help='name of the worker (default: host-pid)')
+    worker.add_argument('--lease-timeout', type=float, default=600.0, help='seconds without heartbeats after which a chunk is taken back')
+
+    status = commands.add_parser('status', help='progress of a survey')
+    status.add_argument('directory', help='directory of the survey')
+    status.add_argument('--lease-timeout', type=float, default=600.0, help='seconds without heartbeats after which a chunk is taken back')
+    status.add_argument('--reclaim', action='store_true', help='put the chunks with expired leases back into the queue')
+    status.add_argument('--merge', action='store_true', help='merge the summaries of the done chunks into summary.csv')
+
+    serve = commands.add_parser('serve', help='resident service that answers check requests as JSON over HTTP')
+    serve.add_argument('--host', default='127.0.0.1', help='address to listen on (localhost by default)')
+    serve.add_argument('--port', type=int, default=8765)
+    serve.add_argument('--socket', help='Unix socket to listen on instead of the port')
+    serve.add_argument('--window', type=float, default=0.05, help='seconds to collect concurrent requests into one simulation')
+    serve.add_argument('--max-batch', type=int, default=64, help='maximum number of requests in one simulation')
+    serve.add_argument('--no-warm', action='store_true', help='do not load the matrices and the Solar System at the start')
+    serve.add_argument('--date', help='date of the initial elements (YYYY-MM-DD), today by default')
+    serve.add_argument('--tmax', type=float)
+    serve.add_argument('--dt', type=float)
+    serve.add_argument('--Nout', type=int)
+    serve.add_argument('--integrator')
+    serve.add_argument('--set', action='append', metavar='KEY=VALUE', help='any other parameter of Simulation (repeatable)')
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        print('You have installed the resonances package. Check please the documentation!')
+        return 0
+
+    if args.command == 'survey':
+        return _survey(args)
+    if args.command == 'serve':
+        from resonances.service import serve
+
+        serve(
+            _simulation_settings(args),
+            host=args.host,
+            port=args.port,
+            socket_path=args.socket,
+            window=args.window,
+            max_batch=args.max_batch,
+            warm=not args.no_warm,
+        )
+        return 0
+    if args.command == 'worker':
+        from resonances.survey import work
+
+        done = work(args.directory, worker=args.name, lease_timeout=args.lease_timeout)
+        print(f'{len(done)} chunks are done by this worker')
+        return 0
+    return _status(args)
+
+
+def _survey(args) -> int:
+    from resonances.survey import CostModel, Manifest, WorkQueue, create_incremental, run_survey
+
+    model = CostModel.from_surveys(args.calibrate or []) if args.calibrate else CostModel.from_surveys([args.output])
+    settings = {
+        'chunk_size': args.chunk_size,
+        'schedule': args.schedule,
+        'workers': args.workers,
+        'cost_model': model,
+        'resonances': args.resonance,
+        'planets': args.planets,
+        'sigma2': args.sigma2,
+        'sigma3': args.sigma3,
+        'simulation': _simulation_settings(args),
+    }
+    if args.previous is not None:
+        tolerance = None
+        if args.tolerance is not None:
+            tolerance = {key: float(value) for key, _, value in (item.partition('=') for item in args.tolerance)}
+        manifest, diff = create_incremental(
+            args.output, args.catalog, args.previous, tolerance=tolerance, write=not args.predict, **settings
+        )
+        print(f'{len(diff.work)} new or changed asteroids, {len(diff.unchanged)} unchanged are carried forward')
+    else:
+        manifest = Manifest.create(args.output, args.catalog, write=not args.predict, **settings)
+    if args.predict:
+        prediction = manifest.predict(args.workers, model, manifest.pending())
+        print(
+            f"{len(prediction['chunks'])} chunks with {args.workers} workers: "
+            f"{prediction['seconds']:.0f}s, peak memory {prediction['memory'] / 1024**2:.0f} MB"
+        )
+        return 0
+    if args.queue:
+        queue = WorkQueue.create(args.output)
+        print(f'{len(queue.waiting())} chunks are in the queue of {args.output}')
+        return 0
+    summary = run_survey(args.output, workers=args.workers, cost_model=model)
+    print(f'{len(summary)} results are in {args.output}/summary.csv')
+    return 0
+
+
+def _status(args) -> int:
+    from resonances.survey import Manifest, WorkQueue
+
+    queue = WorkQueue(args.directory, args.lease_timeout)
+    if args.reclaim:
+        queue.reclaim()
+    status = queue.status()
+    print(
+        f"{status['done']}/{status['total']} chunks are done, {status['waiting']} waiting, {status['leased']} running ({status['expired']} expired)"
+    )
+    for lease in status['leases']:
+        print(f"  chunk {lease['chunk']}: {lease['worker']}, last heartbeat {lease['age']:.0f}s ago")
+    if args.merge:
+        summary = Manifest.load(args.directory).merge()
+        print(f'{len(summary)} results are in {args.directory}/summary.csv')
+    return 0
+
+
 if __name__ == '__main__':
-    print('You have installed the resonances package. Check please the documentation!')
+    sys.exit(main())
@@ -4,6 +4,8 @@ from resonances.resonance import Resonance, MMR, SecularResonance
 from .logger import logger
 from typing import List, Union
 
+SERIES = ['axis', 'ecc', 'inc', 'Omega', 'omega', 'M', 'longitude', 'varpi', 'axis_filtered']
+
 
 class Body:
     def __init__(self, type='particle'):
@@ -188,6 +190,56 @@ class Body:
             return True
         return False
 
+    def summary(self, series: bool = False) -> dict:
+        """
+        Classification of the body: the status, the metrics and the monotony for every resonance. With ``series``,
+        the summary has the arrays of the body and the angles as well (the same objects, not copies).
+        """
+        result = {'name': self.name, 'elements': dict(self.initial_data or {}), 'resonances': {}}
+        for resonance in self.mmrs + self.secular_resonances:
+            entry = {'type': resonance.type, **self.resonance_entry(resonance)}
+            if series:
+                entry.update(self.resonance_series(resonance))
+            result['resonances'][resonance.to_s()] = entry
+        if series:
+            result['series'] = self.elements_series()
+        return result
+
+    def resonance_entry(self, resonance: Resonance) -> dict:
+        """
+        Classification of the body in the resonance. The same values are in the summaries, in the result cache and
+        in the responses of the service.
+        """
+        key = resonance.to_s()
+        return {
+            'status': self.statuses.get(key, 0),
+            'pure': self.libration_pure.get(key, False),
+            'metrics': self.libration_metrics.get(key, {}),
+            'monotony': self.monotony.get(key, 0),
+            'overlapping': self.periodogram_peaks_overlapping.get(key, []),
+        }
+
+    def resonance_series(self, resonance: Resonance) -> dict:
+        """The resonant angle and the filtered one (None if there are none)."""
+        key = resonance.to_s()
+        angles = self.angles if isinstance(resonance, MMR) else self.secular_angles
+        return {'angle': angles.get(key), 'angle_filtered': self.angles_filtered.get(key)}
+
+    def elements_series(self) -> dict:
+        """The series of the elements of the body (see ``SERIES``)."""
+        return {name: getattr(self, name) for name in SERIES}
+
+    def release_series(self):
+        """Drop the time series (the elements, the angles, their filters and periodograms), keep the classification."""
+        for name in SERIES + ['axis_periodogram_frequency', 'axis_periodogram_power']:
+            setattr(self, name, None)
+        self.eccentricity_periodogram_frequency = self.eccentricity_periodogram_power = None
+        # new objects, not clear(): a copy of the body may still be saved by the background writer
+        self.angles, self.secular_angles = {}, {}
+        self.angles_filtered, self.secular_angles_filtered = {}, {}
+        self.periodogram_frequency, self.periodogram_power = {}, {}
+        self.librations = {}
+
     def is_particle(self):
         if 'particle' == self.type:
             return True
@@ -41,3 +41,5 @@ K = 0.0172020989484
 DAYS_IN_YEAR = 365.2422
 
 SOLAR_SYSTEM = ["Mercury", "Venus", "Earth", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune"]
+# the order of the particles in the REBOUND simulation (the index of a planet is its position in the list)
+SIMULATION_PLANETS = ["Sun"] + SOLAR_SYSTEM + ["Pluto"]
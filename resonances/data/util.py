@@ -1,6 +1,9 @@
 from typing import Union, List
 from resonances.data import const
 import datetime
+import math
+
+import numpy as np
 
 
 def convert_input_to_list(asteroids: Union[int, str, List[Union[int, str]]]) -> List[str]:
@@ -19,6 +22,23 @@ def mean_motion_from_axis(a):
     return const.K / a ** (3.0 / 2)
 
 
+_pow = np.frompyfunc(math.pow, 2, 1)
+
+
+def power(x, exponent):
+    """Elementwise ``x ** exponent`` through libm ``pow``.
+
+    NumPy evaluates array powers with SIMD routines that may differ from the scalar ``**`` in the last bit.
+    Vectorised versions of scalar formulas use this helper to give exactly the same values.
+    """
+    return _pow(x, exponent).astype(np.float64)
+
+
+def mod2pi(x):
+    """The angle in ``[0, 2 pi)``. Gives the same values as ``rebound.mod2pi`` but accepts arrays as well."""
+    return np.fmod(2 * np.pi + np.fmod(x, 2 * np.pi), 2 * np.pi)
+
+
 def datetime_from_string(date: Union[str, datetime.datetime]) -> datetime.datetime:
     """
     Convert string to datetime object.
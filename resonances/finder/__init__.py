@@ -1,8 +1,8 @@
 # Universal finder interface
-from .finder import check, find, find_asteroids_in_mmr, find_mmrs
+from .finder import check, find, find_asteroids_in_mmr, find_mmrs, find_mmrs_batch
 
 # Direct access to specific finders
 from . import mmr_finder
 from . import secular_finder
 
-__all__ = ['check', 'find', 'find_asteroids_in_mmr', 'find_mmrs', 'mmr_finder', 'secular_finder']
+__all__ = ['check', 'find', 'find_asteroids_in_mmr', 'find_mmrs', 'find_mmrs_batch', 'mmr_finder', 'secular_finder']
@@ -2,6 +2,7 @@ import resonances
 from typing import Union, List
 
 from resonances.data.util import convert_input_to_list
+from resonances.simulation.shared import share_integration
 from . import mmr_finder, secular_finder
 
 
@@ -52,7 +53,11 @@ def check(
 
     This function automatically detects resonance types and routes to the
     appropriate finder (mmr_finder or secular_finder). If resonances are
-    mixed types, it creates separate simulations for each type.
+    mixed types, it creates separate simulations for each type. They share
+    one integration (up to the longest tmax with the outputs of both) when
+    their dates and integrators are the same: the asteroids are integrated
+    once, and every simulation identifies the librations on its own outputs
+    with its own parameters.
 
     Parameters:
     -----------
@@ -71,7 +76,8 @@ def check(
     --------
     Union[resonances.Simulation, List[resonances.Simulation]]
         Single simulation if all resonances are same type,
-        List of simulations if mixed types
+        List of simulations if mixed types (running any of them runs the
+        shared integration)
     """
 
     # Convert single resonance to list for uniform processing
@@ -90,14 +96,22 @@ def check(
     # Create secular simulation if we have secular resonances
     if secular_resonances:
         res_to_use = secular_resonances[0] if len(secular_resonances) == 1 else secular_resonances
+        # the elements of the asteroids are already in the MMR simulation
         secular_sim = secular_finder.check(
-            asteroids=asteroids,
+            asteroids=[] if mmr_resonances else asteroids,
             resonance=res_to_use,
             name=name or "secular_check",
             **kwargs,
         )
+        if mmr_resonances:
+            for body in mmr_sim.bodies:
+                if body.name not in [other.name for other in secular_sim.bodies]:
+                    secular_sim.add_body(body.initial_data, res_to_use, name=body.name)
         simulations.append(secular_sim)
 
+    if share_integration(simulations):
+        resonances.logger.info('The MMR and secular simulations share one integration')
+
     # Return single simulation if only one type, otherwise return list
     return simulations[0] if len(simulations) == 1 else simulations
 
@@ -108,6 +122,7 @@ def find(
     name: str = None,
     sigma2: float = 0.1,
     sigma3: float = 0.02,
+    width_factor: float = None,
     formulas: Union[str, List[str]] = None,
     order: int = None,
     integration_years: int = 1000000,
@@ -133,6 +148,8 @@ def find(
         Width parameter for two-body MMR search
     sigma3 : float, default=0.02
         Width parameter for three-body MMR search
+    width_factor : float, optional
+        If provided, MMRs are selected by their estimated libration widths (see ``find_mmrs``)
     formulas : Union[str, List[str]], optional
         Secular resonance formulas to find (implies secular search)
     order : int, optional
@@ -165,7 +182,9 @@ def find(
 
     # Search for MMRs if requested
     if search_mmr:
-        mmr_sim = mmr_finder.find(asteroids=asteroids, planets=planets, name=name or "mmr_find", sigma2=sigma2, sigma3=sigma3, **kwargs)
+        mmr_sim = mmr_finder.find(
+            asteroids=asteroids, planets=planets, name=name or "mmr_find", sigma2=sigma2, sigma3=sigma3, width_factor=width_factor, **kwargs
+        )
         simulations.append(mmr_sim)
 
     # Search for secular resonances if requested
@@ -208,7 +227,9 @@ def find_asteroids_in_mmr(
     return mmr_finder.find_asteroids_in_mmr(mmr=mmr, sigma=sigma, per_iteration=per_iteration, name=name)
 
 
-def find_mmrs(a: float, planets=None, sigma2=0.1, sigma3=0.02, sigma=None) -> List[resonances.MMR]:
+def find_mmrs(
+    a: float, planets=None, sigma2=0.1, sigma3=0.02, sigma=None, e: float = None, inc: float = 0.0, width_factor: float = None
+) -> List[resonances.MMR]:
     """
     Find MMRs for a given semi-major axis.
 
@@ -226,10 +247,43 @@ def find_mmrs(a: float, planets=None, sigma2=0.1, sigma3=0.02, sigma=None) -> Li
         Width parameter for three-body resonance search
     sigma : float, optional
         If provided, overrides both sigma2 and sigma3
+    e : float, optional
+        Eccentricity of the body (required with width_factor)
+    inc : float, default=0.0
+        Inclination of the body (radians)
+    width_factor : float, optional
+        If provided, selects resonances whose estimated libration width (times the factor) contains the body
 
     Returns:
     -------
     List[resonances.MMR]
         List of found mean motion resonances
     """
-    return mmr_finder.find_mmrs(a=a, planets=planets, sigma2=sigma2, sigma3=sigma3, sigma=sigma)
+    return mmr_finder.find_mmrs(a=a, planets=planets, sigma2=sigma2, sigma3=sigma3, sigma=sigma, e=e, inc=inc, width_factor=width_factor)
+
+
+def find_mmrs_batch(a, planets=None, sigma2=0.1, sigma3=0.02, sigma=None):
+    """
+    Find MMRs for many values of the semi-major axis at once (i.e. for a whole catalog).
+
+    This function is specific to MMRs and directly uses mmr_finder.
+
+    Parameters:
+    ----------
+    a : array-like or pd.Series
+        Semi-major axes. The index of a Series is used to identify the values in the result
+    planets : List[Planet], optional
+        List of planets to consider for resonance search
+    sigma2 : float, default=0.1
+        Width parameter for two-body resonance search
+    sigma3 : float, default=0.02
+        Width parameter for three-body resonance search
+    sigma : float, optional
+        If provided, overrides both sigma2 and sigma3
+
+    Returns:
+    -------
+    pd.DataFrame
+        Candidate table with columns index, mmr, a (resonant axis), distance
+    """
+    return mmr_finder.find_mmrs_batch(a=a, planets=planets, sigma2=sigma2, sigma3=sigma3, sigma=sigma)
@@ -1,10 +1,8 @@
 import resonances
-import astdys
 from typing import Union, List
 from datetime import datetime
 
 from resonances.data.util import convert_input_to_list
-import resonances.horizons
 
 
 def find(
@@ -13,6 +11,7 @@ def find(
     name: str = None,
     sigma2: float = 0.1,
     sigma3: float = 0.02,
+    width_factor: float = None,
 ) -> resonances.Simulation:
     now = datetime.now()
     sim = resonances.Simulation(name=name)
@@ -22,7 +21,7 @@ def find(
 
     for asteroid in asteroids:
         elem = resonances.horizons.get_body_keplerian_elements(asteroid, date=now)
-        mmrs = find_mmrs(elem['a'], planets=planets, sigma2=sigma2, sigma3=sigma3)
+        mmrs = find_mmrs(elem['a'], planets=planets, sigma2=sigma2, sigma3=sigma3, e=elem['e'], inc=elem['inc'], width_factor=width_factor)
         if len(mmrs) > 0:
             sim.add_body(elem, mmrs, f"{asteroid}")
             resonances.logger.info(
@@ -83,6 +82,8 @@ def find_asteroids_in_mmr(
     per_iteration: int = 500,
     name: str = None,
 ):  # pragma: no cover
+    import astdys
+
     if isinstance(mmr, str):
         mmr = resonances.create_mmr(mmr)
 
@@ -105,11 +106,15 @@ def find_asteroids_in_mmr(
     return data
 
 
-def find_mmrs(a: float, planets=None, sigma2=0.1, sigma3=0.02, sigma=None) -> List[resonances.MMR]:
+def find_mmrs(
+    a: float, planets=None, sigma2=0.1, sigma3=0.02, sigma=None, e: float = None, inc: float = 0.0, width_factor: float = None
+) -> List[resonances.MMR]:
     """Find Two and Three-Body Mean Motion Resonances (MMR) for a given semi-major axis.
     This function identifies both two-body and three-body mean motion resonances
     near the specified semi-major axis value. If a single sigma value is provided,
-    it overrides both sigma2 and sigma3 parameters.
+    it overrides both sigma2 and sigma3 parameters. If ``width_factor`` is provided,
+    the resonances are selected by their estimated libration widths for the given
+    eccentricity and inclination instead of the fixed sigmas.
     Parameters
     ----------
     a : float
@@ -122,6 +127,13 @@ def find_mmrs(a: float, planets=None, sigma2=0.1, sigma3=0.02, sigma=None) -> Li
         Width parameter for three-body resonance search. Ignored if sigma is provided
     sigma : float, optional
         If provided, overrides both sigma2 and sigma3 with this single width parameter
+    e : float, optional
+        Eccentricity of the body. Required if width_factor is provided
+    inc : float, default=0.0
+        Inclination of the body (radians)
+    width_factor : float, optional
+        If provided, keeps only the resonances with ``|a - a_res|`` within ``width_factor`` times
+        the estimated half-width of the resonance (see ``resonances.matrix.width``)
     Returns
     -------
     List[resonances.MMR]
@@ -132,6 +144,12 @@ def find_mmrs(a: float, planets=None, sigma2=0.1, sigma3=0.02, sigma=None) -> Li
     combining their results into a single list.
     """
 
+    if width_factor is not None:
+        if e is None:
+            raise Exception('The eccentricity is required to select resonances by their widths.')
+        mmrs = resonances.ThreeBodyMatrix.find_resonances_in_width(a, e, inc, width_factor, planets=planets)
+        return mmrs + resonances.TwoBodyMatrix.find_resonances_in_width(a, e, inc, width_factor, planets=planets)
+
     if sigma is not None:
         sigma2 = sigma
         sigma3 = sigma
@@ -140,3 +158,39 @@ def find_mmrs(a: float, planets=None, sigma2=0.1, sigma3=0.02, sigma=None) -> Li
     mmrs2 = resonances.TwoBodyMatrix.find_resonances(a, planets=planets, sigma=sigma2)
     mmrs = mmrs + mmrs2
     return mmrs
+
+
+def find_mmrs_batch(a, planets=None, sigma2=0.1, sigma3=0.02, sigma=None):
+    """Find Two and Three-Body MMRs for many values of the semi-major axis at once.
+
+    This is the vectorised version of ``find_mmrs`` for screening whole catalogs: instead of a Python loop,
+    the values are joined with the axis-sorted matrices (see ``Matrix.find_resonances_batch``).
+
+    Parameters
+    ----------
+    a : array-like or pd.Series
+        Semi-major axes. If it is a Series (i.e. ``catalog['a']``), its index labels are used in the result
+    planets : List[str], optional
+        List of planets to consider for resonance search. If None, uses default planets
+    sigma2 : float, default=0.1
+        Width parameter for two-body resonance search. Ignored if sigma is provided
+    sigma3 : float, default=0.02
+        Width parameter for three-body resonance search. Ignored if sigma is provided
+    sigma : float, optional
+        If provided, overrides both sigma2 and sigma3 with this single width parameter
+
+    Returns
+    -------
+    pd.DataFrame
+        Long-format candidate table with columns ``index`` (position or label of the input value), ``mmr``
+        (short notation of the resonance), ``a`` (resonant semi-major axis) and ``distance``. The candidates of every
+        value are in the same order as ``find_mmrs`` returns them (three-body first).
+    """
+    from resonances.matrix.matrix import join_candidates
+
+    if sigma is not None:
+        sigma2 = sigma
+        sigma3 = sigma
+
+    indexes = [resonances.ThreeBodyMatrix.index(), resonances.TwoBodyMatrix.index()]
+    return join_candidates(a, indexes, [sigma3, sigma2], planets if isinstance(planets, list) else None)
@@ -3,7 +3,6 @@ import numpy as np
 from typing import Union, List
 
 from resonances.data.util import convert_input_to_list
-from resonances.matrix.secular_matrix import SecularMatrix
 
 
 def check(
@@ -74,6 +73,7 @@ def find(
     order: int = None,
     name: str = None,
     integration_years: int = 1000000,
+    tolerance: float = None,
     **kwargs,
 ) -> resonances.Simulation:
     """
@@ -97,6 +97,9 @@ def find(
         Name for the simulation
     integration_years : int, default=1000000
         Integration time in years (minimum 1 Myr recommended for secular resonances)
+    tolerance : float, optional
+        If provided, every asteroid is integrated only against the resonances whose combination of
+        the estimated frequencies is within this tolerance (arcsec/yr), see ``SecularMatrix.find_resonances``
     **kwargs
         Additional parameters passed to Simulation constructor (integrator, dt, etc.)
 
@@ -105,6 +108,7 @@ def find(
     resonances.Simulation
         Configured simulation ready to run with all found secular resonances
     """
+    from resonances.matrix.secular_matrix import SecularMatrix
 
     secular_resonances = SecularMatrix.build(formulas=formulas, order=order)
 
@@ -130,15 +134,73 @@ def find(
     asteroids = convert_input_to_list(asteroids)
 
     for asteroid in asteroids:
-        sim.add_body(asteroid, secular_resonances, name=f"{asteroid}")
+        body_resonances = secular_resonances
+        elem = asteroid
+        if tolerance is not None:
+            elem = sim.body_manager.get_body_elements(asteroid)
+            body_resonances = SecularMatrix.find_resonances(elem['a'], elem['e'], elem['inc'], tolerance, formulas=formulas, order=order)
+            if len(body_resonances) == 0:
+                resonances.logger.warning('No secular resonances near the asteroid {}'.format(asteroid))
+                continue
+
+        sim.add_body(elem, body_resonances, name=f"{asteroid}")
         resonances.logger.info(
             'Adding asteroid {} for {} secular resonances: {}'.format(
                 asteroid,
-                len(secular_resonances),
-                ', '.join([res.to_s() for res in secular_resonances[:5]]) + ('...' if len(secular_resonances) > 5 else ''),
+                len(body_resonances),
+                ', '.join([res.to_s() for res in body_resonances[:5]]) + ('...' if len(body_resonances) > 5 else ''),
             )
         )
 
     sim.config.Nout = kwargs.get('Nout', sim.config.Nout)
 
     return sim
+
+
+def escalate(screening: resonances.Simulation, statuses=(1, 2), name: str = None, **kwargs) -> resonances.Simulation:
+    """
+    Full N-body simulation for the positive results of a screening with the secular engine.
+
+    A screening is a simulation created by ``check`` or ``find`` with ``engine='secular'`` (see
+    ``resonances.simulation.secular_engine``) and run. Only the resonances with the given statuses are
+    integrated again, and the bodies without them are skipped.
+
+    Parameters:
+    -----------
+    screening : resonances.Simulation
+        The simulation with the identified librations
+    statuses : tuple, default=(1, 2)
+        Statuses of the resonances to confirm
+    name : str, optional
+        Name for the simulation
+    **kwargs
+        Parameters passed to Simulation constructor (integrator, dt, etc.). By default, the date, the integration
+        time and the parameters of the libration of the screening are used.
+
+    Returns:
+    --------
+    resonances.Simulation
+        Configured simulation ready to run
+    """
+    config = screening.config
+    params = {
+        'date': config.date,
+        'source': config.source,
+        'tmax': config.tmax,
+        'libration_period_min': config.libration_period_min,
+        'libration_period_critical': config.libration_period_critical,
+        'periodogram_frequency_min': config.periodogram_frequency_min,
+        'periodogram_frequency_max': config.periodogram_frequency_max,
+    }
+    params.update(kwargs)
+    params['engine'] = 'nbody'
+
+    sim = resonances.Simulation(name=name or f"{config.name}_nbody", **params)
+    sim.create_solar_system()
+    for body in screening.bodies:
+        positives = [res for res in body.secular_resonances if body.statuses.get(res.to_s(), 0) in statuses]
+        if len(positives) > 0:
+            sim.add_body(body.initial_data, positives, name=body.name)
+    sim.config.Nout = kwargs.get('Nout', config.Nout)
+
+    return sim
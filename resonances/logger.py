@@ -3,16 +3,13 @@ from pathlib import Path
 import resonances.config
 
 
-def static_init(cls):
-    if getattr(cls, "static_init", None):
-        cls.static_init()
-    return cls
-
-
-@static_init
 class logger:  # pragma: no cover
+    # logging is configured by the first message, so the import does not create the directory of the log file
+    configured = False
+
     @classmethod
-    def static_init(cls):
+    def configure(cls):
+        cls.configured = True
         log_file_path = resonances.config.get('LOG_FILE')
         log_dir = Path(log_file_path).parent.resolve()
         Path(log_dir).mkdir(parents=True, exist_ok=True)
@@ -39,16 +36,24 @@ class logger:  # pragma: no cover
 
     @classmethod
     def info(cls, message):
+        if not cls.configured:
+            cls.configure()
         logging.info(message)
 
     @classmethod
     def debug(cls, message):
+        if not cls.configured:
+            cls.configure()
         logging.debug(message)
 
     @classmethod
     def warning(cls, message):
+        if not cls.configured:
+            cls.configure()
         logging.warning(message)
 
     @classmethod
     def error(cls, message):
+        if not cls.configured:
+            cls.configure()
         logging.error(message)
@@ -1,13 +1,269 @@
 import resonances
+from resonances.matrix import width
+from resonances.resonance.factory import create_mmr
+from resonances.resonance.registry import registry
+import numpy as np
 import pandas as pd
 from pathlib import Path
+import functools
+import hashlib
+import json
 import os
+import shutil
+import uuid
+
+# Bump when the way matrices are built changes, so that the cached variants are rebuilt.
+MATRIX_FORMAT_VERSION = 2
+
+
+class MatrixIndex:
+    """
+    Resonances of a matrix sorted by the resonant semi-major axis.
+
+    A query is a binary search (``searchsorted``) for the range ``[a - sigma, a + sigma]`` instead of a scan
+    of the whole matrix. Rows are also grouped by their planets (one planet for two-body resonances,
+    a pair of planets for three-body ones), so that a query with a list of planets only searches the matching groups.
+    MMR objects are taken from the shared registry on the first hit of a row and reused after that.
+    """
+
+    def __init__(self, df: pd.DataFrame, planet_columns):
+        self.names = df['mmr'].to_numpy(dtype=object)
+        self.mmrs = [None] * len(df)
+        axis = df['a'].to_numpy(dtype=float)
+        self.axis_by_row = axis
+        self.axis, self.rows = self._sorted(axis, np.arange(len(df)))
+
+        groups = {}
+        for row, key in enumerate(zip(*[df[column].to_numpy(dtype=object) for column in planet_columns])):
+            groups.setdefault(key, []).append(row)
+        self.groups = {key: self._sorted(axis[rows], np.array(rows)) for key, rows in groups.items()}
+
+    @staticmethod
+    def _sorted(axis, rows):
+        order = np.argsort(axis, kind='stable')
+        return axis[order], rows[order]
+
+    @staticmethod
+    def _range(axis, rows, a, sigma):
+        left = np.searchsorted(axis, a - sigma, side='left')
+        right = np.searchsorted(axis, a + sigma, side='right')
+        return rows[left:right]
+
+    def find_rows(self, a, sigma, planets=None) -> np.ndarray:
+        """Rows of the matrix (in the original order) with the resonant axis within ``[a - sigma, a + sigma]``."""
+        if planets is None:
+            rows = self._range(self.axis, self.rows, a, sigma)
+        else:
+            found = [self._range(axis, rows, a, sigma) for axis, rows in self._search_groups(planets)]
+            rows = np.concatenate(found) if found else np.array([], dtype=int)
+        return np.sort(rows)
+
+    def _search_groups(self, planets=None) -> list:
+        if planets is None:
+            return [(self.axis, self.rows)]
+        planets = set(planets)
+        return [group for key, group in self.groups.items() if planets.issuperset(key)]
+
+    def find_rows_batch(self, a: np.ndarray, sigma, planets=None, ordered: bool = True):
+        """
+        Sorted interval join of many semi-major axes with the matrix.
+
+        Returns two arrays of the same length: positions in ``a`` and rows of the matrix. If ``ordered``, the pairs
+        are sorted by the position and then by the row (the order of ``find_rows`` for every value).
+        """
+        a = np.asarray(a, dtype=float)
+        queries, rows = [], []
+        for axis, group_rows in self._search_groups(planets):
+            left = np.searchsorted(axis, a - sigma, side='left')
+            counts = np.maximum(np.searchsorted(axis, a + sigma, side='right') - left, 0)
+            # positions left[i], left[i] + 1, ..., right[i] - 1 for every query i, without a Python loop
+            starts = np.cumsum(counts) - counts
+            positions = np.arange(int(counts.sum())) + np.repeat(left - starts, counts)
+            queries.append(np.repeat(np.arange(len(a)), counts))
+            rows.append(group_rows[positions])
+
+        queries = np.concatenate(queries) if queries else np.array([], dtype=np.int64)
+        rows = np.concatenate(rows) if rows else np.array([], dtype=np.int64)
+        if not ordered:
+            return queries, rows
+        # sorting one combined key is much faster than np.lexsort
+        key = np.sort(queries.astype(np.int64) * len(self.names) + rows)
+        return key // len(self.names), key % len(self.names)
+
+    def find(self, a, sigma, planets=None) -> list:
+        """MMR objects with the resonant axis within ``[a - sigma, a + sigma]`` in the order of the matrix."""
+        return [self.mmr(row) for row in self.find_rows(a, sigma, planets)]
+
+    def mmr(self, row: int) -> resonances.MMR:
+        if self.mmrs[row] is None:
+            self.mmrs[row] = registry.create(self.names[row], create_mmr)
+        return self.mmrs[row]
+
+
+def join_candidates(a, indexes, sigmas, planets=None, chunk_size: int = 100000) -> pd.DataFrame:
+    """
+    Long-format table of (value, resonance) candidates for many semi-major axes and one or several matrices.
+
+    The values are processed in chunks, so that the temporary arrays stay small even for millions of values.
+    For every value the candidates of the first matrix come first, each in the order of the matrix.
+
+    Parameters
+    ----------
+    a : array-like or pd.Series
+        Semi-major axes. If it is a Series, its index labels are used in the column ``index``
+    indexes : list of MatrixIndex
+        Indexes of the matrices
+    sigmas : list of float
+        Maximum distance to the resonant axis for every matrix
+    planets : list of str, optional
+        Only resonances with these planets
+    chunk_size : int, optional
+        Number of values processed at once
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns ``index``, ``mmr`` (categorical), ``a`` (resonant semi-major axis) and ``distance``
+    """
+    values = np.asarray(a, dtype=float).ravel()
+    offsets = np.cumsum([0] + [len(index.names) for index in indexes])
+    index_dtype = np.int32 if len(values) < 2**31 else np.int64
+
+    all_axes = np.concatenate([index.axis_by_row for index in indexes])
+
+    queries, codes, axes = [], [], []
+    for start in range(0, len(values), chunk_size):
+        chunk = values[start : start + chunk_size]
+        found = [index.find_rows_batch(chunk, sigma, planets, ordered=False) for index, sigma in zip(indexes, sigmas)]
+        # codes of the matrices follow each other, so sorting by (position, code) gives the required order
+        key = np.sort(np.concatenate([q * offsets[-1] + rows + offset for (q, rows), offset in zip(found, offsets)]))
+        chunk_codes = key % offsets[-1]
+        queries.append((key // offsets[-1] + start).astype(index_dtype))
+        codes.append(chunk_codes.astype(np.int32))
+        axes.append(all_axes[chunk_codes])
+
+    queries = np.concatenate(queries) if queries else np.array([], dtype=index_dtype)
+    codes = np.concatenate(codes) if codes else np.array([], dtype=np.int32)
+    axes = np.concatenate(axes) if axes else np.array([], dtype=float)
+    distance = np.abs(values[queries] - axes)
+
+    categories = np.concatenate([index.names for index in indexes])
+    return pd.DataFrame(
+        {
+            'index': a.index[queries] if isinstance(a, pd.Series) else queries,
+            'mmr': pd.Categorical.from_codes(codes, categories=categories),
+            'a': axes,
+            'distance': distance,
+        },
+        copy=False,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def constants_version() -> str:
+    """Hash of the physical constants used to calculate resonant semi-major axes (computed once per process)."""
+    const = resonances.data.const
+    data = [MATRIX_FORMAT_VERSION, const.K, const.DAYS_IN_YEAR, const.SOLAR_SYSTEM, const.PLANETS_AXIS, const.PLANETS_MASS]
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def write_columns(df: pd.DataFrame, path: Path, meta: dict):
+    """
+    Write a matrix as a directory of ``.npy`` files (one per column) and ``meta.json``.
+
+    The directory is written under a temporary name and renamed, so other processes never see a partial variant.
+    """
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.{uuid.uuid4().hex}')
+    tmp.mkdir(parents=True)
+    for column in df.columns:
+        values = df[column].to_numpy()
+        np.save(tmp / f'{column}.npy', values.astype(str) if values.dtype == object else values, allow_pickle=False)
+    with open(tmp / 'meta.json', 'w') as f:
+        json.dump({**meta, 'columns': list(df.columns)}, f)
+    old = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.old')
+    try:
+        if path.exists():
+            os.replace(path, old)
+        os.replace(tmp, path)
+    except OSError:  # another process is writing the same variant
+        pass
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def read_columns(path: Path) -> pd.DataFrame:
+    """Read a matrix written by ``write_columns``. Numeric columns are memory-mapped (copy-on-write)."""
+    path = Path(path)
+    with open(path / 'meta.json') as f:
+        meta = json.load(f)
+    data = {}
+    for column in meta['columns']:
+        values = np.load(path / f'{column}.npy', mmap_mode='c', allow_pickle=False)
+        # a plain ndarray view of the mapped file (pandas treats np.memmap as a different class)
+        data[column] = values.astype(object) if values.dtype.kind == 'U' else np.asarray(values)
+    return pd.DataFrame(data, copy=False)
 
 
 class Matrix:
     catalog_file = ''
+    config_prefix = ''
+    planet_columns = []
     matrix = None
     planets = None
+    _index = None
+    _index_matrix = None
+    # in-process cache of matrices by variant key (shared by all matrix classes, the key includes the class)
+    _variants = {}
+    # (settings, matrix) of the last load, to detect changes of the planets or the settings
+    _loaded = None
+    # (matrix, width settings, coefficients) of the libration widths, calculated on the first query by the width
+    _widths = None
+
+    @classmethod
+    def resolved_planets(cls) -> list:
+        if (cls.planets is None) or (len(cls.planets) == 0):
+            return list(resonances.data.const.SOLAR_SYSTEM)
+        return list(cls.planets)
+
+    @classmethod
+    def settings(cls) -> tuple:
+        """The planets and the limits of the integers as they are set now (cheap to compare on every query)."""
+        return (
+            tuple(cls.resolved_planets()),
+            *(resonances.config.get(f'{cls.config_prefix}_{name}') for name in ('PRIMARY_MAX', 'COEF_MAX', 'ORDER_MAX')),
+        )
+
+    @classmethod
+    def variant(cls) -> dict:
+        """Everything the matrix depends on: the planets, the limits of the integers and the constants."""
+        return {
+            'matrix': cls.__name__,
+            'planets': cls.resolved_planets(),
+            'primary_max': int(resonances.config.get(f'{cls.config_prefix}_PRIMARY_MAX')),
+            'coef_max': int(resonances.config.get(f'{cls.config_prefix}_COEF_MAX')),
+            'order_max': int(resonances.config.get(f'{cls.config_prefix}_ORDER_MAX')),
+            'constants': constants_version(),
+        }
+
+    @classmethod
+    def variant_key(cls) -> str:
+        return hashlib.sha1(json.dumps(cls.variant(), sort_keys=True).encode()).hexdigest()[:16]
+
+    @classmethod
+    def binary_filename(cls, key: str = None) -> str:
+        """Directory with the binary (columnar) cache of the variant next to the CSV catalog."""
+        catalog = Path(cls.catalog_full_filename())
+        return str(catalog.with_name(f'{catalog.stem}-{key or cls.variant_key()}'))
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget the matrices cached in the process (the files on disk are kept)."""
+        for key in [key for key in cls._variants if key[0] == cls.__name__]:
+            del cls._variants[key]
+        cls.matrix = None
+        cls._loaded = None
+        cls._widths = None
 
     @classmethod
     def dump(cls):
@@ -33,9 +289,104 @@ class Matrix:
 
     @classmethod
     def load(cls, reload=False):
-        catalog_file = Path(cls.catalog_full_filename())
-        if (not catalog_file.exists()) or (reload):
-            cls.dump()
+        """
+        Load the matrix for the current planets and settings.
+
+        The lookup order is the in-process cache, the binary cache on disk (memory-mapped) and, finally, the build.
+        A build writes both the binary cache of the variant and the CSV catalog (for review).
+        """
+        key = cls.variant_key()
+        binary = Path(cls.binary_filename(key))
+        if reload:
+            cls.build()
+        elif (cls.__name__, key) in cls._variants:
+            cls.matrix = cls._variants[(cls.__name__, key)]
+        elif (binary / 'meta.json').exists():
+            cls.matrix = read_columns(binary)
         else:
-            catalog = pd.read_csv(catalog_file)
-            cls.matrix = catalog
+            cls.build()
+
+        if reload or not binary.exists():
+            binary.parent.mkdir(parents=True, exist_ok=True)
+            write_columns(cls.matrix, binary, cls.variant())
+            cls.dump()
+
+        cls._variants[(cls.__name__, key)] = cls.matrix
+        cls._loaded = (cls.settings(), cls.matrix)
+
+    @classmethod
+    def is_stale(cls) -> bool:
+        """True if the matrix was loaded for other planets or settings than the current ones."""
+        return (cls._loaded is not None) and (cls._loaded[1] is cls.matrix) and (cls._loaded[0] != cls.settings())
+
+    @classmethod
+    def index(cls) -> MatrixIndex:
+        """Axis-sorted index of the matrix. It is rebuilt whenever ``cls.matrix`` is replaced (build, load, reset)."""
+        if (cls.matrix is None) or cls.is_stale():
+            cls.load()
+        if (cls._index is None) or (cls._index_matrix is not cls.matrix):
+            cls._index = MatrixIndex(cls.matrix, cls.planet_columns)
+            cls._index_matrix = cls.matrix
+        return cls._index
+
+    @classmethod
+    def width_coefficients(cls, df: pd.DataFrame) -> tuple:
+        """The coefficients ``width`` and ``width_inc`` of the rows of the matrix (see ``resonances.matrix.width``)."""
+        raise NotImplementedError
+
+    @classmethod
+    def width_settings(cls) -> tuple:
+        """The config values the coefficients of the widths depend on."""
+        return ()
+
+    @classmethod
+    def widths(cls) -> tuple:
+        """
+        The coefficients ``width`` and ``width_inc`` of the current matrix. They are expensive for two-body resonances,
+        so they are not a part of the build: they are calculated on the first query and kept until the matrix changes.
+        """
+        cls.index()
+        settings = cls.width_settings()
+        if (cls._widths is None) or (cls._widths[0] is not cls.matrix) or (cls._widths[1] != settings):
+            cls._widths = (cls.matrix, settings, cls.width_coefficients(cls.matrix))
+        return cls._widths[2]
+
+    @classmethod
+    def find_resonances_in_width(cls, a, e, inc=0.0, width_factor=1.0, planets=None) -> list:
+        """
+        Resonances whose libration region contains the body.
+
+        A resonance is kept if ``|a - a_res|`` does not exceed ``width_factor`` times its estimated half-width
+        for the eccentricity ``e`` and the inclination ``inc`` (radians), see ``resonances.matrix.width``.
+        """
+        index = cls.index()
+        widths = width.half_widths(cls.matrix['q'].to_numpy(), *cls.widths(), e, inc) * width_factor
+        if np.isnan(widths).all():
+            return []
+        # the widest resonance bounds the search range, the exact check is per row (false for NaN)
+        rows = index.find_rows(a, np.nanmax(widths), planets if isinstance(planets, list) else None)
+        rows = rows[np.abs(index.axis_by_row[rows] - a) <= widths[rows]]
+        return [index.mmr(row) for row in rows]
+
+    @classmethod
+    def find_resonances_batch(cls, a, sigma, planets=None) -> pd.DataFrame:
+        """
+        Find resonances for many values of the semi-major axis at once.
+
+        Parameters
+        ----------
+        a : array-like or pd.Series
+            Semi-major axes. If it is a Series (i.e. a column of a catalog), its index labels are used in the result.
+        sigma : float
+            Maximum distance between the semi-major axis and the resonant one
+        planets : list of str, optional
+            Only resonances with these planets
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per (value, resonance) pair with columns ``index`` (position or label of the value),
+            ``mmr`` (short notation, categorical), ``a`` (resonant semi-major axis) and ``distance``
+            (absolute difference of the axes). Rows are ordered as ``find_resonances`` for every value.
+        """
+        return join_candidates(a, [cls.index()], [sigma], planets if isinstance(planets, list) else None)
@@ -0,0 +1,71 @@
+"""
+Estimates of the secular frequencies of asteroids.
+
+The free frequencies of the longitude of perihelion (``g``) and of the node (``s``) follow from the linear
+(Laplace-Lagrange) secular theory of a massless body perturbed by the planets on circular coplanar orbits
+(Murray & Dermott, 1999, Section 7.7): ``g = A`` and ``s = -A`` with
+
+    A = n / 4 * sum_j mu_j * alpha_j * alpha_bar_j * b_{3/2}^{(1)}(alpha_j)
+
+In the linear theory, the frequencies depend only on the semi-major axis. The eccentricity is used to exclude
+the orbits crossing a planet, for which the theory is not valid. The error grows towards Jupiter (a few arcsec/yr
+in the inner main belt and up to 10-20 arcsec/yr in the outer belt), so these values should be used as a prefilter only.
+"""
+
+import numpy as np
+
+from resonances.data import const
+
+ARCSEC_IN_RADIAN = 180.0 / np.pi * 3600.0
+
+
+def laplace_coefficient(s: float, j: int, alpha: np.ndarray) -> np.ndarray:
+    """Laplace coefficient ``b_s^{(j)}(alpha)`` through the hypergeometric function (vectorised)."""
+    # scipy.special is imported here: the module is imported by every Simulation (the secular engine)
+    from scipy.special import hyp2f1
+
+    pochhammer = 1.0
+    for i in range(j):
+        pochhammer *= (s + i) / (i + 1)
+    return 2.0 * pochhammer * alpha**j * hyp2f1(s, s + j, j + 1, alpha**2)
+
+
+def proper_frequencies(a, e=None, inc=None, planets=None) -> tuple:
+    """
+    Estimated free frequencies ``g`` and ``s`` (arcsec/yr) for arrays of osculating elements.
+
+    Parameters
+    ----------
+    a : array-like
+        Semi-major axes (AU)
+    e : array-like, optional
+        Eccentricities. If given, the frequencies of the orbits crossing a planet are NaN
+    inc : array-like, optional
+        Inclinations (radians). The linear theory does not depend on them
+    planets : list of str, optional
+        Perturbing planets. By default, all planets of the Solar System
+
+    Returns
+    -------
+    tuple of np.ndarray
+        ``(g, s)`` in arcsec/yr
+    """
+    a = np.asarray(a, dtype=float)
+    planets = const.SOLAR_SYSTEM if planets is None else planets
+    n = const.K * a**-1.5 * const.DAYS_IN_YEAR * ARCSEC_IN_RADIAN
+
+    total = np.zeros(a.shape)
+    crossing = np.zeros(a.shape, dtype=bool)
+    for planet in planets:
+        ap = const.PLANETS_AXIS[planet]
+        inner = a < ap
+        alpha = np.where(inner, a / ap, ap / a)
+        alpha_bar = np.where(inner, alpha, 1.0)
+        total += const.PLANETS_MASS[planet] * alpha * alpha_bar * laplace_coefficient(1.5, 1, alpha)
+        if e is not None:
+            e = np.asarray(e, dtype=float)
+            crossing |= (a * (1 - e) <= ap) & (a * (1 + e) >= ap)
+
+    g = n / 4.0 * total
+    g = np.where(crossing, np.nan, g)
+    return g, -g
@@ -1,28 +1,40 @@
 from typing import List, Optional, Union
-from resonances.matrix.secular_resonances import SECULAR_RESONANCES
+import numpy as np
+import pandas as pd
+
+from resonances.matrix.secular_frequencies import proper_frequencies
+from resonances.matrix.secular_resonances import SECULAR_RESONANCES, load_planetary_frequencies
 from resonances.resonance.factory import create_secular_resonance
+from resonances.resonance.registry import registry
 from resonances.resonance.secular import SecularResonance, GeneralSecularResonance
 
 
+def _general_secular_resonance(formula: str) -> GeneralSecularResonance:
+    return GeneralSecularResonance(formula=formula)
+
+
 class SecularMatrix:
     """
     A class for building and managing secular resonances based on mathematical formulas.
 
     This class provides functionality to create secular resonances from mathematical
     expressions involving planetary frequencies (g, s) and constants (g5, g6, g7, g8, s5, s6, s7, s8).
+    The resonances are shared instances from ``resonances.resonance.registry``.
     """
 
+    _parsed = {}
+
     @classmethod
     def _build_specific_formulas(cls, formulas: List[str]) -> List[SecularResonance]:
         """Build resonances from specific formulas."""
         resonances = []
         for formula in formulas:
             if formula in SECULAR_RESONANCES:
-                resonances.append(create_secular_resonance(formula))
+                resonances.append(registry.create(formula, create_secular_resonance))
             else:
                 # Try to parse as a custom formula
                 try:
-                    resonances.append(GeneralSecularResonance(formula=formula))
+                    resonances.append(registry.create(formula, _general_secular_resonance))
                 except Exception as e:
                     print(f"Warning: Could not create resonance for formula '{formula}': {e}")
         return resonances
@@ -34,7 +46,7 @@ class SecularMatrix:
         for formula, info in SECULAR_RESONANCES.items():
             if info['order'] == order:
                 try:
-                    resonances.append(create_secular_resonance(formula))
+                    resonances.append(registry.create(formula, create_secular_resonance))
                 except Exception as e:
                     print(f"Warning: Could not create resonance for formula '{formula}': {e}")
         return resonances
@@ -45,7 +57,7 @@ class SecularMatrix:
         resonances = []
         for formula in SECULAR_RESONANCES.keys():
             try:
-                resonances.append(create_secular_resonance(formula))
+                resonances.append(registry.create(formula, create_secular_resonance))
             except Exception as e:
                 print(f"Warning: Could not create resonance for formula '{formula}': {e}")
         return resonances
@@ -75,3 +87,86 @@ class SecularMatrix:
             return cls._build_by_order(order)
         else:
             return cls._build_all_resonances()
+
+    @classmethod
+    def _coefficients(cls, formula: str) -> Optional[dict]:
+        """Parsed coefficients of the formula (cached), or None if it cannot be parsed."""
+        if formula not in cls._parsed:
+            try:
+                cls._parsed[formula] = GeneralSecularResonance._parse_formula(formula)
+            except ValueError:
+                cls._parsed[formula] = None
+        return cls._parsed[formula]
+
+    @classmethod
+    def _formulas(cls, formulas: Optional[Union[str, List[str]]] = None, order: Optional[int] = None) -> List[str]:
+        """Formulas selected in the same way as in ``build``."""
+        if formulas is not None:
+            return [formulas] if isinstance(formulas, str) else list(formulas)
+        if order is not None:
+            return [formula for formula, info in SECULAR_RESONANCES.items() if info['order'] == order]
+        return list(SECULAR_RESONANCES.keys())
+
+    @classmethod
+    def combinations(cls, a, e=None, inc=None, formulas=None, order=None) -> pd.DataFrame:
+        """
+        Values of the combinations of frequencies (arcsec/yr) for many asteroids at once.
+
+        The frequencies ``g`` and ``s`` of the asteroids are estimated by the linear secular theory
+        (see ``resonances.matrix.secular_frequencies``), the planetary ones are from ``load_planetary_frequencies``.
+
+        Parameters
+        ----------
+        a, e, inc : array-like or pd.Series
+            Osculating semi-major axes, eccentricities and inclinations (radians)
+        formulas : str or list of str, optional
+            Formulas to evaluate. If None, all formulas or those of the given order
+        order : int, optional
+            Order of the formulas
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per asteroid (with the index of ``a`` if it is a Series) and one column per formula. The value is NaN
+            if it cannot be estimated (an orbit crossing a planet or a frequency not known for the planets).
+        """
+        g, s = proper_frequencies(np.atleast_1d(a), None if e is None else np.atleast_1d(e), inc)
+        frequencies = {'g': g, 's': s, **load_planetary_frequencies()}
+
+        columns = {}
+        for formula in cls._formulas(formulas, order):
+            coeffs = cls._coefficients(formula)
+            value = np.full(len(g), np.nan if coeffs is None else 0.0)
+            for name, coeff in (coeffs or {}).items():
+                if coeff != 0:
+                    value = value + coeff * frequencies.get(name, np.nan)
+            columns[formula] = value
+
+        return pd.DataFrame(columns, index=a.index if isinstance(a, pd.Series) else None)
+
+    @classmethod
+    def find_resonances(cls, a: float, e: float, inc: float, tolerance_arcsec_yr: float = 10.0, formulas=None, order=None) -> list:
+        """
+        Secular resonances whose combination of frequencies is close to zero for the asteroid.
+
+        It is an analytic prefilter: the asteroid should be integrated only against these resonances.
+        The formulas that cannot be estimated (see ``combinations``) are always kept.
+
+        Parameters
+        ----------
+        a, e, inc : float
+            Osculating semi-major axis, eccentricity and inclination (radians)
+        tolerance_arcsec_yr : float, default=10.0
+            Maximum absolute value of the combination of frequencies
+        formulas : str or list of str, optional
+            Formulas to check. If None, all formulas or those of the given order
+        order : int, optional
+            Order of the formulas
+
+        Returns
+        -------
+        list of SecularResonance
+        """
+        values = cls.combinations(a, e, inc, formulas, order).iloc[0]
+        kept = [formula for formula, value in values.items() if np.isnan(value) or abs(value) <= tolerance_arcsec_yr]
+        return cls.build(formulas=kept) if len(kept) > 0 else []
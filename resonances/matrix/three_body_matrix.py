@@ -5,61 +5,66 @@ import itertools
 
 import resonances
 from resonances.matrix.matrix import Matrix
+from resonances.matrix import width
 
 
 class ThreeBodyMatrix(Matrix):
 
     catalog_file = 'MATRIX_3BODY_FILE'
+    config_prefix = 'MATRIX_3BODY'
+    planet_columns = ['planet1', 'planet2']
 
     @classmethod
     def build(cls):
         primary_max = int(resonances.config.get('MATRIX_3BODY_PRIMARY_MAX'))
         m_max = int(resonances.config.get('MATRIX_3BODY_COEF_MAX'))
         q_max = int(resonances.config.get('MATRIX_3BODY_ORDER_MAX'))
-        if (cls.planets is None) or (len(cls.planets) == 0):
-            planets = resonances.data.const.SOLAR_SYSTEM
-        else:
-            planets = cls.planets
+        planets = cls.resolved_planets()
         pairs = list(itertools.combinations(planets, 2))
-        data = []
+
+        # the grid of coefficients in the order of the nested loops: m1, then m2, then m
+        m1, m2, m = (
+            x.ravel() for x in np.meshgrid(np.arange(1, primary_max), np.arange(-m_max, m_max), np.arange(-m_max, m_max), indexing='ij')
+        )
+        p = 0 - (m1 + m2 + m)
+        allowed = (np.gcd(np.gcd(m1, m2), m) <= 1) & (m2 != 0) & (m != 0) & (np.abs(p) <= q_max)
+        m1, m2, m, p = m1[allowed], m2[allowed], m[allowed], p[allowed]
+
+        frames = []
         for planet1, planet2 in pairs:
-            for m1 in range(1, primary_max):
-                for m2 in range(-m_max, m_max):
-                    for m in range(-m_max, m_max):
-                        if np.gcd(np.gcd(m1, m2), m) > 1:
-                            continue
-                        if (m2 == 0) or (m == 0):
-                            continue
-                        p = 0 - (m1 + m2 + m)
-                        if abs(p) > q_max:
-                            continue
-                        mmr = resonances.ThreeBody([m1, m2, m, 0, 0, p], [planet1, planet2])
-                        try:
-                            axis = mmr.resonant_axis
-                            data.append([mmr.to_short(), planet1, planet2, m1, m2, m, abs(p), axis])
-                        except Exception:
-                            continue
+            axis = resonances.ThreeBody.calculate_resonant_axes(planet1, planet2, m1, m2, m)
+            found = ~np.isnan(axis)
+            letter1 = 'R' if planet1 == 'Mercury' else planet1[0]
+            letter2 = 'R' if planet2 == 'Mercury' else planet2[0]
+            frames.append(
+                pd.DataFrame(
+                    {
+                        'mmr': [f'{c1:d}{letter1}{c2:+d}{letter2}{c:+d}' for c1, c2, c in zip(m1[found], m2[found], m[found])],
+                        'planet1': planet1,
+                        'planet2': planet2,
+                        'm1': m1[found],
+                        'm2': m2[found],
+                        'm': m[found],
+                        'q': np.abs(p[found]),
+                        'a': axis[found],
+                    }
+                )
+            )
 
-        df = pd.DataFrame(data, columns=['mmr', 'planet1', 'planet2', 'm1', 'm2', 'm', 'q', 'a'])
+        columns = ['mmr', 'planet1', 'planet2', 'm1', 'm2', 'm', 'q', 'a']
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        df = df.astype({'m1': 'int64', 'm2': 'int64', 'm': 'int64', 'q': 'int64', 'a': 'float64'})
         cls.matrix = df
         return df
 
     @classmethod
-    def find_resonances(cls, a, sigma=0.02, planets=None) -> List[resonances.MMR]:
-        if cls.matrix is None:
-            cls.load()
+    def width_coefficients(cls, df: pd.DataFrame) -> tuple:
+        return width.three_body_coefficients(df)
 
-        if isinstance(planets, list):
-            df = cls.matrix[
-                (cls.matrix['a'] >= (a - sigma))
-                & (cls.matrix['a'] <= (a + sigma))
-                & (cls.matrix['planet1'].isin(planets))
-                & (cls.matrix['planet2'].isin(planets))
-            ]
-        else:
-            df = cls.matrix[(cls.matrix['a'] >= (a - sigma)) & (cls.matrix['a'] <= (a + sigma))]
+    @classmethod
+    def width_settings(cls) -> tuple:
+        return (resonances.config.get('MATRIX_3BODY_WIDTH'),)
 
-        mmrs = []
-        for mmr in df['mmr'].tolist():
-            mmrs.append(resonances.create_mmr(mmr))
-        return mmrs
+    @classmethod
+    def find_resonances(cls, a, sigma=0.02, planets=None) -> List[resonances.MMR]:
+        return cls.index().find(a, sigma, planets if isinstance(planets, list) else None)
@@ -3,53 +3,52 @@ import pandas as pd
 
 import resonances
 from resonances.matrix.matrix import Matrix
+from resonances.matrix import width
 
 
 class TwoBodyMatrix(Matrix):
     catalog_file = 'MATRIX_2BODY_FILE'
+    config_prefix = 'MATRIX_2BODY'
+    planet_columns = ['planet']
 
     @classmethod
     def build(cls):
         primary_max = int(resonances.config.get('MATRIX_2BODY_PRIMARY_MAX'))
         m_max = int(resonances.config.get('MATRIX_2BODY_COEF_MAX'))
         q_max = int(resonances.config.get('MATRIX_2BODY_ORDER_MAX'))
-        if (cls.planets is None) or (len(cls.planets) == 0):
-            planets = resonances.data.const.SOLAR_SYSTEM
-        else:
-            planets = cls.planets
-        data = []
+        planets = cls.resolved_planets()
+        # the grid of coefficients in the order of the nested loops: m1, then m
+        m1, m = (x.ravel() for x in np.meshgrid(np.arange(1, primary_max), np.arange(-m_max, m_max), indexing='ij'))
+        p = 0 - (m1 + m)
+        allowed = (np.gcd(m1, m) <= 1) & (m != 0) & (np.abs(p) <= q_max)
+        m1, m, p = m1[allowed], m[allowed], p[allowed]
+
+        frames = []
         for planet in planets:
-            for m1 in range(1, primary_max):
-                for m in range(-m_max, m_max):
-                    if np.gcd(m1, m) > 1:
-                        continue
-                    if m == 0:
-                        continue
-                    p = 0 - (m1 + m)
-                    if abs(p) > q_max:
-                        continue
-                    mmr = resonances.TwoBody([m1, m, 0, p], [planet])
-                    try:
-                        axis = mmr.resonant_axis
-                        data.append([mmr.to_short(), planet, m1, m, abs(p), axis])
-                    except Exception:  # pragma: no cover
-                        continue
-
-        df = pd.DataFrame(data, columns=['mmr', 'planet', 'm1', 'm', 'q', 'a'])
+            letter = 'R' if planet == 'Mercury' else planet[0]
+            frames.append(
+                pd.DataFrame(
+                    {
+                        'mmr': [f'{c1:d}{letter}{c:+d}' for c1, c in zip(m1, m)],
+                        'planet': planet,
+                        'm1': m1,
+                        'm': m,
+                        'q': np.abs(p),
+                        'a': resonances.TwoBody.calculate_resonant_axes(planet, m1, m),
+                    }
+                )
+            )
+
+        columns = ['mmr', 'planet', 'm1', 'm', 'q', 'a']
+        df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+        df = df.astype({'m1': 'int64', 'm': 'int64', 'q': 'int64', 'a': 'float64'})
         cls.matrix = df
         return df
 
+    @classmethod
+    def width_coefficients(cls, df: pd.DataFrame) -> tuple:
+        return width.two_body_coefficients(df)
+
     @classmethod
     def find_resonances(cls, a, sigma=0.1, planets=None):
-        if cls.matrix is None:
-            cls.load()
-
-        if isinstance(planets, list):
-            df = cls.matrix[(cls.matrix['a'] >= (a - sigma)) & (cls.matrix['a'] <= (a + sigma)) & (cls.matrix['planet'].isin(planets))]
-        else:
-            df = cls.matrix[(cls.matrix['a'] >= (a - sigma)) & (cls.matrix['a'] <= (a + sigma))]
-
-        mmrs = []
-        for mmr in df['mmr'].tolist():
-            mmrs.append(resonances.create_mmr(mmr))
-        return mmrs
+        return cls.index().find(a, sigma, planets if isinstance(planets, list) else None)
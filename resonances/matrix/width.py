@@ -0,0 +1,153 @@
+"""
+Estimates of the libration widths of mean motion resonances.
+
+The widths follow from the pendulum model of a resonance: if ``dR`` is the amplitude (max - min) of the disturbing
+function averaged over the resonant cycle, the half-width of the resonance in the semi-major axis is
+``sqrt(8 a^3 dR / 3)`` (units: AU, G * M_sun = 1). The leading term of a resonance of order ``q`` is proportional
+to ``e^q``, so the half-width scales as ``e^(q/2)``. The matrices calculate the coefficients ``width`` and
+``width_inc`` (the half-width for ``e = 1`` extrapolated from ``REFERENCE_ECC``, for the coplanar orbit and for
+``REFERENCE_INC``) on the first query by the width, and ``half_widths`` evaluates them for any eccentricity and inclination.
+
+For two-body resonances ``dR`` is calculated numerically as in Gallardo (2006, Icarus 184, 29): the disturbing
+function of a planet on a circular orbit is averaged over the resonant cycle for a grid of values of the resonant
+angle. Three-body resonances appear only in the second order of the masses of the planets, and their width is
+a rough order-of-magnitude estimate ``MATRIX_3BODY_WIDTH * a * sqrt(mu1 * mu2) * e^(q/2)`` (a config value).
+"""
+
+import numpy as np
+import pandas as pd
+
+import resonances
+from resonances.data import const
+
+REFERENCE_ECC = 0.1
+REFERENCE_INC = 20.0  # degrees
+REFERENCE_PERIHELION = 60.0  # the argument of perihelion (degrees) used for the averaging, as in Gallardo (2006)
+SIGMA_SAMPLES = 24
+
+
+def solve_kepler(M: np.ndarray, e: float, tolerance: float = 1e-12) -> np.ndarray:
+    """Eccentric anomaly for the mean anomaly ``M`` (Newton iterations, vectorised)."""
+    E = M + e * np.sin(M)
+    for _ in range(50):
+        delta = (E - e * np.sin(E) - M) / (1.0 - e * np.cos(E))
+        E = E - delta
+        if np.max(np.abs(delta)) < tolerance:
+            break
+    return E
+
+
+def averaged_disturbing_function(planet: str, coeff, a: float, e: float, inc: float, omega: float) -> np.ndarray:
+    """
+    Disturbing function of the planet averaged over the resonant cycle for ``SIGMA_SAMPLES`` values of the angle.
+
+    ``coeff`` are the integers of the two-body resonant angle ``m1 * l_p + m * l + p * varpi``, ``inc`` and ``omega``
+    are in radians. The planet moves on a circular orbit in the reference plane, the node of the body is at zero.
+    """
+    m1, m, p = coeff
+    return averaged_disturbing_functions(
+        np.array([const.PLANETS_AXIS[planet]]),
+        np.array([const.PLANETS_MASS[planet]]),
+        np.array([m1]),
+        m,
+        np.array([p]),
+        np.array([a]),
+        e,
+        inc,
+        omega,
+    )[0]
+
+
+def averaged_disturbing_functions(ap, mu, m1, m: int, p, a, e: float, inc: float, omega: float) -> np.ndarray:
+    """
+    The same as ``averaged_disturbing_function`` for many resonances at once (the array of the shape
+    ``(rows, SIGMA_SAMPLES)``). ``ap``, ``mu`` (the axis and the mass of the planet), ``m1``, ``p`` and ``a`` are arrays,
+    the resonances share ``m`` and ``max(|m1|, |m|)``, so that the planet covers the same grid of longitudes.
+    """
+    ap, mu, m1, p, a = (np.asarray(x, dtype=float)[:, None, None] for x in (ap, mu, m1, p, a))
+
+    # the mean longitude of the planet covers |m| revolutions, so that the body covers m1 of them
+    samples = 24 * int(max(np.abs(m1).max(), abs(m), 1))
+    theta = np.linspace(0, 2 * np.pi * abs(m), samples, endpoint=False)
+    sigma = np.linspace(0, 2 * np.pi, SIGMA_SAMPLES, endpoint=False)[:, None]
+    varpi = omega
+    longitude = (sigma - m1 * theta - p * varpi) / m
+
+    E = solve_kepler(np.mod(longitude - varpi, 2 * np.pi), e)
+    x_orbit = a * (np.cos(E) - e)
+    y_orbit = a * np.sqrt(1 - e * e) * np.sin(E)
+    # rotation by the argument of perihelion and the inclination (the node is at zero)
+    x = x_orbit * np.cos(omega) - y_orbit * np.sin(omega)
+    y_plane = x_orbit * np.sin(omega) + y_orbit * np.cos(omega)
+    y = y_plane * np.cos(inc)
+    z = y_plane * np.sin(inc)
+
+    xp = ap * np.cos(theta)
+    yp = ap * np.sin(theta)
+    distance = np.sqrt((x - xp) ** 2 + (y - yp) ** 2 + z**2)
+    R = mu * (1.0 / distance - (x * xp + y * yp) / ap**3)
+    return R.mean(axis=2)
+
+
+def pendulum_half_width(a: float, amplitude: float) -> float:
+    """Half-width of the resonance in the semi-major axis for the amplitude of the averaged disturbing function."""
+    return np.sqrt(8.0 * a**3 * amplitude / 3.0)
+
+
+def two_body_half_width(planet: str, m1: int, m: int, a: float, e: float, inc: float = 0.0) -> float:
+    """Half-width (AU) of the two-body resonance ``m1 * l_p + m * l + p * varpi`` for the given ``e`` and ``inc`` (radians)."""
+    p = -(m1 + m)
+    R = averaged_disturbing_function(planet, (m1, m, p), a, e, inc, np.radians(REFERENCE_PERIHELION))
+    return pendulum_half_width(a, R.max() - R.min())
+
+
+def two_body_coefficients(df: pd.DataFrame) -> tuple:
+    """
+    Coefficients ``width`` and ``width_inc`` for a two-body matrix (see the module docstring). The resonances with
+    ``m > 0`` get NaN: the body would have a negative mean motion, the angle can't librate.
+    """
+    width = np.full(len(df), np.nan)
+    width_inc = np.full(len(df), np.nan)
+    m1, m = df['m1'].to_numpy(), df['m'].to_numpy()
+    a = df['a'].to_numpy(dtype=float)
+    p = -(m1 + m)
+    ap = df['planet'].map(const.PLANETS_AXIS).to_numpy(dtype=float)
+    mu = df['planet'].map(const.PLANETS_MASS).to_numpy(dtype=float)
+    scale = REFERENCE_ECC ** (df['q'].to_numpy() / 2.0)
+    omega = np.radians(REFERENCE_PERIHELION)
+
+    # the resonances with the same grid of longitudes of the planet are averaged at once
+    span = np.maximum(np.abs(m1), np.abs(m))
+    for coef, longest in sorted(set(zip(m[m < 0], span[m < 0]))):
+        rows = np.flatnonzero((m == coef) & (span == longest))
+        for column, inc in ((width, 0.0), (width_inc, np.radians(REFERENCE_INC))):
+            R = averaged_disturbing_functions(ap[rows], mu[rows], m1[rows], coef, p[rows], a[rows], REFERENCE_ECC, inc, omega)
+            column[rows] = pendulum_half_width(a[rows], R.max(axis=1) - R.min(axis=1)) / scale[rows]
+    return width, width_inc
+
+
+def three_body_coefficients(df: pd.DataFrame) -> tuple:
+    """
+    Coefficients ``width`` and ``width_inc`` for a three-body matrix (the estimate does not depend on the inclination).
+    The factor of the estimate is the config value ``MATRIX_3BODY_WIDTH``.
+    """
+    mu1 = df['planet1'].map(const.PLANETS_MASS).to_numpy(dtype=float)
+    mu2 = df['planet2'].map(const.PLANETS_MASS).to_numpy(dtype=float)
+    factor = float(resonances.config.get('MATRIX_3BODY_WIDTH'))
+    width = factor * df['a'].to_numpy(dtype=float) * np.sqrt(mu1 * mu2)
+    return width, width.copy()
+
+
+def half_widths(q, width, width_inc, e: float, inc: float = 0.0) -> np.ndarray:
+    """
+    Estimated half-widths (AU) of the resonances of the order ``q`` with the coefficients ``width`` and ``width_inc``
+    (arrays, see ``two_body_coefficients`` and ``three_body_coefficients``) for the eccentricity ``e`` and the
+    inclination ``inc`` (radians). The resonances without a width (NaN) stay NaN.
+
+    The inclination dependence is interpolated linearly in ``sin(inc / 2)^2`` between the coplanar value and
+    ``REFERENCE_INC``, which is the leading order of the expansion of the disturbing function.
+    """
+    s = np.sin(inc / 2) ** 2 / np.sin(np.radians(REFERENCE_INC) / 2) ** 2
+    width = np.asarray(width, dtype=float)
+    coefficient = np.maximum(width + (np.asarray(width_inc, dtype=float) - width) * s, 0.0)
+    return coefficient * e ** (np.asarray(q) / 2.0)
@@ -0,0 +1,408 @@
+"""
+Survey report: one self-contained HTML file with the summary table and small charts for every (body, resonance) pair.
+
+The charts are not raster images. Each time series is reduced to the cells of a small grid that it covers
+(see ``encode_series``) and the browser draws a chart only when its row becomes visible. This keeps the file small
+and the generation fast even for tens of thousands of pairs.
+"""
+
+import base64
+import datetime
+import html
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import resonances
+
+TABLE_COLUMNS = [
+    'name',
+    'resonance',
+    'type',
+    'status',
+    'pure',
+    'num_libration_periods',
+    'max_libration_length',
+    'monotony',
+    'a',
+    'e',
+    'inc',
+]
+
+SERIES = ['angle', 'axis', 'ecc']
+
+
+def encode_series(y, columns: int = 200, rows: int = 48):
+    """
+    Encode a time series as the occupied cells of a ``columns`` x ``rows`` grid.
+
+    Columns split the series into equal parts by index (time), rows split the range of values. The occupied cells
+    are stored either as vertical runs of three bytes (column, first row, last row), which is compact for continuous
+    curves, or as a bitmap of the whole grid, which is compact for scattered points, whichever is shorter.
+    Both sizes should not exceed 256.
+
+    Returns
+    -------
+    dict or None
+        ``{'min': ..., 'max': ..., 'runs' or 'bits': base64 string}`` or None if there is no data
+    """
+    if y is None:
+        return None
+    if not (0 < columns <= 256 and 0 < rows <= 256):
+        raise ValueError(f'The grid should be at most 256x256, got {columns}x{rows}')
+
+    y = np.asarray(y, dtype=float)
+    column = np.arange(len(y)) * columns // max(len(y), 1)
+    finite = np.isfinite(y)
+    if not finite.all():
+        y, column = y[finite], column[finite]
+    if not len(y):
+        return None
+    low, high = float(y.min()), float(y.max())
+
+    row = np.zeros(len(y), dtype=np.int64)
+    if high > low:
+        row = np.minimum(((y - low) * (rows / (high - low))).astype(np.int64), rows - 1)
+
+    # one empty cell above and below every column, so that runs never continue into the next column
+    stride = rows + 2
+    grid = np.zeros(columns * stride, dtype=bool)
+    grid[column * stride + row + 1] = True
+    starts = np.flatnonzero(grid[1:] & ~grid[:-1]) + 1
+    ends = np.flatnonzero(grid[:-1] & ~grid[1:])
+
+    if 3 * len(starts) <= columns * rows / 8:
+        runs = np.empty((len(starts), 3), dtype=np.uint8)
+        runs[:, 0] = starts // stride
+        runs[:, 1] = starts % stride - 1
+        runs[:, 2] = ends % stride - 1
+        return {'min': low, 'max': high, 'runs': base64.b64encode(runs.tobytes()).decode('ascii')}
+
+    cells = grid.reshape(columns, stride)[:, 1:-1]
+    return {'min': low, 'max': high, 'bits': base64.b64encode(np.packbits(cells).tobytes()).decode('ascii')}
+
+
+class SurveyReport:
+    """
+    Collects the summary and the time series of a survey and writes them into one HTML file.
+
+    Examples
+    --------
+    >>> report = SurveyReport('Hungarias')
+    >>> report.add_summary(sim.data_manager.get_simulation_summary(sim.bodies))
+    >>> for body in sim.bodies:
+    ...     for mmr in body.mmrs:
+    ...         report.add_body(body, mmr, sim.times)
+    >>> report.write('cache/report.html')
+    """
+
+    def __init__(self, title: str = None, columns: int = 200, rows: int = 48):
+        self.title = title or 'Resonances survey'
+        self.columns = columns
+        self.rows = rows
+        self.records = []
+        self.charts = {}
+
+    def __len__(self):
+        return len(self.records)
+
+    def add_summary(self, df: pd.DataFrame):
+        """Add rows of a summary (see ``DataManager.get_simulation_summary``) to the table."""
+        columns = [column for column in TABLE_COLUMNS if column in df.columns]
+        df = df[columns].astype(object).where(df[columns].notna(), None)
+        for record in df.to_dict('records'):
+            self.records.append({key: (value.item() if isinstance(value, np.generic) else value) for key, value in record.items()})
+
+    def add_series(self, name: str, resonance_key: str, times, angle=None, axis=None, ecc=None):
+        """Add the chart of a (body, resonance) pair. ``times`` are in years."""
+        times = np.asarray(times)
+        chart = {'t': [float(times[0]), float(times[-1])] if len(times) else [0.0, 0.0]}
+        for key, values in zip(SERIES, [angle, axis, ecc]):
+            chart[key] = encode_series(values, self.columns, self.rows)
+        self.charts[(str(name), resonance_key)] = chart
+
+    def add_body(self, body: resonances.Body, resonance: resonances.Resonance, times):
+        """Add the chart of a body in a resonance after the simulation (``times`` as in ``Simulation.times``)."""
+        resonance_key = resonance.to_s()
+        if isinstance(resonance, resonances.MMR):
+            angle = body.angles.get(resonance_key)
+        else:
+            angle = body.secular_angles.get(resonance_key)
+        axis = body.axis_filtered if body.axis_filtered is not None else body.axis
+        self.add_series(body.name, resonance_key, np.asarray(times) / (2 * np.pi), angle, axis, body.ecc)
+
+    def to_html(self) -> str:
+        charts, chart_index = [], {}
+        for key, chart in self.charts.items():
+            chart_index[key] = len(charts)
+            charts.append(chart)
+
+        columns = [column for column in TABLE_COLUMNS if any(column in record for record in self.records)]
+        rows = []
+        for record in self.records:
+            key = (str(record.get('name')), record.get('resonance'))
+            rows.append([record.get(column) for column in columns] + [chart_index.get(key, -1)])
+
+        payload = {'columns': columns, 'rows': rows, 'charts': charts, 'grid': [self.columns, self.rows]}
+        # "</" would close the script element
+        data = json.dumps(payload, separators=(',', ':'), allow_nan=False, default=str).replace('</', '<\\/')
+
+        generated = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        subtitle = f'{len(rows)} pairs, {len(charts)} charts, generated {generated} by resonances {resonances.__version__}'
+        return (
+            HTML_TEMPLATE.replace('%TITLE%', html.escape(self.title)).replace('%SUBTITLE%', html.escape(subtitle)).replace('%DATA%', data)
+        )
+
+    def write(self, filename: str) -> str:
+        """Write the report and return the filename."""
+        Path(filename).parent.mkdir(parents=True, exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(self.to_html())
+        return filename
+
+
+def from_directory(path: str, filename: str = None, title: str = None) -> str:
+    """
+    Build the report of a saved run: ``summary.csv`` and the series saved as ``data-{name}-{resonance}.csv``.
+
+    Parameters
+    ----------
+    path : str
+        The ``save_path`` of the simulation
+    filename : str, optional
+        Output file, by default ``{path}/report.html``
+    title : str, optional
+        Title of the report, by default the name of the directory
+
+    Returns
+    -------
+    str
+        The filename of the report
+    """
+    path_obj = Path(path)
+    summary_file = path_obj / 'summary.csv'
+    if not summary_file.exists():
+        raise FileNotFoundError(f'No summary.csv in {path}')
+
+    report = SurveyReport(title or path_obj.name)
+    df = pd.read_csv(summary_file, dtype={'name': str})
+    report.add_summary(df)
+
+    for name, resonance_key in df[['name', 'resonance']].drop_duplicates().itertuples(index=False):
+        data_file = path_obj / f'data-{name}-{resonance_key}.csv'
+        if not data_file.exists():
+            continue
+        data = pd.read_csv(data_file)
+        axis_column = 'a_filtered' if 'a_filtered' in data.columns else 'a'
+        report.add_series(name, resonance_key, data['times'].values, data['angle'].values, data[axis_column].values, data['e'].values)
+
+    return report.write(filename or str(path_obj / 'report.html'))
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>%TITLE%</title>
+<style>
+body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; font-size: 13px; margin: 0; }
+header { padding: 10px 16px; border-bottom: 1px solid #ddd; position: sticky; top: 0; background: #fff; z-index: 2; }
+header h1 { font-size: 18px; margin: 0 0 4px 0; }
+header .sub { color: #666; }
+header .controls { margin-top: 8px; }
+header input, header select { font-size: 13px; margin-right: 12px; }
+#detail { display: none; padding: 8px 16px; border-bottom: 1px solid #ddd; background: #fafafa; }
+#detail h2 { font-size: 15px; margin: 0 0 6px 0; }
+#detail .chart { display: inline-block; margin-right: 16px; vertical-align: top; }
+#detail .label { color: #444; }
+table { border-collapse: collapse; margin: 0 16px 16px 16px; }
+th { text-align: left; cursor: pointer; user-select: none; padding: 4px 8px; border-bottom: 2px solid #999; white-space: nowrap; }
+th.asc::after { content: " \\25B2"; }
+th.desc::after { content: " \\25BC"; }
+td { padding: 2px 8px; border-bottom: 1px solid #eee; white-space: nowrap; }
+td.num { text-align: right; font-variant-numeric: tabular-nums; }
+tr:hover td { background: #f3f7ff; }
+tr.selected td { background: #e3ecff; }
+.s1 { color: #1a7f37; font-weight: bold; }
+.s2 { color: #1a7f37; }
+.sneg { color: #b35900; }
+canvas.spark { display: block; }
+</style>
+</head>
+<body>
+<header>
+<h1>%TITLE%</h1>
+<div class="sub">%SUBTITLE%</div>
+<div class="controls">
+<label>Filter <input id="filter" type="search" placeholder="name or resonance"></label>
+<label>Status <select id="status">
+<option value="">all</option><option value="resonant">resonant (&gt; 0)</option>
+<option value="nonzero">nonzero</option><option value="candidates">candidates (&lt; 0)</option>
+<option value="zero">zero</option></select></label>
+<span id="count"></span>
+</div>
+</header>
+<div id="detail"></div>
+<table><thead id="head"></thead><tbody id="body"></tbody></table>
+<script type="application/json" id="data">%DATA%</script>
+<script>
+(function () {
+  var D = JSON.parse(document.getElementById('data').textContent);
+  var columns = D.columns, rows = D.rows, charts = D.charts, GRID_C = D.grid[0], GRID_R = D.grid[1];
+  var CHART = columns.length;
+  var statusCol = columns.indexOf('status'), nameCol = columns.indexOf('name'), resCol = columns.indexOf('resonance');
+  var sortCol = -1, sortDir = 1, selected = null, decoded = {};
+
+  function esc(v) {
+    return String(v).replace(/[&<>"]/g, function (c) { return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c]; });
+  }
+  function fmt(v) {
+    if (v === null || v === undefined) return '';
+    if (typeof v === 'number' && !Number.isInteger(v)) {
+      var p = v.toPrecision(6);
+      return p.indexOf('.') >= 0 && p.indexOf('e') < 0 ? p.replace(/\\.?0+$/, '') : p;
+    }
+    return esc(v);
+  }
+  function bytes(text) {
+    if (!decoded[text]) {
+      var raw = atob(text), out = new Uint8Array(raw.length);
+      for (var i = 0; i < raw.length; i++) out[i] = raw.charCodeAt(i);
+      decoded[text] = out;
+    }
+    return decoded[text];
+  }
+  function draw(canvas, series) {
+    var ctx = canvas.getContext('2d'), w = canvas.width, h = canvas.height;
+    ctx.clearRect(0, 0, w, h);
+    if (!series) return;
+    var cw = w / GRID_C, ch = h / GRID_R;
+    function fill(column, first, last) {
+      var top = Math.floor((GRID_R - 1 - last) * ch), bottom = Math.ceil((GRID_R - first) * ch);
+      ctx.fillRect(Math.floor(column * cw), top, Math.max(1, Math.ceil(cw)), Math.max(1, bottom - top));
+    }
+    ctx.fillStyle = '#000';
+    var b, i;
+    if (series.runs !== undefined) {
+      b = bytes(series.runs);
+      for (i = 0; i < b.length; i += 3) fill(b[i], b[i + 1], b[i + 2]);
+    } else {
+      b = bytes(series.bits);
+      for (i = 0; i < GRID_C * GRID_R; i++) {
+        if (b[i >> 3] & (128 >> (i & 7))) fill(Math.floor(i / GRID_R), i % GRID_R, i % GRID_R);
+      }
+    }
+  }
+
+  var observer = new IntersectionObserver(function (entries) {
+    entries.forEach(function (entry) {
+      if (!entry.isIntersecting) return;
+      var canvas = entry.target;
+      draw(canvas, charts[+canvas.dataset.c].angle);
+      observer.unobserve(canvas);
+    });
+  }, {rootMargin: '200px'});
+
+  function renderHead() {
+    var out = columns.map(function (c, i) {
+      var cls = i === sortCol ? (sortDir > 0 ? 'asc' : 'desc') : '';
+      return '<th data-i="' + i + '" class="' + cls + '">' + esc(c) + '</th>';
+    });
+    out.push('<th>angle</th>');
+    document.getElementById('head').innerHTML = '<tr>' + out.join('') + '</tr>';
+  }
+
+  function visible() {
+    var text = document.getElementById('filter').value.trim().toLowerCase();
+    var mode = document.getElementById('status').value;
+    var out = [];
+    for (var i = 0; i < rows.length; i++) {
+      var r = rows[i], s = statusCol >= 0 ? r[statusCol] : 0;
+      if (mode === 'resonant' && !(s > 0)) continue;
+      if (mode === 'nonzero' && !(s !== 0)) continue;
+      if (mode === 'candidates' && !(s < 0)) continue;
+      if (mode === 'zero' && s !== 0) continue;
+      if (text && String(r[nameCol]).toLowerCase().indexOf(text) < 0 && String(r[resCol]).toLowerCase().indexOf(text) < 0) continue;
+      out.push(i);
+    }
+    if (sortCol >= 0) {
+      out.sort(function (a, b) {
+        var x = rows[a][sortCol], y = rows[b][sortCol];
+        if (x === y) return a - b;
+        if (x === null) return 1;
+        if (y === null) return -1;
+        return (typeof x === 'number' && typeof y === 'number' ? x - y : String(x).localeCompare(String(y), undefined, {numeric: true})) * sortDir;
+      });
+    }
+    return out;
+  }
+
+  function renderBody() {
+    observer.disconnect();
+    var indices = visible(), out = [];
+    for (var k = 0; k < indices.length; k++) {
+      var i = indices[k], r = rows[i], tds = [];
+      for (var j = 0; j < columns.length; j++) {
+        var v = r[j], cls = typeof v === 'number' ? 'num' : '';
+        if (j === statusCol) cls += v === 1 ? ' s1' : v > 1 ? ' s2' : v < 0 ? ' sneg' : '';
+        tds.push('<td class="' + cls + '">' + fmt(v) + '</td>');
+      }
+      tds.push('<td>' + (r[CHART] >= 0 ? '<canvas class="spark" width="' + GRID_C + '" height="32" data-c="' + r[CHART] + '"></canvas>' : '') + '</td>');
+      out.push('<tr data-i="' + i + '"' + (i === selected ? ' class="selected"' : '') + '>' + tds.join('') + '</tr>');
+    }
+    var body = document.getElementById('body');
+    body.innerHTML = out.join('');
+    body.querySelectorAll('canvas').forEach(function (c) { observer.observe(c); });
+    document.getElementById('count').textContent = indices.length + ' of ' + rows.length + ' shown';
+  }
+
+  function showDetail(i) {
+    selected = i;
+    var r = rows[i], panel = document.getElementById('detail');
+    var chart = r[CHART] >= 0 ? charts[r[CHART]] : null;
+    var title = esc(r[nameCol]) + ', resonance = ' + esc(r[resCol]) + (statusCol >= 0 ? ', status = ' + esc(r[statusCol]) : '');
+    var out = ['<h2>' + title + '</h2>'];
+    if (!chart) {
+      out.push('<div class="label">No series stored for this pair.</div>');
+    } else {
+      var labels = {angle: 'Resonant angle', axis: 'Semi-major axis', ecc: 'Eccentricity'};
+      ['angle', 'axis', 'ecc'].forEach(function (key) {
+        var s = chart[key];
+        out.push('<div class="chart"><div class="label">' + labels[key] + (s ? ': ' + fmt(s.min) + ' &ndash; ' + fmt(s.max) : '') + '</div>' +
+          '<canvas width="' + (2 * GRID_C) + '" height="' + (2 * GRID_R) + '" data-k="' + key + '"></canvas>' +
+          '<div class="label">t = ' + fmt(chart.t[0]) + ' &ndash; ' + fmt(chart.t[1]) + ' yr</div></div>');
+      });
+    }
+    panel.innerHTML = out.join('');
+    panel.style.display = 'block';
+    if (chart) panel.querySelectorAll('canvas').forEach(function (c) { draw(c, chart[c.dataset.k]); });
+    document.querySelectorAll('#body tr.selected').forEach(function (tr) { tr.classList.remove('selected'); });
+    var tr = document.querySelector('#body tr[data-i="' + i + '"]');
+    if (tr) tr.classList.add('selected');
+  }
+
+  document.getElementById('head').addEventListener('click', function (e) {
+    var th = e.target.closest('th');
+    if (!th || th.dataset.i === undefined) return;
+    var i = +th.dataset.i;
+    sortDir = i === sortCol ? -sortDir : 1;
+    sortCol = i;
+    renderHead();
+    renderBody();
+  });
+  document.getElementById('body').addEventListener('click', function (e) {
+    var tr = e.target.closest('tr');
+    if (tr) showDetail(+tr.dataset.i);
+  });
+  document.getElementById('filter').addEventListener('input', renderBody);
+  document.getElementById('status').addEventListener('change', renderBody);
+
+  renderHead();
+  renderBody();
+})();
+</script>
+</body>
+</html>
+"""
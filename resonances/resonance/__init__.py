@@ -1,6 +1,15 @@
+import importlib
+
 from .mmr import MMR
 from .secular import SecularResonance, GeneralSecularResonance, Nu6Resonance, Nu5Resonance, Nu16Resonance
 from .resonance import Resonance
 from .three_body import ThreeBody
 from .two_body import TwoBody
 from .factory import create_secular_resonance, detect_resonance_type, create_resonance
+
+
+def __getattr__(name):
+    # matplotlib is imported at the first access to resonances.resonance.plot
+    if name == 'plot':
+        return importlib.import_module('.plot', __name__)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -2,6 +2,7 @@ import re
 from typing import Union
 
 from resonances.resonance.mmr import MMR
+from resonances.resonance.registry import registry
 from resonances.resonance.resonance import Resonance
 from resonances.resonance.secular import Nu16Resonance, Nu5Resonance, Nu6Resonance, SecularResonance, GeneralSecularResonance
 from resonances.resonance.three_body import ThreeBody
@@ -166,15 +167,24 @@ def detect_resonance_type(resonance: Union[Resonance, str]) -> str:
     raise Exception('The argument should be either a string (i.e. "nu6") or a Resonance object.')
 
 
+def _create_from_string(resonance: str) -> Resonance:
+    res_type = detect_resonance_type(resonance)
+    if res_type == 'mmr':
+        return create_mmr(resonance)
+    elif res_type == 'secular':
+        return create_secular_resonance(resonance)
+    else:
+        raise Exception(f'Unknown resonance type: {res_type}')
+
+
 def create_resonance(resonance: Union[Resonance, str]) -> Resonance:
+    """Create a resonance from the string or return the given object as-is.
+
+    The resonances created from strings are shared (see ``resonances.resonance.registry``): the same notation
+    (or an equivalent one, i.e. ``nu6`` and ``g-g6``) always gives the same immutable object.
+    """
     if isinstance(resonance, Resonance):
         return resonance
     elif isinstance(resonance, str):
-        res_type = detect_resonance_type(resonance)
-        if res_type == 'mmr':
-            return create_mmr(resonance)
-        elif res_type == 'secular':
-            return create_secular_resonance(resonance)
-        else:
-            raise Exception(f'Unknown resonance type: {res_type}')
+        return registry.create(resonance, _create_from_string)
     raise Exception('The argument should be either a valid secular resonance (i.e. "nu6") or a Resonance object.')
@@ -1,9 +1,9 @@
 import numpy as np
-from scipy import signal
-from astropy.timeseries import LombScargle
 
 import resonances.config
 
+# scipy.signal and astropy are imported by the methods that use them: they take seconds to import
+
 
 class libration:
     @classmethod
@@ -286,6 +286,8 @@ class libration:
         (frequence, power)
             Return list of frequencies among with related power.
         """
+        from astropy.timeseries import LombScargle
+
         frequency, power = LombScargle(x, y).autopower(
             nyquist_factor=nyquist_factor, minimum_frequency=minimum_frequency, maximum_frequency=maximum_frequency
         )
@@ -293,6 +295,8 @@ class libration:
 
     @classmethod
     def find_peaks_with_position(cls, frequency, power, height=0.05, distance=10):
+        from scipy import signal
+
         peaks, props = signal.find_peaks(power, height=height, distance=distance, width=(None, None))
         peaks_right, peaks_left = (
             1.0 / frequency[np.rint(props['left_ips']).astype(int)],
@@ -319,6 +323,8 @@ class libration:
                 f"Cutoff frequency ({cutoff}) <= 0. " f"Adjusting normalized cutoff to {normal_cutoff} for filter stability."
             )
 
+        from scipy import signal
+
         # Get the filter coefficients
         b, a = signal.butter(order, normal_cutoff, btype='low', analog=False)
         y = signal.filtfilt(b, a, data, method="gust")
@@ -28,6 +28,10 @@ class MMR(Resonance):
     def type(self) -> str:
         return 'mmr'
 
+    def _share(self, resonance_id: int, index_of_planets):
+        self.coeff.flags.writeable = False
+        super()._share(resonance_id, index_of_planets)
+
     def __str__(self):
         return "MMR(coeff=[{}])".format(', '.join(str(e) for e in self.coeff))
 
@@ -1,166 +1,357 @@
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.layout_engine import TightLayoutEngine
+from matplotlib.ticker import MultipleLocator
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import math
+import os
+import threading
 from pathlib import Path
 
 import resonances.config
 import resonances
 
+_local = threading.local()
+# pyplot keeps global state (the style, the current figure), so only one thread may use it at a time.
+# The saved plots are drawn by the thread-local ``BodyPlotter`` (no pyplot), so they do not take the lock
+_pyplot_lock = threading.Lock()
+
+
+def body(sim, body: resonances.Body, resonance, image_type='png', max_points: int = None):
+    with _pyplot_lock:
+        plt.style.use('default')
+
+    data = plot_data(sim, body, resonance, max_points)
+    filename = plot_filename(sim.config.plot_path, body.name, data['resonance_key'], image_type)
+
+    if sim.config.plot_type in ['both', 'show']:  # pragma: no cover
+        with _pyplot_lock:
+            fig, axs = plt.subplots(7, 1, figsize=(10, 12))
+            BodyPlotter(fig, axs).render(data, filename if sim.config.plot_type == 'both' else None)
+            plt.show()
+            plt.close(fig)  # Prevents display in Jupyter Notebook
+    elif sim.config.plot_type == 'save':
+        get_plotter().render(data, filename)
 
-def body(sim, body: resonances.Body, resonance, image_type='png'):  # noqa: C901
-    plt.style.use('default')
 
-    fig, axs = plt.subplots(7, 1, figsize=(10, 12))
+def plot_data(sim, body: resonances.Body, resonance, max_points: int = None) -> dict:
+    """
+    Collect everything needed to draw the plot of a body in a resonance. The result can be sent to another process.
+
+    The time series (angle, axis, eccentricity) longer than ``max_points`` are decimated (see ``decimate``).
+    By default, ``sim.config.plot_max_points`` is used; 0 keeps the full resolution.
+    """
+    if max_points is None:
+        max_points = sim.config.plot_max_points
 
     resonance_key = resonance.to_s()
-    status = body.statuses.get(resonance_key, 0)
-    resonance_name = resonance.to_short()
     if isinstance(resonance, resonances.MMR):
         angle_data = body.angle(resonance)
-        angles_filtered = body.angles_filtered.get(resonance_key, None)
-    elif isinstance(resonance, resonances.SecularResonance):
+    else:
         angle_data = body.secular_angles.get(resonance_key, None)
-        angles_filtered = body.angles_filtered.get(resonance_key, None) if hasattr(body, 'angles_filtered') else None
 
-    fig.suptitle(
-        "{}, resonance = {}, status = {}".format(body.name, resonance_name, status),
-        fontsize=14,
-    )
+    angles_filtered = body.angles_filtered.get(resonance_key, None) if hasattr(body, 'angles_filtered') else None
 
-    axs[0].set_title('Resonant angle')
-    axs[0].set_xlim([0, abs(sim.config.tmax_yrs)])
+    times = sim.times / (2 * np.pi)
+    return {
+        'name': body.name,
+        'resonance_key': resonance_key,
+        'resonance_name': resonance.to_short(),
+        'status': body.statuses.get(resonance_key, 0),
+        'tmax_yrs': sim.config.tmax_yrs,
+        'angle': decimate(times, angle_data, max_points),
+        'angle_filtered': decimate(times, angles_filtered, max_points),
+        'axis': decimate(times, body.axis, max_points),
+        'axis_filtered': decimate(times, body.axis_filtered, max_points),
+        'ecc': decimate(times, body.ecc, max_points),
+        'periodograms': [
+            _periodogram_data(
+                body.periodogram_frequency.get(resonance_key),
+                body.periodogram_power.get(resonance_key),
+                body.periodogram_peaks.get(resonance_key),
+            ),
+            _periodogram_data(body.axis_periodogram_frequency, body.axis_periodogram_power, body.axis_periodogram_peaks),
+            _periodogram_data(
+                body.eccentricity_periodogram_frequency, body.eccentricity_periodogram_power, body.eccentricity_periodogram_peaks
+            ),
+        ],
+    }
 
-    # Adaptive tick spacing based on simulation length
-    tmax_years = sim.config.tmax_yrs
 
-    # Calculate major_tick as tmax_yrs / 5, rounded to nice values
-    major_tick = round_to_nice_value(abs(tmax_years) / 5)
-    minor_tick = major_tick // 5
+def decimate(x, y, max_points: int, columns: int = 1000, rows: int = 200):
+    """
+    Reduce a long time series for plotting without changing how it looks.
 
-    # Ensure ticks are positive for matplotlib
-    if major_tick <= 0:
-        major_tick = 1
-    if minor_tick <= 0:
-        minor_tick = 1
+    The panels are drawn with one-pixel markers, so only the set of pixels covered by the points is visible.
+    The plot area is split into a grid of ``columns`` time buckets and ``rows`` value bins (about one cell per pixel)
+    and one point is kept for every occupied cell. This is the min/max-per-bucket approach extended to the whole
+    column: the envelope of the libration and the jumps of the angle between 0 and 2pi are kept, and so are the
+    filled bands of fast oscillations. If the grid has more cells than ``max_points``, both sides are scaled down
+    by the same factor, so at most ``max_points`` points are returned.
 
-    axs[0].xaxis.set_major_locator(plt.MultipleLocator(major_tick))
-    axs[0].xaxis.set_minor_locator(plt.MultipleLocator(minor_tick))
-    if angle_data is not None:
-        axs[0].plot(sim.times / (2 * np.pi), angle_data, linestyle='', marker=',', color='black')
+    Parameters
+    ----------
+    x : array-like
+        Times
+    y : array-like or None
+        Values
+    max_points : int
+        Series not longer than this are returned unchanged, longer ones are reduced to at most this many points.
+        0 or None keeps the full series.
+    columns : int, optional
+        Number of time buckets, by default 1000 (the width of a panel in pixels)
+    rows : int, optional
+        Number of value bins, by default 200
 
-    if angles_filtered is not None:  # pragma: no cover
-        axs[1].set_title('Filtered resonant angle')
-        axs[1].plot(sim.times / (2 * np.pi), angles_filtered, linestyle='', marker=',', color='black')
-    else:
-        axs[1].set_title('Again resonant angle (no filtered available)')
-        if angle_data is not None:
-            axs[1].plot(sim.times / (2 * np.pi), angle_data, linestyle='', marker=',', color='black')
-    axs[1].sharex(axs[0])
-
-    if body.axis_filtered is not None:  # pragma: no cover
-        axs[2].set_title('Filtered semi-major axis')
-        axs[2].plot(sim.times / (2 * np.pi), body.axis_filtered, linestyle='', marker=',', color='black')
-    else:
-        axs[2].set_title('Semi-major axis')
-        axs[2].plot(sim.times / (2 * np.pi), body.axis, linestyle='', marker=',', color='black')
-    axs[2].sharex(axs[0])
-
-    axs[3].set_title('Eccentricity')
-    axs[3].plot(sim.times / (2 * np.pi), body.ecc, linestyle='', marker=',', color='black')
-    axs[3].sharex(axs[0])
-
-    axs[4].set_xlim(0, abs(tmax_years))
-    # axs[4].set_ylim(0, 0.2)
-    axs[4].axhline(y=0.05, color='r', linestyle='--')
-    axs[4].axhline(y=0.1, color='g', linestyle='--')
-    if (
-        (body.periodogram_peaks.get(resonance_key) is not None)
-        and ('peaks' in body.periodogram_peaks[resonance_key])
-        and (body.periodogram_peaks[resonance_key]['peaks'].size)
-    ):  # pragma: no cover
-        peaks = body.periodogram_peaks[resonance_key]['peaks']
-        for peak_width in body.periodogram_peaks[resonance_key]['position']:
-            axs[4].axvline(x=peak_width[0], color='gray', linestyle="dashed")
-            axs[4].axvline(x=peak_width[1], color='gray', linestyle='--')
-        axs[4].plot(
-            1.0 / body.periodogram_frequency[resonance_key][peaks],
-            body.periodogram_power[resonance_key][peaks],
-            'x',
-            color='blue',
-            markersize=10,
-        )
-        axs[4].plot(1.0 / body.periodogram_frequency[resonance_key], body.periodogram_power[resonance_key], color='black')
-
-    axs[4].set_title('Periodogram (the resonant angle)')
-    axs[5].set_title('Periodogram (semi-major axis)')
-    axs[5].set_xlim(0, abs(tmax_years))
-    # axs[5].set_ylim(0, 0.2)
-    axs[5].axhline(y=0.05, color='r', linestyle='--')
-    axs[5].axhline(y=0.1, color='g', linestyle='--')
-    if (
-        (body.axis_periodogram_peaks is not None)
-        and ('peaks' in body.axis_periodogram_peaks)
-        and (body.axis_periodogram_peaks['peaks'].size)
-    ):  # pragma: no cover
-        peaks = body.axis_periodogram_peaks['peaks']
-        for peak_width in body.axis_periodogram_peaks['position']:
-            axs[5].axvline(x=peak_width[0], color='gray', linestyle="dashed")
-            axs[5].axvline(x=peak_width[1], color='gray', linestyle='--')
-        axs[5].plot(
-            1.0 / body.axis_periodogram_frequency[peaks],
-            body.axis_periodogram_power[peaks],
-            'x',
-            color='blue',
-            markersize=10,
-        )
-        axs[5].plot(1.0 / body.axis_periodogram_frequency, body.axis_periodogram_power, color='black')
-
-        axs[5].sharex(axs[4])
-
-    axs[6].set_title('Periodogram (eccentricity)')
-    axs[6].set_xlim(0, abs(tmax_years))
-    # axs[6].set_ylim(0, 0.2)
-    axs[6].axhline(y=0.05, color='r', linestyle='--')
-    axs[6].axhline(y=0.1, color='g', linestyle='--')
-    if (
-        (body.eccentricity_periodogram_peaks is not None)
-        and ('peaks' in body.eccentricity_periodogram_peaks)
-        and (body.eccentricity_periodogram_peaks['peaks'].size)
-    ):  # pragma: no cover
-        peaks = body.eccentricity_periodogram_peaks['peaks']
-        for peak_width in body.eccentricity_periodogram_peaks['position']:
-            axs[6].axvline(x=peak_width[0], color='gray', linestyle="dashed")
-            axs[6].axvline(x=peak_width[1], color='gray', linestyle='--')
-        axs[6].plot(
-            1.0 / body.eccentricity_periodogram_frequency[peaks],
-            body.eccentricity_periodogram_power[peaks],
-            'x',
-            color='blue',
-            markersize=10,
-        )
-        axs[6].plot(1.0 / body.eccentricity_periodogram_frequency, body.eccentricity_periodogram_power, color='black')
-
-        axs[6].sharex(axs[4])
-
-    axs[0].set_ylabel(r"$\sigma$ (rad)", fontsize=12)
-    axs[1].set_ylabel(r"$\sigma_f$ (rad)", fontsize=12)
-    axs[2].set_ylabel(r"$a_f$ (AU)", fontsize=12)
-    axs[3].set_ylabel("e", fontsize=12)
-    axs[4].set_ylabel(r"$p_{\sigma}$", fontsize=12)
-    axs[5].set_ylabel(r"$p_{a}$", fontsize=12)
-    axs[6].set_ylabel(r"$p_{e}$", fontsize=12)
-
-    plt.tight_layout()
-
-    if sim.config.plot_type in ['both', 'save']:
-        # Ensure the plot directory exists before saving
-        Path(sim.config.plot_path).mkdir(parents=True, exist_ok=True)
-        plt.savefig('{}/{}_{}.{}'.format(sim.config.plot_path, body.name, resonance_key, image_type))
+    Returns
+    -------
+    tuple or None
+        (x, y) arrays in time order, or None if there is no data
+    """
+    if y is None:
+        return None
+    x = np.asarray(x)
+    y = np.asarray(y)
+    n = len(y)
+    if (not max_points) or (n <= max_points):
+        return x, y
 
-    if sim.config.plot_type in ['both', 'show']:  # pragma: no cover
-        plt.show()
+    finite = np.flatnonzero(np.isfinite(y))
+    if not finite.size:
+        return x, y
+    values = y[finite]
+    low, high = values.min(), values.max()
+    if columns * rows > max_points:
+        scale = np.sqrt(max_points / (columns * rows))
+        columns, rows = max(1, int(columns * scale)), max(1, int(rows * scale))
+
+    # buckets by index, so that the direction of time (backward integrations) does not matter
+    column = finite * columns // n
+    row = np.zeros(len(finite), dtype=np.int64)
+    if high > low:
+        row = np.minimum(((values - low) / (high - low) * rows).astype(np.int64), rows - 1)
+
+    _, first = np.unique(column * rows + row, return_index=True)
+    indices = finite[np.sort(first)]
+    return x[indices], y[indices]
+
+
+def _periodogram_data(frequency, power, peaks_data):
+    if (peaks_data is None) or ('peaks' not in peaks_data) or (not peaks_data['peaks'].size):
+        return None
+    return {'frequency': frequency, 'power': power, 'peaks': peaks_data['peaks'], 'position': peaks_data['position']}
+
+
+def plot_filename(plot_path, body_name, resonance_key, image_type='png') -> str:
+    return '{}/{}_{}.{}'.format(plot_path, body_name, resonance_key, image_type)
+
+
+class BodyPlotter:
+    """
+    The figure with 7 panels (resonant angle, axis, eccentricity, periodograms) used to plot a body in a resonance.
+
+    The figure and its artists are created only once. Every call of ``render`` just updates the data of the artists,
+    which is much faster than building a new figure for each body.
+    """
+
+    def __init__(self, fig=None, axs=None):
+        if fig is None:
+            fig = Figure(figsize=(10, 12))
+            FigureCanvasAgg(fig)
+            axs = fig.subplots(7, 1)
+        self.fig = fig
+        self.axs = axs
+        self._tmax_yrs = None
+        self._layout_done = False
+
+        self.series = [ax.plot([], [], linestyle='', marker=',', color='black')[0] for ax in axs[:4]]
+        for ax in axs[1:4]:
+            ax.sharex(axs[0])
+        axs[3].set_title('Eccentricity')
+
+        self.curves, self.peaks, self.widths = [], [], []
+        for ax in axs[4:]:
+            ax.axhline(y=0.05, color='r', linestyle='--')
+            ax.axhline(y=0.1, color='g', linestyle='--')
+            self.curves.append(ax.plot([], [], color='black')[0])
+            self.peaks.append(ax.plot([], [], 'x', color='blue', markersize=10)[0])
+            # vertical lines over the full height of the panel, like axvline
+            widths = LineCollection([], colors='gray', linestyles='--', transform=ax.get_xaxis_transform())
+            ax.add_collection(widths, autolim=False)
+            self.widths.append(widths)
+        for ax in axs[5:]:
+            ax.sharex(axs[4])
+
+        axs[4].set_title('Periodogram (the resonant angle)')
+        axs[5].set_title('Periodogram (semi-major axis)')
+        axs[6].set_title('Periodogram (eccentricity)')
+
+        axs[0].set_ylabel(r"$\sigma$ (rad)", fontsize=12)
+        axs[1].set_ylabel(r"$\sigma_f$ (rad)", fontsize=12)
+        axs[2].set_ylabel(r"$a_f$ (AU)", fontsize=12)
+        axs[3].set_ylabel("e", fontsize=12)
+        axs[4].set_ylabel(r"$p_{\sigma}$", fontsize=12)
+        axs[5].set_ylabel(r"$p_{a}$", fontsize=12)
+        axs[6].set_ylabel(r"$p_{e}$", fontsize=12)
+
+    def render(self, data: dict, filename: str = None):
+        """Draw the data (see ``plot_data``) and save it to the file if the filename is given."""
+        axs = self.axs
+        self.fig.suptitle("{}, resonance = {}, status = {}".format(data['name'], data['resonance_name'], data['status']), fontsize=14)
+        self._set_time_axis(data['tmax_yrs'])
+
+        axs[0].set_title('Resonant angle')
+        self._set_series(0, data['angle'])
+
+        if data['angle_filtered'] is not None:
+            axs[1].set_title('Filtered resonant angle')
+            self._set_series(1, data['angle_filtered'])
+        else:
+            axs[1].set_title('Again resonant angle (no filtered available)')
+            self._set_series(1, data['angle'])
+
+        if data['axis_filtered'] is not None:
+            axs[2].set_title('Filtered semi-major axis')
+            self._set_series(2, data['axis_filtered'])
+        else:
+            axs[2].set_title('Semi-major axis')
+            self._set_series(2, data['axis'])
+
+        self._set_series(3, data['ecc'])
+
+        for i, periodogram in enumerate(data['periodograms']):
+            self._set_periodogram(i, periodogram)
+
+        if not self._layout_done:
+            # like fig.tight_layout() but without a layout engine attached, which would make savefig draw everything twice
+            TightLayoutEngine().execute(self.fig)
+            self._layout_done = True
+
+        if filename is not None:
+            Path(filename).parent.mkdir(parents=True, exist_ok=True)
+            self.fig.savefig(filename)
+
+    def _set_time_axis(self, tmax_yrs):
+        if tmax_yrs == self._tmax_yrs:
+            return
+        self._tmax_yrs = tmax_yrs
+
+        # Calculate major_tick as tmax_yrs / 5, rounded to nice values. Ticks should be positive for matplotlib.
+        major_tick = max(round_to_nice_value(abs(tmax_yrs) / 5), 1)
+        minor_tick = max(major_tick // 5, 1)
+        self.axs[0].xaxis.set_major_locator(MultipleLocator(major_tick))
+        self.axs[0].xaxis.set_minor_locator(MultipleLocator(minor_tick))
+        self.axs[0].set_xlim([0, abs(tmax_yrs)])
+        self.axs[4].set_xlim(0, abs(tmax_yrs))
+
+    def _set_series(self, i, series):
+        x, y = series if series is not None else ([], [])
+        self.series[i].set_data(x, y)
+        self._autoscale(self.axs[i])
+
+    def _set_periodogram(self, i, periodogram):
+        if periodogram is None:
+            self.curves[i].set_data([], [])
+            self.peaks[i].set_data([], [])
+            self.widths[i].set_segments([])
+        else:
+            peaks = periodogram['peaks']
+            self.curves[i].set_data(1.0 / periodogram['frequency'], periodogram['power'])
+            self.peaks[i].set_data(1.0 / periodogram['frequency'][peaks], periodogram['power'][peaks])
+            self.widths[i].set_segments([[(x, 0), (x, 1)] for peak_width in periodogram['position'] for x in peak_width])
+        self._autoscale(self.axs[4 + i])
+
+    @staticmethod
+    def _autoscale(ax):
+        ax.relim()
+        ax.autoscale_view(scalex=False)
+
+
+def get_plotter() -> BodyPlotter:
+    """The figure template of the current thread (or process)."""
+    if getattr(_local, 'plotter', None) is None:
+        _local.plotter = BodyPlotter()
+    return _local.plotter
+
+
+def _init_worker():  # pragma: no cover
+    plt.style.use('default')
+
+
+def _render_in_worker(data, filename):  # pragma: no cover
+    get_plotter().render(data, filename)
+    return filename
+
+
+class BatchRenderer:
+    """
+    Renders plots in a pool of worker processes. Every worker creates the figure template once and reuses it.
+
+    The number of plots waiting for a worker is limited, so that the data of thousands of bodies is not kept in memory.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None):
+        workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        self.max_pending = max_pending or 4 * workers
+        self.futures = []
+
+    def submit(self, data: dict, filename: str):
+        while len(self.futures) >= self.max_pending:
+            self._collect(self.futures.pop(0))
+        self.futures.append(self.executor.submit(_render_in_worker, data, filename))
+
+    def close(self):
+        """Wait for all plots and stop the workers. Raises the first error happened in the workers."""
+        try:
+            while self.futures:
+                self._collect(self.futures.pop(0))
+        finally:
+            self.executor.shutdown(cancel_futures=True)
+
+    def _collect(self, future):
+        future.result()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def render_batch(sim, items, image_type='png', workers: int = None, max_points: int = None):
+    """
+    Save plots for many (body, resonance) pairs of a simulation using a pool of processes.
+
+    Parameters
+    ----------
+    sim : resonances.Simulation
+        The simulation after run (the libration data should be calculated)
+    items : list of (Body, Resonance)
+        Pairs to plot
+    image_type : str, optional
+        Extension of the images, by default 'png'
+    workers : int, optional
+        Number of processes, by default the number of CPUs
+    max_points : int, optional
+        Maximum number of points in the time series panels, by default ``sim.config.plot_max_points`` (0 is full resolution)
 
-    plt.close(fig)  # Prevents display in Jupyter Notebook
+    Returns
+    -------
+    list of str
+        Saved filenames
+    """
+    filenames = []
+    with BatchRenderer(workers) as renderer:
+        for body_obj, resonance in items:
+            data = plot_data(sim, body_obj, resonance, max_points)
+            filename = plot_filename(sim.config.plot_path, body_obj.name, data['resonance_key'], image_type)
+            renderer.submit(data, filename)
+            filenames.append(filename)
+    return filenames
 
 
 def round_to_nice_value(value):
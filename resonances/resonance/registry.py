@@ -0,0 +1,92 @@
+"""
+Process-wide registry of shared resonances.
+
+Every distinct resonance (by its key ``to_s()``) is created once and shared by all bodies, matrices and finders.
+The shared instance is immutable, has a stable integer ``id`` (derived from the key, so the same resonance has
+the same id in every process, in the pool workers and after ``clear()``) and the precomputed ``key``.
+The notations that were already parsed are remembered, so that ``create_resonance('4J-2S-1')`` for the second body
+is a dictionary lookup.
+"""
+
+import hashlib
+import threading
+from typing import Callable, Optional
+
+from resonances.data import const
+from resonances.resonance.resonance import Resonance
+
+
+def planet_indexes(planets_names) -> Optional[list]:
+    """Indexes of the planets in the simulation (see ``const.SIMULATION_PLANETS``) or None if a planet is unknown."""
+    try:
+        return [const.SIMULATION_PLANETS.index(planet) for planet in planets_names]
+    except ValueError:
+        return None
+
+
+def resonance_id(key: str) -> int:
+    """Stable id of the resonance with the key ``to_s()``: the first 63 bits of its BLAKE2 hash (fits int64)."""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big') >> 1
+
+
+class ResonanceRegistry:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_key = {}
+        self._by_id = {}
+        self._notations = {}
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def __iter__(self):
+        return iter(list(self._by_key.values()))
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._by_key
+
+    def intern(self, resonance: Resonance) -> Resonance:
+        """Shared instance equal to the resonance. If there is none yet, the given object becomes the shared one."""
+        if resonance.id is not None and resonance is self._by_key.get(resonance.key):
+            return resonance
+        key = resonance.to_s()
+        with self._lock:
+            shared = self._by_key.get(key)
+            if shared is None:
+                id = resonance_id(key)
+                if id in self._by_id:
+                    raise ValueError(f'The resonances {key} and {self._by_id[id].key} have the same id {id}')
+                resonance._share(id, planet_indexes(resonance.planets_names))
+                self._by_key[key] = resonance
+                self._by_id[id] = resonance
+                shared = resonance
+            return shared
+
+    def create(self, notation: str, factory: Callable[[str], Resonance]) -> Resonance:
+        """
+        Shared resonance for the notation. ``factory`` creates the object from the notation if it has not been seen yet.
+
+        The notations are remembered per factory because they might be interpreted differently
+        (i.e. a formula of a secular resonance in ``SecularMatrix`` and a string in ``create_resonance``).
+        """
+        shared = self._notations.get((factory, notation))
+        if shared is None:
+            shared = self.intern(factory(notation))
+            self._notations[(factory, notation)] = shared
+        return shared
+
+    def get(self, id_or_key) -> Resonance:
+        """Shared resonance by its id or key."""
+        if isinstance(id_or_key, str):
+            return self._by_key[id_or_key]
+        return self._by_id[id_or_key]
+
+    def clear(self):
+        """Forget all resonances. The objects handed out before stay valid but are not shared anymore."""
+        with self._lock:
+            self._by_key = {}
+            self._by_id = {}
+            self._notations = {}
+
+
+registry = ResonanceRegistry()
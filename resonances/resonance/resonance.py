@@ -2,6 +2,12 @@ from abc import ABC, abstractmethod
 
 
 class Resonance(ABC):
+    # set by the registry (see resonances.resonance.registry) for the shared instances
+    id = None
+    key = None
+    index_of_planets = None
+    _frozen = False
+
     @property
     @abstractmethod
     def type(self) -> str:
@@ -14,3 +20,17 @@ class Resonance(ABC):
     @abstractmethod
     def to_short(self):
         pass
+
+    def __setattr__(self, name, value):
+        # private attributes are lazy caches (i.e. the resonant axis), they may be filled in a shared instance
+        if self._frozen and not name.startswith('_'):
+            raise AttributeError(f'The resonance {self.key} is shared and cannot be changed. Create a new object to modify it.')
+        super().__setattr__(name, value)
+
+    def _share(self, resonance_id: int, index_of_planets):
+        """Make the resonance a shared immutable instance with the given id."""
+        self._frozen = False
+        self.id = resonance_id
+        self.key = self.to_s()
+        self.index_of_planets = index_of_planets
+        self._frozen = True
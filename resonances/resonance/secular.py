@@ -1,4 +1,4 @@
-import rebound
+from resonances.data.util import mod2pi
 from resonances.resonance.resonance import Resonance
 
 
@@ -25,7 +25,6 @@ class SecularResonance(Resonance):
         self.resonance_type = resonance_type
         self.planet_name = planet_name
         self.planets_names = [planet_name]
-        self.index_of_planets = None
 
     @property
     def type(self) -> str:
@@ -41,6 +40,8 @@ class SecularResonance(Resonance):
 
     def to_s(self):
         """String representation of the secular resonance."""
+        if self.key is not None:
+            return self.key
         return f"{self.resonance_type}_{self.planet_name}"
 
     def to_short(self):
@@ -112,7 +113,7 @@ class Nu6Resonance(SecularResonance):
         saturn = planets[0]
         body_varpi = body.Omega + body.omega
         saturn_varpi = saturn.Omega + saturn.omega
-        angle = rebound.mod2pi(body_varpi - saturn_varpi)
+        angle = mod2pi(body_varpi - saturn_varpi)
 
         return angle
 
@@ -147,7 +148,7 @@ class Nu5Resonance(SecularResonance):
         jupiter = planets[0]
         body_varpi = body.Omega + body.omega
         jupiter_varpi = jupiter.Omega + jupiter.omega
-        angle = rebound.mod2pi(body_varpi - jupiter_varpi)
+        angle = mod2pi(body_varpi - jupiter_varpi)
 
         return angle
 
@@ -181,7 +182,7 @@ class Nu16Resonance(SecularResonance):
             The resonant angle in radians
         """
         saturn = planets[0]
-        angle = rebound.mod2pi(body.Omega - saturn.Omega)
+        angle = mod2pi(body.Omega - saturn.Omega)
 
         return angle
 
@@ -417,6 +418,8 @@ class GeneralSecularResonance(SecularResonance):
 
     def to_s(self):
         """String representation of the general secular resonance."""
+        if self.key is not None:
+            return self.key
         return self.resonance_type
 
     def calc_angle(self, body, planets):
@@ -453,4 +456,4 @@ class GeneralSecularResonance(SecularResonance):
             for i, coeff in enumerate(self.coeffs['Omega'][1:]):
                 angle += coeff * planets[i].Omega
 
-        return rebound.mod2pi(angle)
+        return mod2pi(angle)
@@ -3,7 +3,6 @@ import re
 from resonances.resonance.mmr import MMR
 import resonances.data.util as util
 from resonances.data import const
-import rebound
 
 
 class ThreeBody(MMR):
@@ -19,7 +18,7 @@ class ThreeBody(MMR):
     def calc_angle(self, body, planets):
         body1 = planets[0]
         body2 = planets[1]
-        angle = rebound.mod2pi(
+        angle = util.mod2pi(
             self.coeff[0] * body1.l
             + self.coeff[1] * body2.l
             + self.coeff[2] * body.l
@@ -57,6 +56,8 @@ class ThreeBody(MMR):
         return coeff, planets_names
 
     def to_s(self):
+        if self.key is not None:
+            return self.key
         s = '{:d}{:.1}{:+d}{:.1}{:+d}{:+d}{:+d}{:+d}'.format(
             int(self.coeff[0]),
             self.get_letter_from_planet_name(self.planets_names[0]),
@@ -137,6 +138,38 @@ class ThreeBody(MMR):
 
         return a
 
+    @staticmethod
+    def calculate_resonant_axes(planet1: str, planet2: str, m1: np.ndarray, m2: np.ndarray, m: np.ndarray) -> np.ndarray:
+        """
+        Vectorised ``calculate_resonant_axis`` for many resonances with the same planets.
+
+        The coefficients are arrays (``m1``, ``m2``, ``m`` for the planets and the body; the last one follows from
+        the D'Alembert rule). The operations are the same as in the scalar version, so the values are identical.
+        Where the scalar version raises an exception (negative mean motion), the result is NaN.
+        """
+        m1, m2, m = (np.asarray(x) for x in (m1, m2, m))
+        p = 0 - m1 - m2 - m
+
+        n1 = util.mean_motion_from_axis(const.PLANETS_AXIS[planet1])
+        n2 = util.mean_motion_from_axis(const.PLANETS_AXIS[planet2])
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            n = (-m1 * n1 - m2 * n2) / m
+            valid = n > 0
+            a = util.power(const.K / np.where(valid, n, 1.0), 2.0 / 3)
+
+            la = np.zeros(len(a))
+            for planet in const.SOLAR_SYSTEM:
+                ap = const.PLANETS_AXIS[planet]
+                mp = const.PLANETS_MASS[planet]
+                outer = (3 * np.pi / 2 * mp / (1.0 + mp) ** 1.5 * (ap**2 / util.power(a, 3.5))) / const.DAYS_IN_YEAR
+                inner = (3 * np.pi / 2 * mp * util.power(np.sqrt(a) / ap, 3)) / const.DAYS_IN_YEAR
+                la = la + np.where(a > ap, outer, inner)
+
+            n = (-m1 * n1 - m2 * n2 - p * la) / m
+            valid &= n > 0
+            return np.where(valid, util.power(const.K / np.where(valid, n, 1.0), 2.0 / 3), np.nan)
+
     # Yes, I know that it is a bad practice to keep commented code.
     # However, this might be useful for some edge cases.
     # def another_calculate_axis(self):
@@ -1,8 +1,8 @@
 import numpy as np
 import re
 from resonances.resonance.mmr import MMR
+import resonances.data.util as util
 from resonances.data import const
-import rebound
 
 
 class TwoBody(MMR):
@@ -17,7 +17,7 @@ class TwoBody(MMR):
 
     def calc_angle(self, body, planets):
         body1 = planets[0]
-        angle = rebound.mod2pi(
+        angle = util.mod2pi(
             self.coeff[0] * body1.l
             + self.coeff[1] * body.l
             + self.coeff[2] * (body1.Omega + body1.omega)
@@ -45,6 +45,8 @@ class TwoBody(MMR):
         return coeff, planets_names
 
     def to_s(self):
+        if self.key is not None:
+            return self.key
         s = '{:d}{:.1}{:+d}{:+d}{:+d}'.format(
             int(self.coeff[0]),
             self.get_letter_from_planet_name(self.planets_names[0]),
@@ -70,3 +72,9 @@ class TwoBody(MMR):
         axis = planet_axis * (((self.coeff[1] / self.coeff[0]) ** (2.0)) ** (1.0 / 3))
 
         return axis
+
+    @staticmethod
+    def calculate_resonant_axes(planet: str, m1: np.ndarray, m: np.ndarray) -> np.ndarray:
+        """Vectorised ``calculate_resonant_axis`` for many resonances with the same planet (``m1`` and ``m`` are arrays)."""
+        planet_axis = const.PLANETS_AXIS[planet]
+        return planet_axis * util.power(util.power(np.asarray(m) / np.asarray(m1), 2.0), 1.0 / 3)
@@ -0,0 +1,229 @@
+"""
+Results catalog: an SQLite database that collects simulation summaries from all runs.
+
+Unlike ``summary.csv`` in each run directory, the catalog can be written by several processes at once (WAL mode)
+and queried across runs, i.e. ``resonances.results.query(resonance='4J-2S-1', min_status=1)``.
+"""
+
+import datetime
+import os
+import sqlite3
+from pathlib import Path
+from typing import List, Union
+
+import pandas as pd
+
+import resonances
+
+SUMMARY_COLUMNS = [
+    'name',
+    'resonance',
+    'type',
+    'status',
+    'pure',
+    'num_libration_periods',
+    'max_libration_length',
+    'monotony',
+    'overlapping',
+    'a',
+    'e',
+    'inc',
+    'Omega',
+    'omega',
+    'M',
+]
+
+# SQLite column names are case-insensitive, so Omega and omega are stored under other names
+DB_COLUMNS = {column: {'Omega': 'node', 'omega': 'peri'}.get(column, column) for column in SUMMARY_COLUMNS}
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS runs (
+        run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_name TEXT,
+        date TEXT,
+        source TEXT,
+        tmax REAL,
+        dt REAL,
+        integrator TEXT,
+        save_path TEXT,
+        created_at TEXT
+    )""",
+    """CREATE TABLE IF NOT EXISTS results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        run_id INTEGER NOT NULL REFERENCES runs(run_id),
+        name TEXT NOT NULL,
+        resonance TEXT NOT NULL,
+        type TEXT,
+        status INTEGER,
+        pure INTEGER,
+        num_libration_periods INTEGER,
+        max_libration_length REAL,
+        monotony REAL,
+        overlapping TEXT,
+        a REAL,
+        e REAL,
+        inc REAL,
+        node REAL,
+        peri REAL,
+        M REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS idx_results_name ON results(name)",
+    "CREATE INDEX IF NOT EXISTS idx_results_resonance ON results(resonance, status)",
+    "CREATE INDEX IF NOT EXISTS idx_results_status ON results(status)",
+    "CREATE INDEX IF NOT EXISTS idx_results_run_id ON results(run_id)",
+]
+
+
+def catalog_full_filename(filename: str = None) -> str:
+    """Absolute path of the results database (``RESULTS_DB`` by default, relative to the working directory)."""
+    if filename is None:
+        filename = resonances.config.get('RESULTS_DB')
+    path_obj = Path(filename)
+    if not path_obj.is_absolute():
+        path_obj = Path(os.getcwd()) / path_obj
+    return str(path_obj)
+
+
+class ResultsCatalog:
+    def __init__(self, filename: str = None):
+        self.filename = catalog_full_filename(filename)
+        Path(self.filename).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            with conn:
+                for statement in SCHEMA:
+                    conn.execute(statement)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # the timeout makes concurrent writers wait for the lock instead of failing
+        conn = sqlite3.connect(self.filename, timeout=60)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def add_run(self, config) -> int:
+        """Register a simulation run and return its id."""
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    'INSERT INTO runs (run_name, date, source, tmax, dt, integrator, save_path, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        config.name,
+                        str(config.date),
+                        config.source,
+                        config.tmax,
+                        config.dt,
+                        config.integrator,
+                        config.save_path,
+                        datetime.datetime.now().isoformat(timespec='seconds'),
+                    ),
+                )
+            return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def add_results(self, run_id: int, df: pd.DataFrame, batch_size: int = 10000):
+        """Insert a summary dataframe (see ``DataManager.get_simulation_summary``). Every batch is one transaction."""
+        rows = df[SUMMARY_COLUMNS].astype(object).where(df[SUMMARY_COLUMNS].notna(), None).values.tolist()
+        sql = 'INSERT INTO results (run_id, {}) VALUES (?, {})'.format(
+            ', '.join(DB_COLUMNS.values()), ', '.join('?' * len(SUMMARY_COLUMNS))
+        )
+
+        conn = self._connect()
+        try:
+            for i in range(0, len(rows), batch_size):
+                with conn:
+                    conn.executemany(sql, [[run_id] + row for row in rows[i : i + batch_size]])
+        finally:
+            conn.close()
+
+    def query(
+        self,
+        resonance: Union[str, List[str]] = None,
+        name: Union[str, List[str]] = None,
+        status: Union[int, List[int]] = None,
+        min_status: int = None,
+        run_id: Union[int, List[int]] = None,
+        run_name: str = None,
+    ) -> pd.DataFrame:
+        """
+        Select results from all runs.
+
+        Parameters
+        ----------
+        resonance : str or list of str, optional
+            Resonance(s) in full (``4J-2S-1+0+0-1``) or short (``4J-2S-1``) notation
+        name : str or list of str, optional
+            Name(s) of the bodies
+        status : int or list of int, optional
+            Exact status value(s)
+        min_status : int, optional
+            Minimal status, i.e. ``min_status=1`` returns only resonant bodies
+        run_id : int or list of int, optional
+            Id(s) of the runs
+        run_name : str, optional
+            Name of the runs (``Simulation(name=...)``)
+
+        Returns
+        -------
+        pd.DataFrame
+            Results joined with the run data
+        """
+        conditions, params = [], []
+
+        if resonance is not None:
+            values = [self._resonance_key(v) for v in self._as_list(resonance)]
+            conditions.append(self._in_clause('r.resonance', values, params))
+        if name is not None:
+            conditions.append(self._in_clause('r.name', [str(v) for v in self._as_list(name)], params))
+        if status is not None:
+            conditions.append(self._in_clause('r.status', self._as_list(status), params))
+        if min_status is not None:
+            conditions.append('r.status >= ?')
+            params.append(min_status)
+        if run_id is not None:
+            conditions.append(self._in_clause('r.run_id', self._as_list(run_id), params))
+        if run_name is not None:
+            conditions.append('runs.run_name = ?')
+            params.append(run_name)
+
+        columns = ', '.join(f'r.{db_column} AS "{column}"' for column, db_column in DB_COLUMNS.items())
+        sql = f'SELECT r.run_id, runs.run_name, runs.date, {columns} FROM results r JOIN runs ON runs.run_id = r.run_id'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY r.run_id, r.id'
+
+        conn = self._connect()
+        try:
+            df = pd.read_sql_query(sql, conn, params=params)
+        finally:
+            conn.close()
+        df['pure'] = df['pure'].astype(bool)
+        return df
+
+    @staticmethod
+    def _resonance_key(resonance) -> str:
+        """Convert a resonance (object, short or full notation) to the key stored in the summary."""
+        if isinstance(resonance, resonances.Resonance):
+            return resonance.to_s()
+        try:
+            return resonances.create_resonance(resonance).to_s()
+        except Exception:
+            return resonance  # already in the full notation
+
+    @staticmethod
+    def _as_list(value) -> list:
+        return value if isinstance(value, (list, tuple)) else [value]
+
+    @staticmethod
+    def _in_clause(column: str, values: list, params: list) -> str:
+        params.extend(values)
+        return '{} IN ({})'.format(column, ', '.join('?' * len(values)))
+
+
+def query(filename: str = None, **kwargs) -> pd.DataFrame:
+    """Shortcut for ``ResultsCatalog(filename).query(**kwargs)``."""
+    return ResultsCatalog(filename).query(**kwargs)
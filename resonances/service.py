@@ -0,0 +1,342 @@
+"""
+Resident local service that answers "is the asteroid X in the resonance Y?" without the startup of a new process.
+
+The service keeps everything that a single check loads from disk or from the network in memory: the matrices of
+MMRs (``TwoBodyMatrix`` and ``ThreeBodyMatrix``), the snapshots of the Solar System for the last ``max_snapshots``
+dates and the elements of the last ``max_elements`` asteroids. The check requests that arrive within ``window``
+seconds (up to ``max_batch`` of them) are run together in one ``Simulation`` per date and settings, so concurrent
+requests share the integration of the planets.
+
+HTTP API (on localhost or on a Unix socket)::
+
+    POST /check    {"asteroid": 463, "resonance": "4J-2S-1"}   (Content-Type: application/json)
+                   {"asteroid": {"a": 2.77, "e": 0.07, ...}, "resonance": ["4J-2S-1", "nu6"], "simulation": {"tmax": 2000}}
+                   {"asteroid": 463, "planets": ["Jupiter", "Saturn"]}   (the MMRs are found by the semi-major axis)
+    GET /health    the state of the caches and the number of served requests
+
+A request may change only the parameters of the simulation in ``REQUEST_SIMULATION``. The service writes no files:
+nothing is saved or plotted, the caches of the results and of the planets are off, and the Solar System for a date
+without the cache file is taken from Horizons into memory only.
+
+The response of a check has the classification of every resonance and the latency of the request (seconds)::
+
+    {"asteroid": 463, "results": [{"resonance": "4J-2S-1+0+0-1", "type": "mmr", "status": 2, ...}],
+     "latency": {"queue": ..., "elements": ..., "run": ..., "total": ...}, "batch": 3}
+
+Start it with ``python -m resonances serve --port 8765`` (or ``--socket PATH``).
+"""
+
+import json
+import queue
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import resonances
+from resonances.simulation.result_cache import _plain
+
+DEFAULT_SIMULATION = {'save': None, 'plot': None, 'save_summary': False, 'planets_cache': False, 'result_cache': False}
+# the parameters of ``Simulation`` that a request may change (none of them makes the simulation write files)
+REQUEST_SIMULATION = [
+    'date',
+    'tmax',
+    'dt',
+    'Nout',
+    'integrator',
+    'integrator_corrector',
+    'integrator_safe_mode',
+    'oscillations_cutoff',
+    'oscillations_filter_order',
+    'periodogram_frequency_min',
+    'periodogram_frequency_max',
+    'periodogram_critical',
+    'periodogram_soft',
+    'libration_period_critical',
+    'libration_monotony_critical',
+    'libration_period_min',
+]
+
+
+class CheckRequest:
+    """A check waiting in the queue of the service."""
+
+    def __init__(self, data: dict, simulation: dict):
+        if 'asteroid' not in data:
+            raise ValueError('The request should have the asteroid (its number, name or elements)')
+        self.asteroid = data['asteroid']
+        self.resonance = data.get('resonance')
+        self.planets = data.get('planets')
+        self.sigma2 = data.get('sigma2', 0.1)
+        self.sigma3 = data.get('sigma3', 0.02)
+        requested = data.get('simulation') or {}
+        if not isinstance(requested, dict):
+            raise ValueError('The simulation of the request should be an object')
+        unknown = sorted(set(requested) - set(REQUEST_SIMULATION))
+        if len(unknown) > 0:
+            raise ValueError(f'The request cannot set {", ".join(unknown)}. Allowed: {", ".join(REQUEST_SIMULATION)}')
+        self.simulation = {**simulation, **requested, **DEFAULT_SIMULATION}
+        self.body = None
+        self.future = Future()
+        self.received = time.perf_counter()
+        self.latency = {}
+
+    def key(self) -> str:
+        """The requests with the same key are run in the same simulation."""
+        return json.dumps(self.simulation, sort_keys=True, default=str)
+
+
+class CheckService:
+    """Warm caches and the micro-batching of check requests (see the module docstring)."""
+
+    def __init__(
+        self, simulation: dict = None, window: float = 0.05, max_batch: int = 64, max_elements: int = 10000, max_snapshots: int = 16
+    ):
+        self.simulation = {**DEFAULT_SIMULATION, **(simulation or {})}
+        self.window = window
+        self.max_batch = max_batch
+        # the least recently used elements and snapshots are dropped
+        self.max_elements = max_elements
+        self.max_snapshots = max_snapshots
+        self.elements = OrderedDict()
+        self.snapshots = OrderedDict()
+        self.served = 0
+        self.batches = 0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def warm(self):
+        """Load the matrices of MMRs and the Solar System for the default date."""
+        resonances.ThreeBodyMatrix.index()
+        resonances.TwoBodyMatrix.index()
+        self.create_simulation(dict(self.simulation))
+
+    def start(self) -> 'CheckService':
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='resonances-service', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, data: dict) -> Future:
+        """Put the check into the queue. The future gets the response (see the module docstring)."""
+        request = CheckRequest(data, self.simulation)
+        self._queue.put(request)
+        return request.future
+
+    def check(self, data: dict, timeout: float = None) -> dict:
+        return self.submit(data).result(timeout)
+
+    def health(self) -> dict:
+        return {
+            'status': 'ok',
+            'served': self.served,
+            'batches': self.batches,
+            'waiting': self._queue.qsize(),
+            'elements': len(self.elements),
+            'snapshots': len(self.snapshots),
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.perf_counter() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            groups = {}
+            for request in batch:
+                groups.setdefault(request.key(), []).append(request)
+            for requests in groups.values():
+                self.run_batch(requests)
+
+    def create_simulation(self, settings: dict) -> resonances.Simulation:
+        """Simulation with a copy of the cached snapshot of the Solar System for its date."""
+        sim = resonances.Simulation(**{key: value for key, value in settings.items() if key != 'Nout'})
+        if 'Nout' in settings:
+            sim.config.Nout = settings['Nout']
+        key = sim.config.date.timestamp()
+        with self._lock:
+            if key not in self.snapshots:
+                sim.create_solar_system(save=False)
+                _remember(self.snapshots, key, sim.integration_engine.sim.copy(), self.max_snapshots)
+            self.snapshots.move_to_end(key)
+            sim.integration_engine.sim = self.snapshots[key].copy()
+        return sim
+
+    def get_elements(self, sim: resonances.Simulation, asteroid) -> dict:
+        """Elements of the asteroid (from the cache, from AstDyS or Horizons, or given in the request)."""
+        if isinstance(asteroid, dict):
+            return asteroid
+        key = (sim.config.source, sim.config.date.timestamp(), str(asteroid))
+        if key not in self.elements:
+            _remember(self.elements, key, sim.body_manager.get_body_elements(asteroid), self.max_elements)
+        self.elements.move_to_end(key)
+        return dict(self.elements[key])
+
+    def add_request(self, sim: resonances.Simulation, request: CheckRequest):
+        """Add the body of the request with its resonances (found by the semi-major axis if not given)."""
+        name = f'{len(sim.bodies)}-{"elements" if isinstance(request.asteroid, dict) else request.asteroid}'
+        elem = self.get_elements(sim, request.asteroid)
+        found = request.resonance
+        if found is None:
+            found = resonances.find_mmrs(elem['a'], planets=request.planets, sigma2=request.sigma2, sigma3=request.sigma3)
+        if not isinstance(found, list) or len(found) > 0:
+            sim.add_body(elem, found, name=name)
+            request.body = sim.bodies[-1]
+
+    def run_batch(self, requests: list):
+        """Run the requests with the same settings in one simulation and set their futures."""
+        start = time.perf_counter()
+        self.batches += 1
+        try:
+            sim = self.create_simulation(requests[0].simulation)
+        except Exception as e:
+            _fail(requests, e)
+            return
+
+        added = []
+        for request in requests:
+            request.latency['queue'] = start - request.received
+            fetched = time.perf_counter()
+            try:
+                self.add_request(sim, request)
+            except Exception as e:
+                request.future.set_exception(e)
+                continue
+            request.latency['elements'] = time.perf_counter() - fetched
+            added.append(request)
+
+        run = time.perf_counter()
+        try:
+            if len(sim.bodies) > 0:
+                sim.run()
+        except Exception as e:
+            _fail(added, e)
+            return
+        finished = time.perf_counter()
+
+        for request in added:
+            request.latency['run'] = finished - run
+            request.latency['total'] = finished - request.received
+            body = request.body
+            results = [] if body is None else [response_entry(body, resonance) for resonance in body.mmrs + body.secular_resonances]
+            self.served += 1
+            request.future.set_result(
+                {'asteroid': request.asteroid, 'results': results, 'latency': request.latency, 'batch': len(requests)}
+            )
+
+
+def _remember(cache: OrderedDict, key, value, size: int):
+    cache[key] = value
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
+def _fail(requests: list, error: Exception):
+    for request in requests:
+        request.future.set_exception(error)
+
+
+def response_entry(body: resonances.Body, resonance: resonances.Resonance) -> dict:
+    return {'resonance': resonance.to_s(), 'type': resonance.type, **_plain(body.resonance_entry(resonance))}
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON over HTTP for ``CheckService`` (the service is ``self.server.service``)."""
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/health':
+            self._reply(200, self.server.service.health())
+        else:
+            self._reply(404, {'error': f'Unknown path {self.path}'})
+
+    def do_POST(self):
+        if self.path.rstrip('/') != '/check':
+            self._reply(404, {'error': f'Unknown path {self.path}'})
+            return
+        # not a "simple" request of a browser: a web page cannot send it to localhost without a CORS preflight
+        if self.headers.get('Content-Type', '').split(';')[0].strip() != 'application/json':
+            self._reply(415, {'error': 'The request should have Content-Type: application/json'})
+            return
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            self._reply(200, self.server.service.check(data, self.server.timeout_seconds))
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, {'error': str(e)})
+        except Exception as e:
+            self._reply(500, {'error': str(e)})
+
+    def _reply(self, code: int, data: dict):
+        body = json.dumps(_plain(data), default=str).encode()
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # the client address of a Unix socket is empty, so the default logging to stderr is not used
+        resonances.logger.debug(f'service: {format % args}')
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def create_server(service: CheckService, host: str = '127.0.0.1', port: int = 8765, socket_path: str = None, timeout: float = 600.0):
+    """HTTP server of the service on ``host:port`` or on the Unix socket ``socket_path`` (not started)."""
+    if socket_path is not None:
+        # the socket of a stopped service is left on disk
+        if Path(socket_path).is_socket():
+            Path(socket_path).unlink()
+        server = UnixHTTPServer(socket_path, ServiceHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.service = service
+    server.timeout_seconds = timeout
+    return server
+
+
+def serve(
+    simulation: dict = None,
+    host: str = '127.0.0.1',
+    port: int = 8765,
+    socket_path: str = None,
+    window: float = 0.05,
+    max_batch: int = 64,
+    warm: bool = True,
+):  # pragma: no cover
+    """Run the service until it is interrupted."""
+    service = CheckService(simulation, window=window, max_batch=max_batch)
+    if warm:
+        service.warm()
+    service.start()
+    server = create_server(service, host, port, socket_path)
+    resonances.logger.info(f'The service listens on {socket_path or f"{host}:{port}"}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
@@ -2,6 +2,7 @@ from .config import SimulationConfig
 from .body_manager import BodyManager
 from .integration import IntegrationEngine
 from .data_manager import DataManager
+from .writer import AsyncWriter
 from .simulation import Simulation
 
-__all__ = ['SimulationConfig', 'BodyManager', 'IntegrationEngine', 'DataManager', 'Simulation']
+__all__ = ['SimulationConfig', 'BodyManager', 'IntegrationEngine', 'DataManager', 'AsyncWriter', 'Simulation']
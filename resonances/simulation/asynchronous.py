@@ -0,0 +1,113 @@
+"""
+Asyncio interface of ``Simulation``.
+
+- ``add_bodies_async`` fetches the elements of many asteroids concurrently (in threads: astroquery blocks) with
+  at most ``concurrency`` requests at a time and at most ``rate`` requests per second;
+- ``results_async`` splits the bodies into parts, runs every part (the integration, the analysis and the saving) in
+  an executor and yields the bodies of a part as soon as it is done;
+- ``run_async`` runs all parts and returns when every body is done.
+
+A part is an independent copy of the simulation with its bodies, so it can be sent to a ``ProcessPoolExecutor``.
+Every part integrates the planets again, so by default there is one part per worker of the executor (one part without
+an executor). A smaller ``chunk_size`` yields the first bodies sooner at the cost of more integrations.
+The results (the series and the classification) are copied back into the bodies of the simulation, which keep
+their resonances. Without an executor, the default executor of the event loop (threads) is used.
+"""
+
+import asyncio
+import math
+import pickle
+import time
+from typing import List
+
+import resonances
+
+
+class RateLimiter:
+    """At most ``rate`` calls of ``wait`` per second (no limit if ``rate`` is None)."""
+
+    def __init__(self, rate: float = None):
+        self.rate = rate
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if self.rate is None:
+            return
+        async with self._lock:
+            delay = self._next - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = max(self._next, time.monotonic()) + 1.0 / self.rate
+
+
+async def fetch_elements(body_manager, bodies: list, concurrency: int = 4, rate: float = None) -> List[dict]:
+    """Elements of the bodies (numbers, names or elements) in the same order, fetched concurrently."""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+
+    async def fetch(body):
+        if isinstance(body, dict):
+            return body
+        async with semaphore:
+            await limiter.wait()
+            return await loop.run_in_executor(None, body_manager.get_body_elements, body)
+
+    return list(await asyncio.gather(*[fetch(body) for body in bodies]))
+
+
+def create_part(sim, bodies: list):
+    """Independent copy of the simulation (not run) with only ``bodies`` and without the summary."""
+    state = (sim.body_manager.bodies, sim.shared_integration, sim.config.save_summary)
+    sim.body_manager.bodies, sim.shared_integration, sim.config.save_summary = bodies, None, False
+    try:
+        return pickle.loads(pickle.dumps(sim))
+    finally:
+        sim.body_manager.bodies, sim.shared_integration, sim.config.save_summary = state
+
+
+def run_part(sim):
+    """Run the part in the executor. Returns the times and the bodies with the results."""
+    sim.run()
+    return sim.times, sim.bodies
+
+
+def restore_results(target: resonances.Body, source: resonances.Body):
+    """Copy the results of the body run in a part into the body of the simulation (its resonances are kept)."""
+    for key, value in source.__dict__.items():
+        if key not in ('mmrs', 'secular_resonances', 'initial_data', 'name'):
+            setattr(target, key, value)
+
+
+def default_chunk_size(count: int, executor=None) -> int:
+    """About one part per worker of the executor (``max_workers`` of the standard executors), one part without it."""
+    workers = getattr(executor, '_max_workers', None) or 1
+    return max(1, math.ceil(count / workers))
+
+
+async def results_async(sim, executor=None, chunk_size: int = None):
+    """Run the simulation in parts and yield its bodies as their parts are done (see the module docstring)."""
+    loop = asyncio.get_running_loop()
+    bodies = list(sim.bodies)
+    if sim.integration_engine.sim is None and sim.config.engine != 'secular':
+        sim.create_solar_system()
+
+    async def run(part):
+        return part, await loop.run_in_executor(executor, run_part, create_part(sim, part))
+
+    size = default_chunk_size(len(bodies), executor) if chunk_size is None else max(1, chunk_size)
+    tasks = [asyncio.ensure_future(run(bodies[i : i + size])) for i in range(0, len(bodies), size)]
+    try:
+        for task in asyncio.as_completed(tasks):
+            part, (times, done) = await task
+            sim.times = times
+            for target, source in zip(part, done):
+                restore_results(target, source)
+                yield target
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if sim.config.save_summary:
+        sim.data_manager.save_simulation_summary(sim.bodies)
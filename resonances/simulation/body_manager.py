@@ -1,10 +1,14 @@
 from typing import List, Union
 
+import numpy as np
+
 import resonances
-import astdys
-import resonances.horizons
+from resonances.data import const
+from . import kepler
 from .config import SimulationConfig
 
+ELEMENTS = ['a', 'e', 'inc', 'Omega', 'omega', 'M']
+
 
 class BodyManager:
     """Manages addition and setup of celestial bodies."""
@@ -12,7 +16,7 @@ class BodyManager:
     def __init__(self, config: SimulationConfig):
         self.config = config
         self.bodies: List[resonances.Body] = []
-        self.planets = ['Sun', 'Mercury', 'Venus', 'Earth', 'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto']
+        self.planets = list(const.SIMULATION_PLANETS)
 
     def get_index_of_planets(self, planets_names):
         """Get indices of planets by name."""
@@ -22,8 +26,11 @@ class BodyManager:
         """Get orbital elements for a body."""
         if isinstance(elem_or_num, (int, str)):
             if self.config.source == 'astdys':
+                import astdys
+
                 return astdys.search(elem_or_num)
             else:
+                # resonances.horizons (astroquery) is imported at the first access
                 return resonances.horizons.get_body_keplerian_elements(elem_or_num, date=self.config.date)
         elif isinstance(elem_or_num, dict):
             return elem_or_num
@@ -55,29 +62,29 @@ class BodyManager:
         body.secular_resonances = secular_list
         body.mass = elem.get('mass', 0.0)
 
-        for mmr_elem in body.mmrs:
-            mmr_elem.index_of_planets = self.get_index_of_planets(mmr_elem.planets_names)
-        for secular_elem in body.secular_resonances:
-            secular_elem.index_of_planets = self.get_index_of_planets(secular_elem.planets_names)
+        # the shared resonances from the registry already know their planets, only user-made objects are completed
+        for res in resonances_list:
+            if res.index_of_planets is None:
+                res.index_of_planets = self.get_index_of_planets(res.planets_names)
 
         self.bodies.append(body)
 
-    def add_bodies_to_simulation(self, sim):
-        """Add all bodies to the REBOUND simulation."""
-        for body in self.bodies:
-            self._add_body_to_simulation(body, sim)
-
-    def _add_body_to_simulation(self, body: resonances.Body, sim):
-        """Add a single body to the REBOUND simulation."""
-        body.index_in_simulation = len(sim.particles)
-        sim.add(
-            m=body.mass,
-            a=body.initial_data['a'],
-            e=body.initial_data['e'],
-            inc=body.initial_data['inc'],
-            Omega=body.initial_data['Omega'],
-            omega=body.initial_data['omega'],
-            M=body.initial_data['M'],
-            date=self.config.get_bodies_date(),
-            primary=sim.particles[0],
-        )
+    def add_bodies_to_simulation(self, sim, bodies=None):
+        """
+        Add all bodies (or only ``bodies``) to the REBOUND simulation on their heliocentric orbits. The elements of
+        all bodies are converted to cartesian states at once and the particles are inserted together (see
+        ``resonances.simulation.kepler``).
+        """
+        bodies = self.bodies if bodies is None else bodies
+        if len(bodies) == 0:
+            return
+        elements = {key: np.array([body.initial_data[key] for body in bodies], dtype=float) for key in ELEMENTS}
+        masses = np.array([body.mass for body in bodies], dtype=float)
+
+        primary = sim.particles[0]
+        xyz, vxvyvz = kepler.elements_to_cartesian(sim.G * (primary.m + masses), **elements)
+        xyz += primary.xyz
+        vxvyvz += primary.vxyz
+        first = kepler.add_particles(sim, masses, xyz, vxvyvz)
+        for i, body in enumerate(bodies):
+            body.index_in_simulation = first + i
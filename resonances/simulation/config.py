@@ -2,7 +2,6 @@ import datetime
 import numpy as np
 
 import resonances
-import astdys
 import resonances.data.util
 from resonances.config import config as c
 
@@ -26,6 +25,8 @@ class SimulationConfig:
         if date is not None:
             self.date = resonances.data.util.datetime_from_string(date)
         elif source == 'astdys':
+            import astdys
+
             self.date = astdys.datetime()
         else:
             self.date = datetime.datetime.combine(datetime.datetime.today(), datetime.time.min)
@@ -37,11 +38,21 @@ class SimulationConfig:
         self.dt = kwargs.get('dt', float(c.get('INTEGRATION_DT')))
         self.integrator_corrector = kwargs.get('integrator_corrector', int(c.get('INTEGRATION_CORRECTOR')))
         self.integrator_safe_mode = kwargs.get('integrator_safe_mode', 1)
+        self.engine = kwargs.get('engine', c.get('INTEGRATION_ENGINE'))
+        self.planets_cache = kwargs.get('planets_cache', str(c.get('INTEGRATION_PLANETS_CACHE')).lower() in ('1', 'true'))
 
     def _setup_save_params(self, kwargs):
         """Setup save and output parameters."""
         self.save = kwargs.get('save', c.get('SAVE_MODE'))
         self.save_summary = kwargs.get('save_summary', bool(c.get('SAVE_SUMMARY')))
+        self.save_workers = kwargs.get('save_workers', int(c.get('SAVE_WORKERS')))
+        self.save_queue_size = kwargs.get('save_queue_size', int(c.get('SAVE_QUEUE_SIZE')))
+        self.summary_backend = kwargs.get('summary_backend', c.get('SAVE_SUMMARY_BACKEND'))
+        self.results_db = kwargs.get('results_db', c.get('RESULTS_DB'))
+        self.result_cache = kwargs.get('result_cache', str(c.get('RESULT_CACHE')).lower() in ('1', 'true'))
+        self.result_cache_path = kwargs.get('result_cache_path', c.get('RESULT_CACHE_PATH'))
+        self.result_cache_size = kwargs.get('result_cache_size', float(c.get('RESULT_CACHE_SIZE')))
+        self.result_cache_series = kwargs.get('result_cache_series', str(c.get('RESULT_CACHE_SERIES')).lower() in ('1', 'true'))
 
         now = datetime.datetime.now()
         self.save_path = kwargs.get('save_path', f"{c.get('SAVE_PATH')}/{now.strftime('%Y-%m-%d_%H:%M:%S')}")
@@ -51,6 +62,8 @@ class SimulationConfig:
         self.plot = kwargs.get('plot', c.get('PLOT_MODE'))
         self.plot_type = kwargs.get('plot_type', c.get('PLOT_TYPE'))
         self.image_type = kwargs.get('image_type', c.get('PLOT_IMAGE_TYPE'))
+        self.plot_workers = kwargs.get('plot_workers', int(c.get('PLOT_WORKERS')))
+        self.plot_max_points = kwargs.get('plot_max_points', int(c.get('PLOT_MAX_POINTS')))
 
         now = datetime.datetime.now()
         self.plot_path = kwargs.get('plot_path', f"{c.get('PLOT_PATH')}/{now.strftime('%Y-%m-%d_%H:%M:%S')}")
@@ -102,4 +115,8 @@ class SimulationConfig:
 
     def get_bodies_date(self):
         """Get the date to use for body elements."""
-        return astdys.datetime() if self.source == 'astdys' else self.date
+        if self.source == 'astdys':
+            import astdys
+
+            return astdys.datetime()
+        return self.date
@@ -1,8 +1,8 @@
-import pandas as pd
 from pathlib import Path
 
 import resonances
 from .config import SimulationConfig
+from .writer import AsyncWriter
 
 
 class DataManager:
@@ -10,6 +10,38 @@ class DataManager:
 
     def __init__(self, config: SimulationConfig):
         self.config = config
+        self._writer = None
+        self._renderer = None
+        self._report = None
+        self._results_catalog = None
+        self._run_id = None
+
+    def __getstate__(self):
+        # the writer, the renderer and the catalog hold threads, processes and connections: a copy creates its own
+        state = self.__dict__.copy()
+        state.update(_writer=None, _renderer=None, _report=None, _results_catalog=None, _run_id=None)
+        return state
+
+    @property
+    def writer(self) -> AsyncWriter:
+        """Background writer used for saving and plotting. Created on demand from the current config."""
+        if self._writer is None:
+            self._writer = AsyncWriter(workers=self.config.save_workers, queue_size=self.config.save_queue_size)
+        return self._writer
+
+    @property
+    def renderer(self):
+        """Process pool for saving plots (``plot_workers`` > 0). Created on demand."""
+        if self._renderer is None:
+            self._renderer = resonances.resonance.plot.BatchRenderer(self.config.plot_workers)
+        return self._renderer
+
+    @property
+    def report(self):
+        """HTML survey report collected when ``plot_type`` is ``report``. Created on demand."""
+        if self._report is None:
+            self._report = resonances.report.SurveyReport(self.config.name)
+        return self._report
 
     def should_save_body(self, body: resonances.Body, resonance: resonances.Resonance):
         """Check if body MMR data should be saved."""
@@ -44,14 +76,66 @@ class DataManager:
             self.save_simulation_summary(bodies)
 
         for body in bodies:
-            for resonance in body.mmrs + body.secular_resonances:
-                if self.should_save_body(body, resonance):
-                    self.save_body(body, resonance, times)
-                if self.should_plot_body(body, resonance):
+            self.submit_body_data(body, times, simulation)
+        self.flush()
+
+    def submit_body_data(self, body: resonances.Body, times, simulation=None, plot=True):
+        """
+        Queue saving and plotting of a body. The work is done by the background writer (see ``flush``).
+
+        ``plot=False`` only saves the data (i.e. for the results from the cache without the periodograms).
+        """
+        if plot and self.config.plot_type == 'report' and self.config.plot is not None:
+            self.report.add_summary(self.get_simulation_summary([body]))
+
+        for resonance in body.mmrs + body.secular_resonances:
+            if self.should_save_body(body, resonance):
+                self.writer.submit(self.save_body, body, resonance, times)
+            if plot and self.should_plot_body(body, resonance):
+                if self.config.plot_type == 'report':
+                    self.report.add_body(body, resonance, times)
+                elif self.config.plot_type in ['both', 'show']:
+                    # interactive figures have to be created in the main thread
                     self.plot_body(body, resonance, simulation)
+                elif self.config.plot_type == 'save' and self.config.plot_workers > 0:
+                    self.submit_plot_to_renderer(body, resonance, simulation)
+                else:
+                    self.writer.submit(self.plot_body, body, resonance, simulation)
+
+    def flush(self):
+        """Wait until all queued data is saved and plotted. The renderer and the report are closed even if the writer fails."""
+        writer, self._writer = self._writer, None
+        renderer, self._renderer = self._renderer, None
+        report, self._report = self._report, None
+        try:
+            if writer is not None:
+                writer.flush()
+        finally:
+            try:
+                if renderer is not None:
+                    renderer.close()
+            finally:
+                if report is not None:
+                    self.save_report(report)
+
+    def submit_plot_to_renderer(self, body: resonances.Body, resonance: resonances.Resonance, simulation=None):
+        """Collect the plot data in this process and send it to the pool of plotting processes."""
+        self.ensure_save_path_exists()
+        data = resonances.resonance.plot.plot_data(simulation, body, resonance)
+        filename = resonances.resonance.plot.plot_filename(self.config.plot_path, body.name, data['resonance_key'], self.config.image_type)
+        self.renderer.submit(data, filename)
+
+    def save_report(self, report):
+        """Write the HTML report to ``{plot_path}/report.html``."""
+        self.ensure_save_path_exists()
+        filename = report.write(f'{self.config.plot_path}/report.html')
+        resonances.logger.info(f'Report with {len(report)} pairs saved to {filename}')
+        return filename
 
     def save_body(self, body: resonances.Body, resonance: resonances.Resonance, times):
         """Save MMR data for a body."""
+        import pandas as pd
+
         self.ensure_save_path_exists()
 
         if isinstance(resonance, resonances.MMR):
@@ -70,10 +154,13 @@ class DataManager:
     def plot_body(self, body: resonances.Body, resonance: resonances.Resonance, simulation=None):
         """Plot MMR data for a body."""
         self.ensure_save_path_exists()
+        # the saved plots are drawn by a figure of the writer thread, so the writers plot in parallel
         resonances.resonance.plot.body(simulation, body, resonance, image_type=self.config.image_type)
 
     def _save_periodogram_data(self, body: resonances.Body, resonance_key: str, body_name: str):
         """Save periodogram data for a resonance."""
+        import pandas as pd
+
         # Save resonant angle periodogram
         if body.periodogram_frequency.get(resonance_key) is not None:
             freq = body.periodogram_frequency[resonance_key]
@@ -100,18 +187,33 @@ class DataManager:
         self.save_configuration_details(bodies)
 
         df = self.get_simulation_summary(bodies)
-        summary_filename = f'{self.config.save_path}/summary.csv'
 
-        summary_file = Path(summary_filename)
-        if summary_file.exists():
-            df.to_csv(summary_filename, mode='a', header=False, index=False)
-        else:
-            df.to_csv(summary_filename, mode='a', header=True, index=False)
+        if self.config.summary_backend in ['csv', 'both']:
+            summary_filename = f'{self.config.save_path}/summary.csv'
+
+            summary_file = Path(summary_filename)
+            if summary_file.exists():
+                df.to_csv(summary_filename, mode='a', header=False, index=False)
+            else:
+                df.to_csv(summary_filename, mode='a', header=True, index=False)
+
+        if self.config.summary_backend in ['sqlite', 'both']:
+            self.save_summary_to_catalog(df)
 
         return df
 
+    def save_summary_to_catalog(self, df):
+        """Save summary to the SQLite results catalog. All summaries of one simulation share the same run id."""
+        if self._results_catalog is None:
+            self._results_catalog = resonances.results.ResultsCatalog(self.config.results_db)
+            self._run_id = self._results_catalog.add_run(self.config)
+        self._results_catalog.add_results(self._run_id, df)
+        return self._run_id
+
     def get_simulation_summary(self, bodies):
         """Generate simulation summary dataframe."""
+        import pandas as pd
+
         data = []
 
         for body in bodies:
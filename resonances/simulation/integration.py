@@ -1,12 +1,15 @@
 import os
 from pathlib import Path
+from types import SimpleNamespace
 from typing import List
 import tqdm
 
 import rebound
 import resonances
 from resonances.config import config as c
+from resonances.data import const
 from .config import SimulationConfig
+from .trajectory import PlanetaryTrajectory, initial_state, trajectory_key
 
 
 class IntegrationEngine:
@@ -16,17 +19,17 @@ class IntegrationEngine:
         self.config = config
         self.sim = None
 
-    def create_solar_system(self, force=False):
-        """Create or load the Solar System REBOUND simulation."""
+    def create_solar_system(self, force=False, save=True):
+        """Create or load the Solar System REBOUND simulation. With ``save=False``, a new one is not written to the file."""
         solar_file = Path(self._solar_system_filename())
 
         if solar_file.exists() and not force:
             self.sim = rebound.Simulation(str(solar_file))
         else:
             self.sim = rebound.Simulation()
-            planets = ['Sun', 'Mercury', 'Venus', 'Earth', 'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto']
-            self.sim.add(planets, date=self.config.date)
-            self.sim.save_to_file(str(solar_file))
+            self.sim.add(const.SIMULATION_PLANETS, date=self.config.date)
+            if save:
+                self.sim.save_to_file(str(solar_file))
 
     def _solar_system_filename(self) -> str:
         """Generate filename for solar system cache."""
@@ -61,6 +64,12 @@ class IntegrationEngine:
         # Get particles reference
         ps = self.sim.particles
 
+        # The planets are taken from the cache if they have been integrated with the same settings
+        trajectory = self.load_planetary_trajectory(bodies, times)
+        recording = trajectory is None
+        if recording:
+            trajectory = PlanetaryTrajectory.record(trajectory_key(self.config, times), self._planets_state(), times)
+
         # Integration loop
         iterations = list(enumerate(times))
         if progress:
@@ -68,17 +77,36 @@ class IntegrationEngine:
 
         for i, time in iterations:
             self.sim.integrate(time)
-            os = self.sim.orbits(primary=ps[0])
+            if recording:
+                orbits = self.sim.orbits(primary=ps[0])
+                trajectory.set_orbits(i, orbits)
+                for body in bodies:
+                    self._update_body_data(body, orbits[body.index_in_simulation - 1], i)  # -1 because Sun is not in orbits
+            else:
+                for body in bodies:
+                    self._update_body_data(body, ps[body.index_in_simulation].orbit(primary=ps[0]), i)
+
+        if recording and self._can_cache_planets(bodies):
+            trajectory.store()
+
+        for body in bodies:
+            self._calc_angles(body, trajectory)
 
-            # Update body data
-            for body in bodies:
-                self._update_body_data(body, os, i)
+    def _planets_state(self):
+        return initial_state(self.sim, len(const.SIMULATION_PLANETS))
 
-    def _update_body_data(self, body: resonances.Body, orbits, time_index):
-        """Update body orbital data and calculate resonant angles."""
-        # Get orbital elements
-        orbit = orbits[body.index_in_simulation - 1]  # -1 because Sun is not in orbits
+    def _can_cache_planets(self, bodies: List[resonances.Body]) -> bool:
+        # massive bodies change the trajectories of the planets
+        return self.config.planets_cache and all(body.mass == 0 for body in bodies)
 
+    def load_planetary_trajectory(self, bodies: List[resonances.Body], times):
+        """Cached trajectory of the planets for the settings and the initial state of the simulation or None."""
+        if not self._can_cache_planets(bodies):
+            return None
+        return PlanetaryTrajectory.load(trajectory_key(self.config, times), self._planets_state(), times)
+
+    def _update_body_data(self, body: resonances.Body, orbit, time_index):
+        """Update body orbital data."""
         body.axis[time_index] = orbit.a
         body.ecc[time_index] = orbit.e
         body.inc[time_index] = orbit.inc
@@ -88,12 +116,9 @@ class IntegrationEngine:
         body.longitude[time_index] = orbit.l
         body.varpi[time_index] = orbit.Omega + orbit.omega
 
-        # Calculate MMR angles
-        for mmr in body.mmrs:
-            planets = [orbits[idx - 1] for idx in mmr.index_of_planets]
-            body.angle(mmr)[time_index] = mmr.calc_angle(orbit, planets)
-
-        # Calculate secular resonance angles
-        for secular in body.secular_resonances:
-            planets = [orbits[idx - 1] for idx in secular.index_of_planets]
-            body.angle(secular)[time_index] = secular.calc_angle(orbit, planets)
+    def _calc_angles(self, body: resonances.Body, trajectory: PlanetaryTrajectory):
+        """Calculate the resonant angles for all outputs at once."""
+        orbit = SimpleNamespace(l=body.longitude, Omega=body.Omega, omega=body.omega)
+        for resonance in body.mmrs + body.secular_resonances:
+            planets = [trajectory.planet(idx) for idx in resonance.index_of_planets]
+            body.angle(resonance)[:] = resonance.calc_angle(orbit, planets)
@@ -0,0 +1,182 @@
+"""
+Content-addressed cache of the results of the identification of resonances.
+
+The result for an asteroid and a resonance depends only on the initial elements of the asteroid, the date, the
+resonance, the settings of the integration and of the identification of librations and the version of the package.
+The key of an entry is the hash of all of them, so a repeated check with the same inputs takes the classification
+(the status and the metrics) from the cache. The entries are files in ``RESULT_CACHE_PATH``::
+
+    ab/abcdef....json     the classification
+    ab/abcdef....npz      the series (the angle, the elements), only with ``RESULT_CACHE_SERIES``
+
+Reading an entry updates its modification time. When the size of the cache exceeds ``RESULT_CACHE_SIZE`` (MB),
+the least recently used entries are removed.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+import resonances
+from resonances.body import SERIES
+
+ELEMENTS = ['a', 'e', 'inc', 'Omega', 'omega', 'M']
+CONFIG = [
+    'source',
+    'tmax',
+    'dt',
+    'Nout',
+    'integrator',
+    'integrator_corrector',
+    'integrator_safe_mode',
+    'engine',
+    'oscillations_cutoff',
+    'oscillations_filter_order',
+    'periodogram_frequency_min',
+    'periodogram_frequency_max',
+    'periodogram_critical',
+    'periodogram_soft',
+    'libration_period_critical',
+    'libration_monotony_critical',
+    'libration_period_min',
+]
+
+
+def result_key(config, body: resonances.Body, resonance: resonances.Resonance) -> str:
+    """Hash of everything the result for the body and the resonance depends on."""
+    data = {
+        'version': resonances.__version__,
+        'date': config.date.timestamp(),
+        'elements': [float(body.initial_data[name]) for name in ELEMENTS] + [float(body.mass)],
+        'resonance': resonance.to_s(),
+        'config': [getattr(config, name) for name in CONFIG],
+    }
+    return hashlib.sha256(json.dumps(data, default=str).encode()).hexdigest()
+
+
+def _plain(value):
+    """JSON-compatible copy of the value (numpy scalars and tuples inside)."""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ResultCache:
+    """Entries of the cache in ``path`` (see the module docstring)."""
+
+    def __init__(self, path, max_size: float, series: bool = False):
+        self.path = Path(path)
+        self.max_size = max_size
+        self.series = series
+        self._size = None
+
+    @classmethod
+    def from_config(cls, config) -> 'ResultCache':
+        return cls(config.result_cache_path, config.result_cache_size * 1024**2, config.result_cache_series)
+
+    def filename(self, key: str, suffix: str = 'json') -> Path:
+        return self.path / key[:2] / f'{key}.{suffix}'
+
+    def get(self, key: str):
+        """The entry (a dict, with ``series`` if they are stored) or None."""
+        path = self.filename(key)
+        try:
+            entry = json.loads(path.read_text())
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        series = self.filename(key, 'npz')
+        if series.exists():
+            try:
+                with np.load(series) as data:
+                    entry['series'] = {name: data[name] for name in data.files}
+                os.utime(series)
+            except Exception:
+                pass
+        return entry
+
+    def put(self, key: str, entry: dict, series: dict = None):
+        """Store the classification (and the series if the cache keeps them)."""
+        files = [(self.filename(key), lambda tmp: tmp.write_text(json.dumps(_plain(entry))))]
+        if self.series and series is not None:
+            arrays = {name: np.asarray(value) for name, value in series.items() if value is not None}
+            files.append((self.filename(key, 'npz'), lambda tmp: np.savez(tmp, **arrays)))
+        for path, write in files:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f'.{uuid.uuid4().hex}.{path.suffix[1:]}')
+            write(tmp)
+            os.replace(tmp, path)
+            if self._size is not None:
+                self._size += path.stat().st_size
+        if self.size() > self.max_size:
+            self.evict()
+
+    def _files(self) -> list:
+        return [path for path in self.path.glob('*/*') if not path.name.startswith('.')]
+
+    def size(self) -> int:
+        """Total size of the entries in bytes (counted once, then updated by ``put`` and ``evict``)."""
+        if self._size is None:
+            self._size = sum(path.stat().st_size for path in self._files())
+        return self._size
+
+    def evict(self, target: float = 0.9):
+        """Remove the least recently used entries until the cache takes ``target`` of its maximum size."""
+        files = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        self._size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files, key=lambda item: item[0]):
+            if self._size <= self.max_size * target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            self._size -= size
+
+    def clear(self):
+        for path in self._files():
+            path.unlink()
+        self._size = 0
+
+
+def body_entry(body: resonances.Body, resonance: resonances.Resonance) -> dict:
+    """Classification of the body in the resonance (see ``Body.resonance_entry``)."""
+    return body.resonance_entry(resonance)
+
+
+def body_series(body: resonances.Body, resonance: resonances.Resonance) -> dict:
+    return {**body.elements_series(), **body.resonance_series(resonance)}
+
+
+def restore(body: resonances.Body, resonance: resonances.Resonance, entry: dict):
+    """Set the cached classification (and the series if they are in the entry) of the body in the resonance."""
+    key = resonance.to_s()
+    body.statuses[key] = entry['status']
+    body.libration_pure[key] = entry['pure']
+    body.libration_metrics[key] = entry['metrics']
+    body.monotony[key] = entry['monotony']
+    body.periodogram_peaks_overlapping[key] = [tuple(item) for item in entry['overlapping']]
+
+    series = entry.get('series')
+    if series is None:
+        return
+    for name in SERIES:
+        if name in series:
+            setattr(body, name, series[name])
+    (body.angles if resonance.type == 'mmr' else body.secular_angles)[key] = series['angle']
+    if 'angle_filtered' in series:
+        body.angles_filtered[key] = series['angle_filtered']
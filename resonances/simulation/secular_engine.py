@@ -0,0 +1,193 @@
+"""
+Semi-analytical propagation of asteroids for the screening of secular resonances.
+
+The critical angles of secular resonances depend only on the longitudes of perihelia and nodes. Instead of the full
+N-body integration, this engine propagates ``(e, varpi)`` and ``(inc, Omega)`` of the asteroids by the averaged
+linear (Laplace-Lagrange) secular theory (Murray & Dermott, 1999, Sections 7.2-7.7):
+
+- the planets follow their own secular solution: with ``z_j = e_j exp(i varpi_j)`` and ``zeta_j = inc_j exp(i Omega_j)``,
+  ``dz/dt = i A z`` and ``dzeta/dt = i B zeta``, which is solved once through the eigenvectors of ``A`` and ``B``
+  (``PlanetarySolution``, cached per date);
+- an asteroid is a massless body driven by them, ``dz/dt = i (A z + sum_j A_j z_j)`` (and the same for ``zeta``).
+  Its solution is the sum of the free term and the forced terms with the planetary frequencies.
+
+The result is a series of angles on the same time grid as for the N-body integration, so ``libration.body``
+classifies them in the same way. The linear theory is only a screening tool: it has ``s = -g``, has no
+mean motion resonances and diverges near the linear secular resonances (the forced amplitude grows without bound).
+The positive bodies should be confirmed by the full integration (see ``resonances.finder.secular_finder.escalate``).
+"""
+
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+
+import resonances
+from resonances.data import const
+from resonances.data.util import mod2pi
+from resonances.matrix.secular_frequencies import ARCSEC_IN_RADIAN, laplace_coefficient
+from resonances.matrix.secular_resonances import load_planetary_frequencies
+from .config import SimulationConfig
+
+
+def _interaction(a, ap):
+    """``alpha`` and ``alpha * alpha_bar`` for the body with the semi-major axis ``a`` perturbed by the one with ``ap``."""
+    inner = a < ap
+    alpha = np.where(inner, a / ap, ap / a)
+    return alpha, alpha * np.where(inner, alpha, 1.0)
+
+
+class PlanetarySolution:
+    """Laplace-Lagrange secular solution of the planets (time in years, frequencies in rad/yr)."""
+
+    def __init__(self, elements: dict, frequencies: dict = None):
+        """
+        ``elements`` maps the names of the planets to dicts with ``a``, ``e``, ``inc``, ``Omega`` and ``omega`` (radians).
+
+        The linear theory gives the frequencies of the giant planets with large errors (i.e. ``g6`` is 22.7 instead of
+        28.2 arcsec/yr because of the great inequality of Jupiter and Saturn). ``frequencies`` (arcsec/yr, named as in
+        ``load_planetary_frequencies``) replace the frequencies of the modes dominated by the corresponding planets.
+        """
+        self.planets = list(elements.keys())
+        self.a = np.array([elements[planet]['a'] for planet in self.planets], dtype=float)
+        mu = np.array([const.PLANETS_MASS[planet] for planet in self.planets])
+        n = const.K * self.a**-1.5 * const.DAYS_IN_YEAR
+
+        size = len(self.planets)
+        A = np.zeros((size, size))
+        B = np.zeros((size, size))
+        for j in range(size):
+            for k in range(size):
+                if j == k:
+                    continue
+                alpha, factor = _interaction(self.a[j], self.a[k])
+                c = n[j] / 4.0 * mu[k] / (1.0 + mu[j]) * factor
+                b1 = laplace_coefficient(1.5, 1, alpha)
+                A[j, j] += c * b1
+                A[j, k] = -c * laplace_coefficient(1.5, 2, alpha)
+                B[j, j] -= c * b1
+                B[j, k] = c * b1
+
+        e = np.array([elements[planet]['e'] for planet in self.planets], dtype=float)
+        inc = np.array([elements[planet]['inc'] for planet in self.planets], dtype=float)
+        Omega = np.array([elements[planet]['Omega'] for planet in self.planets], dtype=float)
+        varpi = Omega + np.array([elements[planet]['omega'] for planet in self.planets], dtype=float)
+
+        self.g, self.z_modes, self.z_amplitudes = self._modes(A, e * np.exp(1j * varpi))
+        self.s, self.zeta_modes, self.zeta_amplitudes = self._modes(B, inc * np.exp(1j * Omega))
+        for name, value in (frequencies or {}).items():
+            planet = const.SOLAR_SYSTEM[int(name[1:]) - 1]
+            if planet in self.planets:
+                modes = self.z_modes if name[0] == 'g' else self.zeta_modes
+                mode = np.argmax(np.abs(modes[self.planets.index(planet)]))
+                (self.g if name[0] == 'g' else self.s)[mode] = value / ARCSEC_IN_RADIAN
+
+    @staticmethod
+    def _modes(matrix, initial):
+        frequencies, modes = np.linalg.eig(matrix)
+        frequencies, modes = frequencies.real, modes.real
+        return frequencies, modes, np.linalg.solve(modes.astype(complex), initial)
+
+    @classmethod
+    def from_simulation(cls, sim, planets=None, frequencies=None) -> 'PlanetarySolution':
+        """Solution for the planets of the REBOUND simulation of the Solar System (see ``const.SIMULATION_PLANETS``)."""
+        planets = const.SOLAR_SYSTEM if planets is None else planets
+        orbits = sim.orbits(primary=sim.particles[0])
+        elements = {}
+        for planet in planets:
+            orbit = orbits[const.SIMULATION_PLANETS.index(planet) - 1]
+            elements[planet] = {'a': orbit.a, 'e': orbit.e, 'inc': orbit.inc, 'Omega': orbit.Omega, 'omega': orbit.omega}
+        return cls(elements, frequencies)
+
+    def z(self, t: np.ndarray) -> np.ndarray:
+        """``e exp(i varpi)`` of the planets (rows) for the times ``t`` in years (columns)."""
+        return self.z_modes @ (self.z_amplitudes[:, None] * np.exp(1j * np.outer(self.g, t)))
+
+    def zeta(self, t: np.ndarray) -> np.ndarray:
+        """``inc exp(i Omega)`` of the planets (rows) for the times ``t`` in years (columns)."""
+        return self.zeta_modes @ (self.zeta_amplitudes[:, None] * np.exp(1j * np.outer(self.s, t)))
+
+    def propagate(self, a, e, inc, Omega, omega, t: np.ndarray) -> tuple:
+        """
+        ``(z, zeta)`` of massless bodies (rows) for the times ``t`` in years (columns).
+
+        ``a``, ``e``, ``inc``, ``Omega`` and ``omega`` are arrays of the initial elements (radians).
+        """
+        a = np.atleast_1d(np.asarray(a, dtype=float))[:, None]
+        alpha, factor = _interaction(a, self.a[None, :])
+        mu = np.array([const.PLANETS_MASS[planet] for planet in self.planets])
+        c = const.K * a**-1.5 * const.DAYS_IN_YEAR / 4.0 * mu * factor
+        b1 = laplace_coefficient(1.5, 1, alpha)
+        A = (c * b1).sum(axis=1)
+        A_j = -c * laplace_coefficient(1.5, 2, alpha)
+        B_j = c * b1
+
+        Omega = np.atleast_1d(Omega)
+        z0 = np.atleast_1d(e) * np.exp(1j * (Omega + np.atleast_1d(omega)))
+        zeta0 = np.atleast_1d(inc) * np.exp(1j * Omega)
+        z = self._driven(A, A_j, z0, self.g, self.z_modes, self.z_amplitudes, t)
+        zeta = self._driven(-A, B_j, zeta0, self.s, self.zeta_modes, self.zeta_amplitudes, t)
+        return z, zeta
+
+    @staticmethod
+    def _driven(frequency, coupling, initial, frequencies, modes, amplitudes, t):
+        # the forced term sum_i w_i exp(i f_i t) with w_i = amplitude_i * sum_j coupling_j * mode_ji / (f_i - frequency)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            forced = (coupling @ modes) * amplitudes / (frequencies[None, :] - frequency[:, None])
+        free = initial - forced.sum(axis=1)
+        return free[:, None] * np.exp(1j * np.outer(frequency, t)) + forced @ np.exp(1j * np.outer(frequencies, t))
+
+
+class SecularEngine:
+    """Fills the bodies with the series of the averaged elements and the angles of their secular resonances."""
+
+    _solutions = {}
+
+    def __init__(self, config: SimulationConfig):
+        self.config = config
+
+    def solution(self, sim) -> PlanetarySolution:
+        """Planetary solution for the date of the simulation (computed once per date)."""
+        key = self.config.date.timestamp()
+        if key not in self._solutions:
+            self._solutions[key] = PlanetarySolution.from_simulation(sim, frequencies=load_planetary_frequencies())
+        return self._solutions[key]
+
+    def run(self, bodies: List[resonances.Body], times, sim):
+        """Propagate the bodies for the times of the simulation (in the units of REBOUND) with the planets of ``sim``."""
+        for body in bodies:
+            if len(body.mmrs) > 0:
+                raise Exception(
+                    f'The secular engine cannot check mean motion resonances (the body {body.name}). Use the N-body integration.'
+                )
+        if len(bodies) == 0:
+            return
+
+        solution = self.solution(sim)
+        t = np.asarray(times) / (2 * np.pi)
+        elements = {
+            key: np.array([body.initial_data[key] for body in bodies], dtype=float) for key in ['a', 'e', 'inc', 'Omega', 'omega', 'M']
+        }
+        z, zeta = solution.propagate(elements['a'], elements['e'], elements['inc'], elements['Omega'], elements['omega'], t)
+        planets_z, planets_zeta = solution.z(t), solution.zeta(t)
+        planets = {}
+        for i, planet in enumerate(solution.planets):
+            planet_Omega = mod2pi(np.angle(planets_zeta[i]))
+            planets[planet] = SimpleNamespace(Omega=planet_Omega, omega=mod2pi(np.angle(planets_z[i]) - planet_Omega))
+
+        mean_motion = const.K * elements['a'] ** -1.5 * const.DAYS_IN_YEAR
+        for i, body in enumerate(bodies):
+            body.setup_vars_for_simulation(len(t))
+            body.axis[:] = elements['a'][i]
+            body.ecc[:] = np.abs(z[i])
+            body.inc[:] = np.abs(zeta[i])
+            body.Omega[:] = mod2pi(np.angle(zeta[i]))
+            body.varpi[:] = mod2pi(np.angle(z[i]))
+            body.omega[:] = mod2pi(body.varpi - body.Omega)
+            body.M[:] = mod2pi(elements['M'][i] + mean_motion[i] * t)
+            body.longitude[:] = mod2pi(body.varpi + body.M)
+
+            orbit = SimpleNamespace(Omega=body.Omega, omega=body.omega)
+            for secular in body.secular_resonances:
+                secular_planets = [planets[name] for name in secular.planets_names]
+                body.angle(secular)[:] = secular.calc_angle(orbit, secular_planets)
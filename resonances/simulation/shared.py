@@ -0,0 +1,127 @@
+"""
+One N-body integration for several simulations of the same asteroids.
+
+The checks of mean motion and secular resonances of the same asteroids differ only by the outputs (the secular check
+is much longer and has its own ``Nout``) and by the parameters of the identification of librations. When the
+simulations have the same date and settings of the integrator, the asteroids are integrated once for the union of
+their output times up to the longest ``tmax``. Every simulation then takes its own outputs (exactly the same times
+as it would have without sharing) from the common series and identifies the librations with its own config.
+"""
+
+import copy
+from typing import List
+
+import numpy as np
+
+import resonances
+from .body_manager import BodyManager
+from .integration import IntegrationEngine
+
+SETTINGS = ['date', 'source', 'integrator', 'dt', 'integrator_corrector', 'integrator_safe_mode']
+SERIES = ['axis', 'ecc', 'inc', 'Omega', 'omega', 'M', 'longitude', 'varpi']
+
+
+class SharedIntegration:
+    """Integration of the bodies of all ``simulations`` at once (see the module docstring)."""
+
+    def __init__(self, simulations: list):
+        self.simulations = list(simulations)
+        self.times = None
+        self.bodies = None
+        for sim in self.simulations:
+            sim.shared_integration = self
+
+    @staticmethod
+    def compatible(simulations: list) -> bool:
+        """Whether the simulations can share the integration (the same date, integrator and direction of time)."""
+        first = simulations[0].config
+        for sim in simulations:
+            config = sim.config
+            if config.engine != 'nbody' or np.sign(config.tmax) != np.sign(first.tmax):
+                return False
+            if any(getattr(config, name) != getattr(first, name) for name in SETTINGS):
+                return False
+        return True
+
+    @staticmethod
+    def output_times(config) -> np.ndarray:
+        return np.linspace(0.0, config.tmax, config.Nout)
+
+    @staticmethod
+    def _same(bodies: list, body: resonances.Body):
+        return next((other for other in bodies if other.name == body.name and other.initial_data == body.initial_data), None)
+
+    def _find(self, body: resonances.Body):
+        return self._same(self.bodies or [], body)
+
+    def _indexes(self, times: np.ndarray):
+        """Indexes of ``times`` in the common outputs or None if some of them are not there."""
+        if self.times is None or len(times) == 0:
+            return None
+        idx = np.clip(np.searchsorted(np.abs(self.times), np.abs(times)), 0, len(self.times) - 1)
+        return idx if np.array_equal(self.times[idx], times) else None
+
+    def integrate(self, progress=False):
+        """Integrate the bodies of all simulations for the union of their outputs."""
+        configs = [sim.config for sim in self.simulations]
+        times = np.abs(self.output_times(configs[0]))
+        for config in configs[1:]:
+            times = np.union1d(times, np.abs(self.output_times(config)))
+        longest = max(configs, key=lambda config: abs(config.tmax))
+        self.times = np.sign(longest.tmax) * times
+
+        # every asteroid is integrated once with the resonances of all simulations
+        config = copy.copy(longest)
+        body_manager = BodyManager(config)
+        for sim in self.simulations:
+            for body in sim.bodies:
+                shared = self._same(body_manager.bodies, body)
+                if shared is None:
+                    shared = resonances.Body()
+                    shared.name, shared.initial_data, shared.mass = body.name, body.initial_data, body.mass
+                    body_manager.bodies.append(shared)
+                known = [res.to_s() for res in shared.mmrs + shared.secular_resonances]
+                shared.mmrs += [res for res in body.mmrs if res.to_s() not in known]
+                shared.secular_resonances += [res for res in body.secular_resonances if res.to_s() not in known]
+
+        resonances.logger.info(
+            f'Integrating {len(body_manager.bodies)} bodies once for {len(self.simulations)} simulations ({len(self.times)} outputs)'
+        )
+        engine = IntegrationEngine(config)
+        engine.create_solar_system()
+        body_manager.add_bodies_to_simulation(engine.sim)
+        engine.run_integration(body_manager.bodies, self.times, progress)
+        self.bodies = body_manager.bodies
+
+    def fill(self, sim, progress=False) -> bool:
+        """
+        Fill the bodies of ``sim`` with its outputs from the common integration (integrating first if needed).
+
+        Returns False if the simulation cannot use the shared integration anymore (i.e. its settings have been
+        changed after the check was created), then it has to be integrated on its own.
+        """
+        if sim not in self.simulations or not self.compatible(self.simulations):
+            return False
+        if self._indexes(sim.times) is None or any(self._find(body) is None for body in sim.bodies):
+            self.integrate(progress)
+        idx = self._indexes(sim.times)
+        if idx is None:
+            return False
+
+        for body in sim.bodies:
+            shared = self._find(body)
+            body.setup_vars_for_simulation(len(idx))
+            body.index_in_simulation = shared.index_in_simulation
+            for name in SERIES:
+                getattr(body, name)[:] = getattr(shared, name)[idx]
+            for resonance in body.mmrs + body.secular_resonances:
+                body.angle(resonance)[:] = shared.angle(resonance)[idx]
+        return True
+
+
+def share_integration(simulations: List) -> bool:
+    """Make the simulations share one integration if they are compatible. Returns whether they do."""
+    if len(simulations) < 2 or not SharedIntegration.compatible(simulations):
+        return False
+    SharedIntegration(simulations)
+    return True
@@ -1,3 +1,5 @@
+import copy
+
 import numpy as np
 from typing import List, Union
 
@@ -5,7 +7,10 @@ import resonances
 from .config import SimulationConfig
 from .body_manager import BodyManager
 from .integration import IntegrationEngine
+from .secular_engine import SecularEngine
 from .data_manager import DataManager
+from .asynchronous import fetch_elements, results_async
+from .result_cache import ResultCache, body_entry, body_series, restore, result_key
 
 
 class Simulation:
@@ -20,7 +25,10 @@ class Simulation:
         self.config = SimulationConfig(**kwargs)
         self.body_manager = BodyManager(self.config)
         self.integration_engine = IntegrationEngine(self.config)
+        self.secular_engine = SecularEngine(self.config)
         self.data_manager = DataManager(self.config)
+        self.shared_integration = None  # see resonances.simulation.shared
+        self._result_cache = None
 
         self.times = []
 
@@ -28,9 +36,9 @@ class Simulation:
     def bodies(self):
         return self.body_manager.bodies
 
-    def create_solar_system(self, force=False):
-        """Create or load the Solar System simulation."""
-        self.integration_engine.create_solar_system(force)
+    def create_solar_system(self, force=False, save=True):
+        """Create or load the Solar System simulation (``save=False`` does not write a new one to the cache file)."""
+        self.integration_engine.create_solar_system(force, save)
 
     def add_body(
         self, elem_or_num, resonance: Union[resonances.Resonance, str, list[resonances.Resonance], list[str]], name='asteroid'
@@ -48,20 +56,131 @@ class Simulation:
         for body in bodies:
             self.add_body(body, resonance, f"{prefix}{body}")
 
+    async def add_bodies_async(self, bodies: list, resonance, prefix: str = None, concurrency: int = 4, rate: float = None):
+        """
+        Add multiple bodies like ``add_bodies``, but fetch their elements concurrently: at most ``concurrency``
+        requests at a time and at most ``rate`` requests per second (see ``resonances.simulation.asynchronous``).
+        """
+        elements = await fetch_elements(self.body_manager, bodies, concurrency, rate)
+        prefix = "" if prefix is None else f"{prefix}_"
+        for body, elem in zip(bodies, elements):
+            self.add_body(elem, resonance, f"{prefix}{'asteroid' if isinstance(body, dict) else body}")
+
+    def results_async(self, executor=None, chunk_size: int = None):
+        """
+        Async iterator of the bodies with their results. The bodies are run in parts of ``chunk_size`` in the
+        ``executor`` (i.e. a ``ProcessPoolExecutor``) and yielded as soon as their part is done. By default, there
+        is about one part per worker, since every part integrates the planets again.
+        """
+        return results_async(self, executor, chunk_size)
+
+    async def run_async(self, executor=None, chunk_size: int = None):
+        """Run the simulation in the ``executor`` without blocking the event loop (see ``results_async``)."""
+        async for _ in self.results_async(executor, chunk_size):
+            pass
+
     # Integration methods
     def run(self, progress=False):
         """Run the complete simulation."""
+        for _ in self.iter_results(progress):
+            pass
+
+    def iter_results(self, progress=False, series: bool = False, release: bool = False):
+        """
+        Run the simulation and yield the summary of every body (see ``Body.summary``) as soon as its librations are
+        identified, while the next bodies are analysed. With ``series``, the summary has the series of the body
+        (and ``series['times']``). With ``release``, the series are dropped from the body after it is yielded, so
+        only the classification stays in memory (the data and plots are still saved from a copy of the body).
+
+        The summary of the simulation is saved after the last body, so the generator should be exhausted.
+        """
+        cached = self.integrate(progress)
+
+        # Saving and plotting of a body are done by the background writer while the next body is analysed
+        try:
+            for body in self.bodies:
+                if id(body) not in cached:
+                    self.identify_body_librations(body)
+                    self.store_cached_results(body)
+                # with release, the writer gets a copy that keeps the series until they are saved
+                self.submit_body_data(copy.copy(body) if release else body, id(body) in cached)
+
+                summary = body.summary(series)
+                if series:
+                    summary['series']['times'] = self.times
+                yield summary
+                if release:
+                    body.release_series()
+            if self.config.save_summary:
+                self.data_manager.save_simulation_summary(self.bodies)
+        finally:
+            self.data_manager.flush()
+
+    def integrate(self, progress=False) -> set:
+        """Integrate the bodies that are not in the cache. Returns the ids of the bodies with all results cached."""
         self.times = np.linspace(0.0, self.config.tmax, self.config.Nout)
-        self.body_manager.add_bodies_to_simulation(self.integration_engine.sim)
-        self.integration_engine.run_integration(self.bodies, self.times, progress)
-        self.identify_librations()
-        self.data_manager.save_data(self.bodies, self.times, self)
+        # the bodies with all results in the cache are not integrated
+        cached = self.load_cached_results()
+        bodies = [body for body in self.bodies if id(body) not in cached]
+        if self.config.engine == 'secular':
+            self.secular_engine.run(bodies, self.times, self.integration_engine.sim)
+        elif self.shared_integration is None or not self.shared_integration.fill(self, progress):
+            if len(bodies) > 0:
+                self.body_manager.add_bodies_to_simulation(self.integration_engine.sim, bodies)
+                self.integration_engine.run_integration(bodies, self.times, progress)
+        return cached
+
+    def submit_body_data(self, body: resonances.Body, cached: bool):
+        """Pass the body to the background writer (the cached bodies without series are not saved, not plotted)."""
+        if not cached:
+            self.data_manager.submit_body_data(body, self.times, self)
+        elif body.axis is not None:
+            self.data_manager.submit_body_data(body, self.times, self, plot=False)
+
+    @property
+    def result_cache(self):
+        """Cache of the results (see ``resonances.simulation.result_cache``) or None if it is disabled."""
+        if not self.config.result_cache:
+            return None
+        if self._result_cache is None:
+            self._result_cache = ResultCache.from_config(self.config)
+        return self._result_cache
+
+    def load_cached_results(self) -> set:
+        """Restore the results of the bodies from the cache. Returns the ids of the bodies with all results cached."""
+        cache = self.result_cache
+        if cache is None:
+            return set()
+        cached = set()
+        for body in self.bodies:
+            all_resonances = body.mmrs + body.secular_resonances
+            entries = [cache.get(result_key(self.config, body, resonance)) for resonance in all_resonances]
+            if len(all_resonances) == 0 or any(entry is None for entry in entries):
+                continue
+            for resonance, entry in zip(all_resonances, entries):
+                restore(body, resonance, entry)
+            cached.add(id(body))
+        if len(cached) > 0:
+            resonances.logger.info(f'The results of {len(cached)} of {len(self.bodies)} bodies are taken from the cache')
+        return cached
+
+    def store_cached_results(self, body: resonances.Body):
+        """Put the results of the body into the cache."""
+        cache = self.result_cache
+        if cache is None:
+            return
+        for resonance in body.mmrs + body.secular_resonances:
+            cache.put(result_key(self.config, body, resonance), body_entry(body, resonance), body_series(body, resonance))
 
     def identify_librations(self):
         """Identify librations for all bodies."""
         for body in self.bodies:
-            try:
-                resonances.libration.body(self, body)
-            except Exception as e:
-                resonances.logger.error(f"Error identifying librations for {body.name}: {e}")
-                raise
+            self.identify_body_librations(body)
+
+    def identify_body_librations(self, body: resonances.Body):
+        """Identify librations for a single body."""
+        try:
+            resonances.libration.body(self, body)
+        except Exception as e:
+            resonances.logger.error(f"Error identifying librations for {body.name}: {e}")
+            raise
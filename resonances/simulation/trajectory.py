@@ -0,0 +1,161 @@
+"""
+Cache of the trajectories of the planets.
+
+Asteroids are test particles, so the planets move in the same way in every simulation with the same initial state
+and the same settings of the integration. The elements of the planets for every output are stored after the first
+integration (in memory and in ``cache/planets-<key>.npz``, see the config ``PLANETS_TRAJECTORY_FILE``),
+and later simulations take the angles of the planets from the cache instead of computing the orbits of the planets
+at every output.
+
+The key is a hash of the date, ``dt``, the integrator and its settings and the output times (``tmax`` and ``Nout``).
+The cached file also keeps the initial state of the planets, and it is used only if the state is exactly the same
+as in the simulation.
+
+Both caches are bounded like the result cache: at most ``memory_size`` trajectories are kept in memory, and reading
+a file updates its modification time, so when the files take more than ``PLANETS_TRAJECTORY_SIZE`` (MB), the least
+recently used ones are removed.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from resonances.config import config as c
+from resonances.data import const
+
+ELEMENTS = ['a', 'e', 'inc', 'Omega', 'omega', 'M', 'l']
+
+
+def trajectory_key(config, times) -> str:
+    """Hash of the settings of the simulation and the output times that define the trajectories of the planets."""
+    settings = [
+        config.date.timestamp(),
+        config.dt,
+        config.integrator,
+        config.integrator_corrector,
+        config.integrator_safe_mode,
+        hashlib.sha1(np.ascontiguousarray(times, dtype=float).tobytes()).hexdigest(),
+    ]
+    return hashlib.sha1(json.dumps(settings, default=str).encode()).hexdigest()[:16]
+
+
+def initial_state(sim, count: int) -> np.ndarray:
+    """Masses, positions and velocities of the first ``count`` particles of the REBOUND simulation."""
+    particles = sim.particles
+    return np.array([[p.m, p.x, p.y, p.z, p.vx, p.vy, p.vz] for p in (particles[i] for i in range(count))])
+
+
+class PlanetaryTrajectory:
+    """Elements of the planets (rows, in the order of ``const.SIMULATION_PLANETS`` without the Sun) for every output."""
+
+    _trajectories = OrderedDict()
+    # the number of trajectories kept in memory (the least recently used are dropped)
+    memory_size = 4
+
+    def __init__(self, key: str, state: np.ndarray, times: np.ndarray, elements: dict):
+        self.key = key
+        self.state = state
+        self.times = times
+        self.elements = elements
+
+    @classmethod
+    def record(cls, key: str, state: np.ndarray, times) -> 'PlanetaryTrajectory':
+        """Empty trajectory to be filled with ``set_orbits`` during an integration."""
+        size = len(const.SIMULATION_PLANETS) - 1
+        return cls(key, state, np.asarray(times, dtype=float), {name: np.zeros((size, len(times))) for name in ELEMENTS})
+
+    def set_orbits(self, index: int, orbits):
+        """Store the orbits of the planets (the first ones in ``orbits``) for the output ``index``."""
+        for row in range(len(const.SIMULATION_PLANETS) - 1):
+            orbit = orbits[row]
+            for name in ELEMENTS:
+                self.elements[name][row, index] = getattr(orbit, name)
+
+    def planet(self, index_in_simulation: int) -> SimpleNamespace:
+        """Series of the elements of the planet with the given index in the simulation."""
+        return SimpleNamespace(**{name: values[index_in_simulation - 1] for name, values in self.elements.items()})
+
+    def matches(self, state: np.ndarray, times) -> bool:
+        """Whether the trajectory starts from exactly the same state of the planets and has the same outputs."""
+        return (
+            self.state.shape == state.shape
+            and np.array_equal(self.state, state)
+            and len(self.times) == len(times)
+            and np.array_equal(self.times, np.asarray(times, dtype=float))
+        )
+
+    @staticmethod
+    def filename(key: str) -> str:
+        return f"{os.getcwd()}/{c.get('PLANETS_TRAJECTORY_FILE')}".replace('.npz', f'-{key}.npz')
+
+    def save(self):
+        path = Path(self.filename(self.key))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f'.{path.stem}-{uuid.uuid4().hex}.npz')
+        np.savez(tmp, state=self.state, times=self.times, **self.elements)
+        os.replace(tmp, path)
+        self.evict(float(c.get('PLANETS_TRAJECTORY_SIZE')) * 1024**2)
+
+    @classmethod
+    def evict(cls, max_size: float, target: float = 0.9):
+        """Remove the least recently used files if they take more than ``max_size`` bytes (down to ``target`` of it)."""
+        files = []
+        for path in Path(cls.filename('*')).parent.glob(Path(cls.filename('*')).name):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        size = sum(item[1] for item in files)
+        if size <= max_size:
+            return
+        for _, file_size, path in sorted(files, key=lambda item: item[0]):
+            if size <= max_size * target:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            size -= file_size
+
+    @classmethod
+    def load(cls, key: str, state: np.ndarray, times):
+        """Cached trajectory for the key (from memory or the file) or None if there is none or it does not match the state."""
+        trajectory = cls._trajectories.get(key)
+        if trajectory is None:
+            path = Path(cls.filename(key))
+            if not path.exists():
+                return None
+            try:
+                with np.load(path) as data:
+                    trajectory = cls(key, data['state'], data['times'], {name: data[name] for name in ELEMENTS})
+                os.utime(path)
+            except Exception:
+                return None
+        if not trajectory.matches(state, times):
+            return None
+        cls._remember(trajectory)
+        return trajectory
+
+    def store(self):
+        """Keep the trajectory in memory and in the file."""
+        self._remember(self)
+        self.save()
+
+    @classmethod
+    def _remember(cls, trajectory: 'PlanetaryTrajectory'):
+        cls._trajectories[trajectory.key] = trajectory
+        cls._trajectories.move_to_end(trajectory.key)
+        while len(cls._trajectories) > cls.memory_size:
+            cls._trajectories.popitem(last=False)
+
+    @classmethod
+    def clear_cache(cls):
+        """Forget the trajectories held in memory."""
+        cls._trajectories = OrderedDict()
@@ -0,0 +1,73 @@
+import queue
+import threading
+
+import resonances
+
+
+class AsyncWriter:
+    """
+    Runs output tasks (saving and plotting) on background threads.
+
+    Tasks are put into a bounded queue, so the producer blocks when the writers fall behind (backpressure).
+    If ``workers`` is 0, tasks are executed synchronously in the calling thread.
+    """
+
+    def __init__(self, workers: int = 1, queue_size: int = 32):
+        self.workers = max(0, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self._queue = None
+        self._threads = []
+        self._errors = []
+        self._errors_lock = threading.Lock()
+
+    @property
+    def is_async(self) -> bool:
+        return self.workers > 0
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule a task. Blocks if the queue is full."""
+        if not self.is_async:
+            fn(*args, **kwargs)
+            return
+
+        self._start()
+        self._queue.put((fn, args, kwargs))
+
+    def flush(self):
+        """Wait for all queued tasks, stop the threads and re-raise the first failed task (if any)."""
+        if self._threads:
+            for _ in self._threads:
+                self._queue.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+            self._queue = None
+
+        if self._errors:
+            errors, self._errors = self._errors, []
+            raise errors[0]
+
+    def _start(self):
+        if self._threads:
+            return
+
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f'resonances-writer-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                fn, args, kwargs = task
+                fn(*args, **kwargs)
+            except Exception as e:
+                resonances.logger.error(f"Error in background writer: {e}")
+                with self._errors_lock:
+                    self._errors.append(e)
+            finally:
+                self._queue.task_done()
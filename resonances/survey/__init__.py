@@ -0,0 +1,22 @@
+from .cost import CostModel, lpt, makespan
+from .manifest import Manifest, read_catalog
+from .runner import create_chunk_simulation, run_chunk, run_survey
+from .queue import WorkQueue, work
+from .incremental import CatalogDiff, create_incremental, diff_catalogs, load_snapshot
+
+__all__ = [
+    'CostModel',
+    'lpt',
+    'makespan',
+    'Manifest',
+    'read_catalog',
+    'create_chunk_simulation',
+    'run_chunk',
+    'run_survey',
+    'WorkQueue',
+    'work',
+    'CatalogDiff',
+    'create_incremental',
+    'diff_catalogs',
+    'load_snapshot',
+]
@@ -0,0 +1,141 @@
+"""
+Cost model of the chunks of a survey and their load-balanced scheduling.
+
+The time of a chunk is modelled as a linear function of its features (the sums over its bodies):
+
+- ``chunk``: 1 (the Solar System, the config, the summary);
+- ``steps``: ``|tmax| / dt``, the steps of the planets;
+- ``body_steps``: ``steps * bodies``, the steps of the asteroids;
+- ``body_outputs``: ``Nout * bodies``, the orbits and the filters of the semi-major axis;
+- ``resonance_outputs``: ``Nout * resonances``, the angles, their filters and periodograms;
+- ``plots``: the number of resonances if the plots are made, otherwise 0.
+
+The default coefficients are rough estimates for the default integrator SABA(10,6,4) on a single core (WHFast takes
+about a fifth of the time per step). ``CostModel.calibrate`` fits them
+(non-negative least squares) to the completion records of previous surveys, which keep the features of every chunk
+and the time spent.
+"""
+
+import heapq
+import json
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+FEATURES = ['chunk', 'steps', 'body_steps', 'body_outputs', 'resonance_outputs', 'plots']
+DEFAULT_COEFFICIENTS = {
+    'chunk': 0.02,
+    'steps': 2e-5,
+    'body_steps': 2e-6,
+    'body_outputs': 5e-6,
+    'resonance_outputs': 5e-6,
+    'plots': 0.3,
+}
+
+PROCESS_MEMORY = 250 * 1024**2  # an interpreter with the package and its dependencies imported
+BODY_SERIES = 10  # a, e, inc, Omega, omega, M, longitude, varpi, filtered a and its periodogram
+RESONANCE_SERIES = 4  # the angle, its filter, periodogram and librations
+PLANETS_SERIES = 63  # the cached trajectory of 9 planets with 7 elements
+
+
+def chunk_features(settings: dict, resonances_per_body: List[int]) -> dict:
+    """
+    Features of a chunk with the given numbers of resonances of its bodies.
+
+    ``settings`` has ``tmax``, ``dt``, ``Nout`` and ``plot`` (as in ``SimulationConfig``).
+    """
+    bodies = len(resonances_per_body)
+    count = sum(resonances_per_body)
+    steps = abs(settings['tmax']) / settings['dt']
+    return {
+        'chunk': 1.0,
+        'steps': steps,
+        'body_steps': steps * bodies,
+        'body_outputs': float(settings['Nout'] * bodies),
+        'resonance_outputs': float(settings['Nout'] * count),
+        'plots': float(count) if settings.get('plot') else 0.0,
+    }
+
+
+class CostModel:
+    """Predicted time (seconds) and memory (bytes) of chunks (see the module docstring)."""
+
+    def __init__(self, coefficients: dict = None):
+        self.coefficients = {**DEFAULT_COEFFICIENTS, **(coefficients or {})}
+
+    def seconds(self, features: dict) -> float:
+        return sum(self.coefficients[name] * features[name] for name in FEATURES)
+
+    def body_seconds(self, settings: dict, resonances: int) -> float:
+        """Time added to a chunk by a body with ``resonances`` resonances."""
+        features = chunk_features(settings, [resonances])
+        return self.seconds(features) - self.coefficients['chunk'] - self.coefficients['steps'] * features['steps']
+
+    @staticmethod
+    def memory(settings: dict, resonances_per_body: List[int]) -> float:
+        """Peak memory of a process running the chunk."""
+        series = BODY_SERIES * len(resonances_per_body) + RESONANCE_SERIES * sum(resonances_per_body) + PLANETS_SERIES
+        return PROCESS_MEMORY + 8.0 * settings['Nout'] * series
+
+    @classmethod
+    def calibrate(cls, records: List[dict]) -> 'CostModel':
+        """
+        Fit the coefficients to the completion records (with the features and ``seconds``) of previous chunks.
+
+        The features that do not vary in the records cannot be separated from the others, so only the features that
+        are not zero in some records are fitted, the rest keep the default values.
+        """
+        from scipy.optimize import nnls
+
+        records = [record for record in records if all(name in record for name in FEATURES) and 'seconds' in record]
+        if len(records) == 0:
+            return cls()
+        X = np.array([[record[name] for name in FEATURES] for record in records])
+        y = np.array([record['seconds'] for record in records])
+        fitted = [i for i in range(len(FEATURES)) if np.any(X[:, i] > 0)]
+        # the columns are scaled to make the problem well conditioned
+        scale = np.max(np.abs(X[:, fitted]), axis=0)
+        solution, _ = nnls(X[:, fitted] / scale, y)
+        return cls({FEATURES[i]: value for i, value in zip(fitted, solution / scale)})
+
+    @classmethod
+    def from_surveys(cls, directories: List) -> 'CostModel':
+        """Model calibrated by the chunks done in the directories of previous surveys."""
+        return cls.calibrate(load_records(directories))
+
+
+def load_records(directories: List) -> List[dict]:
+    """Completion records of the chunks done in the directories of surveys."""
+    records = []
+    for directory in directories:
+        for path in sorted(Path(directory).glob('chunks/*.json')):
+            records.append(json.loads(path.read_text()))
+    return records
+
+
+def lpt(costs: List[float], bins: int) -> List[List[int]]:
+    """
+    Longest-processing-time-first packing: the items (indexes of ``costs``) from the most expensive one are put
+    into the bin with the smallest total cost. Returns the indexes in every bin (the bins are not empty if possible).
+    """
+    bins = max(1, min(bins, len(costs)))
+    # the ties (i.e. zero costs) go to the bin with fewer items
+    heap = [(0.0, 0, i) for i in range(bins)]
+    result = [[] for _ in range(bins)]
+    for item in sorted(range(len(costs)), key=lambda i: -costs[i]):
+        total, size, i = heapq.heappop(heap)
+        result[i].append(item)
+        heapq.heappush(heap, (total + costs[item], size + 1, i))
+    return [sorted(items) for items in result]
+
+
+def makespan(costs: List[float], workers: int) -> float:
+    """
+    Wall time of the chunks with ``costs`` taken by ``workers`` from a queue in the given order (the chunks are
+    submitted in the order of their indexes; for the LPT schedule, it is the order of decreasing cost).
+    """
+    finish = [0.0] * max(1, workers)
+    for cost in costs:
+        heapq.heappush(finish, heapq.heappop(finish) + cost)
+    return max(finish)
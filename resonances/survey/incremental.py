@@ -0,0 +1,129 @@
+"""
+Incremental surveys: only the asteroids whose elements have changed since a previous survey are integrated again.
+
+Every survey keeps the snapshot of its catalog in ``elements.csv``: the elements of every asteroid, their epoch (the
+``epoch`` column of the catalog, or the date of the simulations) and the hash of both. When the catalog is refreshed
+(e.g. a new ``allnum.cat`` from AstDyS converted to CSV), the new snapshot is compared with the snapshot of the
+previous survey:
+
+- ``new``: the asteroid is not in the previous snapshot;
+- ``unchanged``: the hash is the same, or every element differs by less than its tolerance;
+- ``changed``: the other asteroids;
+- ``removed``: the asteroid is not in the new catalog anymore.
+
+The new survey runs only the new and changed asteroids. The rows of the previous summary for the unchanged asteroids
+are copied to ``carried.csv`` and added to the summary of the new survey. The snapshot of the new survey keeps the
+previous rows of the unchanged asteroids (the elements their results were computed from), so small changes do not
+add up over the refreshes without a new integration.
+
+The mean anomaly is not compared by default: it changes with the epoch even if the orbit is the same.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import resonances
+from .manifest import CARRIED_FILE, MANIFEST_FILE, SNAPSHOT_FILE, Manifest, read_catalog, snapshot, write_atomic
+
+WORK_FILE = 'work.csv'
+ANGLES = ['inc', 'Omega', 'omega', 'M']
+DEFAULT_TOLERANCE = {'a': 1e-4, 'e': 1e-4, 'inc': 1e-4, 'Omega': 1e-3, 'omega': 1e-3}
+
+
+def load_snapshot(directory) -> pd.DataFrame:
+    """
+    Snapshot of the catalog of the survey in ``directory``. The surveys without ``elements.csv`` use the initial
+    elements in their summary (only the asteroids with results are there) and the date of the simulations.
+    """
+    directory = Path(directory)
+    if (directory / SNAPSHOT_FILE).exists():
+        return pd.read_csv(directory / SNAPSHOT_FILE, dtype={'num': str, 'epoch': str}).set_index('num')
+    summary = pd.read_csv(directory / 'summary.csv', dtype={'name': str})
+    catalog = summary.drop_duplicates('name').set_index('name')
+    catalog.index.name = 'num'
+    return snapshot(catalog, Manifest.load(directory).simulation.get('date'))
+
+
+@dataclass
+class CatalogDiff:
+    """Names of the asteroids of the new catalog by their state relative to the previous survey."""
+
+    new: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    @property
+    def work(self) -> List[str]:
+        """The asteroids to run: the new and the changed ones."""
+        return self.new + self.changed
+
+
+def diff_catalogs(previous: pd.DataFrame, current: pd.DataFrame, tolerance: dict = None) -> CatalogDiff:
+    """
+    Compare the snapshots (see ``snapshot``). ``tolerance`` is the maximum difference of each compared element
+    (the angles in radians); with ``tolerance={}``, only the asteroids with the same hash are unchanged.
+    """
+    tolerance = DEFAULT_TOLERANCE if tolerance is None else tolerance
+    diff = CatalogDiff(removed=[name for name in previous.index if name not in current.index])
+    known = current.index.isin(previous.index)
+    diff.new = current.index[~known].tolist()
+
+    names = current.index[known]
+    old = previous.loc[names]
+    same = (current.loc[names, 'hash'] == old['hash']).to_numpy()
+    if len(tolerance) > 0:
+        close = np.ones(len(names), dtype=bool)
+        for element, limit in tolerance.items():
+            delta = np.abs(current.loc[names, element].to_numpy() - old[element].to_numpy())
+            if element in ANGLES:
+                delta = np.minimum(delta % (2 * np.pi), 2 * np.pi - delta % (2 * np.pi))
+            close &= delta <= limit
+        same |= close
+    for name, unchanged in zip(names, same):
+        (diff.unchanged if unchanged else diff.changed).append(name)
+    return diff
+
+
+def create_incremental(directory, catalog, previous, tolerance: dict = None, write: bool = True, **kwargs) -> Tuple[Manifest, CatalogDiff]:
+    """
+    Create the survey in ``directory`` with the new and changed asteroids of ``catalog`` relative to the survey in
+    ``previous``. The results of the unchanged asteroids are taken from the summary of the previous survey.
+    ``kwargs`` are the arguments of ``Manifest.create`` (the settings should be those of the previous survey, otherwise
+    the carried results are not comparable with the new ones).
+
+    Returns the manifest and the diff. An existing survey in ``directory`` is resumed as it is. With ``write=False``,
+    nothing is written and the manifest of the work list is planned in memory (see ``Manifest.create``).
+    """
+    directory = Path(directory)
+    previous = Path(previous)
+    df = read_catalog(catalog)
+    current = snapshot(df, (kwargs.get('simulation') or {}).get('date'))
+    recorded = load_snapshot(previous)
+    diff = diff_catalogs(recorded, current, tolerance)
+    work = df[df.index.isin(diff.work)]
+    if (directory / MANIFEST_FILE).exists() or not write:
+        return Manifest.create(directory, directory / WORK_FILE, write=write, elements=work, **kwargs), diff
+
+    settings = Manifest.load(previous).settings()
+    for name in ['resonances', 'planets', 'sigma2', 'sigma3']:
+        if name in kwargs and kwargs[name] != settings[name]:
+            resonances.logger.warning(f'The survey in {previous} has other {name}, its results are carried forward anyway')
+
+    summary = pd.read_csv(previous / 'summary.csv', dtype={'name': str})
+    carried = summary[summary['name'].isin(diff.unchanged)]
+    write_atomic(directory / CARRIED_FILE, lambda path: carried.to_csv(path, index=False))
+    write_atomic(directory / WORK_FILE, lambda path: work.to_csv(path))
+    # the snapshot has the whole catalog: the next survey is compared with all asteroids, not only with the work list.
+    # The carried asteroids keep the elements of their results, otherwise the drift within the tolerance accumulates
+    current.loc[diff.unchanged] = recorded.loc[diff.unchanged, current.columns]
+    write_atomic(directory / SNAPSHOT_FILE, lambda path: current.to_csv(path))
+    resonances.logger.info(
+        f'Catalog diff with {previous}: {len(diff.new)} new, {len(diff.changed)} changed, '
+        f'{len(diff.unchanged)} unchanged, {len(diff.removed)} removed asteroids'
+    )
+    return Manifest.create(directory, directory / WORK_FILE, elements=work, **kwargs), diff
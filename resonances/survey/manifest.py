@@ -0,0 +1,260 @@
+"""
+Job manifest of a survey: the catalog, the resonances, the settings of the simulations and the chunks of asteroids.
+
+A survey lives in its own directory::
+
+    manifest.json            the manifest (written once), with the numbers of resonances of the bodies of every chunk
+    elements.csv             the snapshot of the catalog: the elements, their epoch and hash (see ``incremental``)
+    chunks/00000.csv         the summary of the chunk 0 (the columns of resonances.results.SUMMARY_COLUMNS)
+    chunks/00000.json        the completion record of the chunk 0 (written after the summary)
+    carried.csv              the results taken from a previous survey (only in incremental surveys)
+    summary.csv              all summaries merged when the survey is finished
+
+A chunk is done when its completion record exists. Both files are written to temporary files first and renamed,
+so an interrupted survey never sees a half-written chunk and resumes from the first chunk without a record.
+"""
+
+import hashlib
+import json
+import math
+import os
+import uuid
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+import resonances
+from resonances.config import config as c
+from resonances.results import SUMMARY_COLUMNS
+from .cost import CostModel, chunk_features, lpt, makespan
+
+MANIFEST_FILE = 'manifest.json'
+SNAPSHOT_FILE = 'elements.csv'
+CARRIED_FILE = 'carried.csv'
+SETTINGS = ['catalog', 'resonances', 'planets', 'sigma2', 'sigma3', 'simulation', 'chunk_size', 'schedule']
+ELEMENTS = ['a', 'e', 'inc', 'Omega', 'omega', 'M']
+
+
+def write_atomic(path: Path, write):
+    """Call ``write(tmp_path)`` and rename the temporary file to ``path``."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f'.{path.name}.{uuid.uuid4().hex}')
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def read_catalog(path) -> pd.DataFrame:
+    """Catalog of elements (``num,a,e,inc,Omega,omega,M``, angles in radians) indexed by the names of the asteroids."""
+    df = pd.read_csv(path, dtype={'num': str})
+    return df.set_index('num')
+
+
+def elements_hash(elem: dict, epoch) -> str:
+    """Hash of the elements (to 10 significant digits, so the values read back from CSV have the same hash) and the epoch."""
+    text = ','.join([str(epoch)] + [f'{float(elem[name]):.10g}' for name in ELEMENTS])
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def snapshot(catalog: pd.DataFrame, epoch=None) -> pd.DataFrame:
+    """Elements, epochs (the ``epoch`` column of the catalog or ``epoch``) and hashes of the asteroids of the catalog."""
+    df = catalog[ELEMENTS].astype(float)
+    df['epoch'] = catalog['epoch'].astype(str) if 'epoch' in catalog.columns else str(epoch)
+    df['hash'] = [elements_hash(elem, elem['epoch']) for elem in df.to_dict('records')]
+    return df
+
+
+class Manifest:
+    """Description of a survey and the state of its chunks (see the module docstring)."""
+
+    def __init__(
+        self,
+        directory,
+        catalog: str,
+        chunks: List[List[str]],
+        resonances: List[str] = None,
+        planets: List[str] = None,
+        sigma2: float = 0.1,
+        sigma3: float = 0.02,
+        simulation: dict = None,
+        chunk_size: int = 500,
+        schedule: str = 'fixed',
+        counts: List[List[int]] = None,
+    ):
+        self.directory = Path(directory)
+        self.catalog = catalog
+        self.chunks = chunks
+        self.resonances = resonances
+        self.planets = planets
+        self.sigma2 = sigma2
+        self.sigma3 = sigma3
+        self.simulation = simulation or {}
+        self.chunk_size = chunk_size
+        self.schedule = schedule
+        self.counts = counts
+
+    @classmethod
+    def create(
+        cls,
+        directory,
+        catalog: str,
+        chunk_size: int = 500,
+        schedule: str = 'fixed',
+        workers: int = 1,
+        cost_model: CostModel = None,
+        write: bool = True,
+        elements: pd.DataFrame = None,
+        **settings,
+    ) -> 'Manifest':
+        """
+        Split the catalog into chunks and write the manifest, or load the manifest if the survey already exists.
+
+        ``settings`` are ``resonances`` (notations to check for every asteroid; if None, the MMRs are found for every
+        asteroid with ``planets``, ``sigma2`` and ``sigma3``) and ``simulation`` (parameters of ``Simulation``).
+        An existing survey with other settings raises an exception: a survey cannot be changed after it starts.
+
+        With ``schedule='fixed'``, the chunks are the consecutive asteroids of the catalog. With ``schedule='lpt'``,
+        the asteroids are packed into chunks of the same predicted cost (``cost_model``, see
+        ``resonances.survey.cost``), the number of chunks is a multiple of ``workers``, and the most expensive
+        chunks go first.
+
+        With ``write=False``, nothing is written (i.e. to predict the cost of a survey): the existing survey with the
+        same settings is loaded, otherwise the manifest is planned in memory. ``elements`` is the catalog if it is
+        already read (see ``read_catalog``).
+        """
+        if schedule not in ('fixed', 'lpt'):
+            raise ValueError(f'Unknown schedule {schedule}, use fixed or lpt.')
+        directory = Path(directory)
+        manifest = cls(directory, str(catalog), [], chunk_size=chunk_size, schedule=schedule, **settings)
+        if (directory / MANIFEST_FILE).exists():
+            existing = cls.load(directory)
+            if existing.settings() == manifest.settings():
+                resonances.logger.info(
+                    f'Resuming the survey in {directory}: {len(existing.pending())} of {len(existing.chunks)} chunks left'
+                )
+                return existing
+            if write:
+                raise ValueError(f'The survey in {directory} has other settings. Use another directory for a new survey.')
+
+        df = read_catalog(catalog) if elements is None else elements
+        manifest.plan(df, workers, cost_model)
+        if not write:
+            return manifest
+        if not (directory / SNAPSHOT_FILE).exists():
+            write_atomic(directory / SNAPSHOT_FILE, lambda path: snapshot(df, manifest.simulation.get('date')).to_csv(path))
+        write_atomic(directory / MANIFEST_FILE, lambda path: path.write_text(json.dumps(manifest.to_dict(), indent=2)))
+        resonances.logger.info(f'Created the survey in {directory}: {len(df)} asteroids in {len(manifest.chunks)} chunks')
+        return manifest
+
+    def plan(self, df: pd.DataFrame, workers: int = 1, cost_model: CostModel = None):
+        """Split the asteroids of the catalog ``df`` into the chunks of the manifest (see ``create``)."""
+        names = df.index.tolist()
+        counts = self.resonance_counts(df)
+        if self.schedule == 'fixed':
+            groups = [list(range(i, min(i + self.chunk_size, len(names)))) for i in range(0, len(names), self.chunk_size)]
+        else:
+            model = cost_model or CostModel()
+            costs = [model.body_seconds(self.cost_settings(), count) for count in counts]
+            workers = max(1, workers)
+            groups = lpt(costs, math.ceil(math.ceil(len(names) / self.chunk_size) / workers) * workers)
+            groups = sorted((group for group in groups if len(group) > 0), key=lambda group: -sum(costs[i] for i in group))
+        self.chunks = [[names[i] for i in group] for group in groups]
+        self.counts = [[counts[i] for i in group] for group in groups]
+
+    def candidates(self, df: pd.DataFrame) -> pd.DataFrame:
+        """MMRs near the asteroids of the catalog ``df``, found for all of them at once (see ``find_mmrs_batch``)."""
+        # by the positions of the asteroids (not by their names)
+        return resonances.find_mmrs_batch(df['a'].to_numpy(), planets=self.planets, sigma2=self.sigma2, sigma3=self.sigma3)
+
+    def resonance_counts(self, df: pd.DataFrame) -> List[int]:
+        """Number of the resonances to check for every asteroid of the catalog ``df``."""
+        if self.resonances is not None:
+            return [len(self.resonances)] * len(df)
+        return np.bincount(self.candidates(df)['index'], minlength=len(df)).tolist()
+
+    def resonances_of(self, df: pd.DataFrame) -> List[list]:
+        """Resonances to check for every asteroid of the catalog ``df``."""
+        if self.resonances is not None:
+            return [list(self.resonances) for _ in range(len(df))]
+        found = [[] for _ in range(len(df))]
+        candidates = self.candidates(df)
+        for position, mmr in zip(candidates['index'], candidates['mmr']):
+            found[position].append(resonances.create_resonance(mmr))
+        return found
+
+    def cost_settings(self) -> dict:
+        """``tmax``, ``dt``, ``Nout`` and ``plot`` of the simulations of the chunks (for the cost model)."""
+        tmax = self.simulation.get('tmax', int(c.get('INTEGRATION_TMAX')))
+        return {
+            'tmax': tmax,
+            'dt': self.simulation.get('dt', float(c.get('INTEGRATION_DT'))),
+            'Nout': self.simulation.get('Nout', abs(int(tmax / 100))),
+            'plot': self.simulation.get('plot'),
+        }
+
+    def predict(self, workers: int = 1, cost_model: CostModel = None, chunks: List[int] = None) -> dict:
+        """
+        Predicted time of every chunk (or only of ``chunks``), the wall time of the survey with ``workers`` local
+        processes (seconds) and its peak memory (bytes).
+        """
+        model = cost_model or CostModel()
+        settings = self.cost_settings()
+        chunks = range(len(self.chunks)) if chunks is None else chunks
+        costs = [model.seconds(chunk_features(settings, self.counts[index])) for index in chunks]
+        memory = [model.memory(settings, self.counts[index]) for index in chunks]
+        busy = sorted(memory, reverse=True)[: max(1, workers)]
+        return {'chunks': costs, 'seconds': makespan(costs, workers), 'memory': sum(busy)}
+
+    @classmethod
+    def load(cls, directory) -> 'Manifest':
+        data = json.loads((Path(directory) / MANIFEST_FILE).read_text())
+        return cls(directory, **data)
+
+    def settings(self) -> dict:
+        return json.loads(json.dumps({name: getattr(self, name) for name in SETTINGS}))
+
+    def to_dict(self) -> dict:
+        return {**self.settings(), 'chunks': self.chunks, 'counts': self.counts}
+
+    def chunk_path(self, index: int, suffix: str = 'csv') -> Path:
+        return self.directory / 'chunks' / f'{index:05d}.{suffix}'
+
+    def is_done(self, index: int) -> bool:
+        return self.chunk_path(index, 'json').exists()
+
+    def pending(self) -> List[int]:
+        """Indexes of the chunks without the completion record."""
+        return [index for index in range(len(self.chunks)) if not self.is_done(index)]
+
+    def complete(self, index: int, summary: pd.DataFrame, record: dict):
+        """Store the summary of the chunk and mark it as done (``record`` has the time spent and the features of the chunk)."""
+        write_atomic(self.chunk_path(index), lambda path: summary.to_csv(path, index=False))
+        record = {'chunk': index, 'bodies': len(self.chunks[index]), 'rows': len(summary), **record}
+        write_atomic(self.chunk_path(index, 'json'), lambda path: path.write_text(json.dumps(record)))
+
+    def record(self, index: int) -> dict:
+        """Completion record of the chunk (the number of bodies and rows, the time spent) or None if it is not done."""
+        path = self.chunk_path(index, 'json')
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def summary(self) -> pd.DataFrame:
+        """Summaries of all done chunks in the order of the chunks, then the results carried from a previous survey."""
+        frames = [pd.read_csv(self.chunk_path(index), dtype={'name': str}) for index in range(len(self.chunks)) if self.is_done(index)]
+        if (self.directory / CARRIED_FILE).exists():
+            frames.append(pd.read_csv(self.directory / CARRIED_FILE, dtype={'name': str}))
+        frames = [df for df in frames if len(df) > 0]
+        if len(frames) == 0:
+            return pd.DataFrame(columns=SUMMARY_COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+    def merge(self) -> pd.DataFrame:
+        """Write ``summary.csv`` with the summaries of all done chunks (and the carried results)."""
+        df = self.summary()
+        write_atomic(self.directory / 'summary.csv', lambda path: df.to_csv(path, index=False))
+        return df
@@ -0,0 +1,178 @@
+"""
+Work queue of the chunks of a survey on a shared filesystem (NFS, Lustre) for workers on many nodes.
+
+The queue is a set of empty files in the directory of the survey::
+
+    queue/todo/00000                  the chunk 0 is waiting
+    queue/leased/00000~node1-4242     the chunk 0 is run by the worker node1-4242
+
+A worker takes a chunk by renaming its file from ``todo`` to ``leased``. The rename is atomic, so when several
+workers try to take the same chunk, only one of them succeeds (the others do not find the file anymore). While the
+chunk runs, the worker updates the modification time of its lease (heartbeat). A lease without heartbeats for
+``lease_timeout`` seconds belongs to a dead worker: any worker or the coordinator renames it back to ``todo``.
+The results of a chunk are written by ``Manifest.complete`` (see ``resonances.survey.manifest``), then the lease is
+removed. If a worker with an expired lease is still alive, the chunk is computed twice with the same result.
+
+The clocks of the nodes and of the file server should be synchronized within a small part of ``lease_timeout``.
+"""
+
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+
+import resonances
+from .manifest import Manifest
+from .runner import run_chunk
+
+SEPARATOR = '~'
+
+
+class WorkQueue:
+    """Queue of the chunks of the survey in ``directory`` (see the module docstring)."""
+
+    def __init__(self, directory, lease_timeout: float = 600.0):
+        self.directory = Path(directory)
+        self.lease_timeout = lease_timeout
+        self.todo = self.directory / 'queue' / 'todo'
+        self.leased = self.directory / 'queue' / 'leased'
+
+    @classmethod
+    def create(cls, directory, lease_timeout: float = 600.0) -> 'WorkQueue':
+        """Put all pending chunks of the survey (which must exist) into the queue. Done by the coordinator once."""
+        queue = cls(directory, lease_timeout)
+        manifest = Manifest.load(directory)
+        queue.todo.mkdir(parents=True, exist_ok=True)
+        queue.leased.mkdir(parents=True, exist_ok=True)
+        leased = {index for index, _, _ in queue.leases()}
+        for index in manifest.pending():
+            if index not in leased:
+                queue.token(index).touch()
+        return queue
+
+    def token(self, index: int) -> Path:
+        return self.todo / f'{index:05d}'
+
+    def lease_path(self, index: int, worker: str) -> Path:
+        return self.leased / f'{index:05d}{SEPARATOR}{worker}'
+
+    def waiting(self) -> list:
+        """Indexes of the chunks waiting in the queue."""
+        return sorted(int(path.name) for path in self.todo.iterdir() if path.name.isdigit())
+
+    def leases(self) -> list:
+        """``(index, worker, age of the last heartbeat in seconds)`` for every leased chunk."""
+        result = []
+        now = time.time()
+        for path in self.leased.iterdir():
+            index, _, worker = path.name.partition(SEPARATOR)
+            try:
+                age = now - path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            result.append((int(index), worker, age))
+        return sorted(result)
+
+    def acquire(self, worker: str):
+        """Take a waiting chunk. Returns its index or None if nothing is waiting."""
+        for index in self.waiting():
+            try:
+                os.rename(self.token(index), self.lease_path(index, worker))
+            except FileNotFoundError:
+                continue  # taken by another worker
+            return index
+        return None
+
+    def heartbeat(self, index: int, worker: str) -> bool:
+        """Renew the lease. Returns False if the lease has been lost (reclaimed as expired)."""
+        try:
+            os.utime(self.lease_path(index, worker))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def release(self, index: int, worker: str):
+        """Remove the lease of a done chunk."""
+        try:
+            os.remove(self.lease_path(index, worker))
+        except FileNotFoundError:
+            pass
+
+    def reclaim(self) -> list:
+        """Put the chunks with expired leases back into the queue. Returns their indexes."""
+        reclaimed = []
+        for index, worker, age in self.leases():
+            if age <= self.lease_timeout:
+                continue
+            try:
+                os.rename(self.lease_path(index, worker), self.token(index))
+            except FileNotFoundError:
+                continue  # released or reclaimed by somebody else
+            resonances.logger.warning(
+                f'The lease of the chunk {index} by {worker} has expired ({age:.0f}s), the chunk is back in the queue'
+            )
+            reclaimed.append(index)
+        return reclaimed
+
+    def status(self) -> dict:
+        """Progress of the survey: the numbers of done, waiting and leased chunks and the leases."""
+        manifest = Manifest.load(self.directory)
+        leases = self.leases()
+        return {
+            'total': len(manifest.chunks),
+            'done': len(manifest.chunks) - len(manifest.pending()),
+            'waiting': len(self.waiting()),
+            'leased': len(leases),
+            'expired': sum(1 for _, _, age in leases if age > self.lease_timeout),
+            'leases': [{'chunk': index, 'worker': worker, 'age': age} for index, worker, age in leases],
+        }
+
+
+def worker_name() -> str:
+    return f'{socket.gethostname()}-{os.getpid()}'
+
+
+def work(directory, worker: str = None, lease_timeout: float = 600.0, heartbeat: float = None, poll: float = None) -> list:
+    """
+    Take chunks from the queue and run them until the queue is empty and no chunks are leased by other workers.
+
+    ``heartbeat`` (default: a tenth of ``lease_timeout``) is the interval of the heartbeats of a running chunk,
+    ``poll`` (default: ``heartbeat``) is the interval of the checks of the queue while other workers run the last
+    chunks (their leases might expire). Returns the indexes of the chunks done by this worker.
+    """
+    worker = worker or worker_name()
+    heartbeat = heartbeat or lease_timeout / 10
+    poll = poll or heartbeat
+    queue = WorkQueue(directory, lease_timeout)
+    done = []
+
+    while True:
+        index = queue.acquire(worker)
+        if index is None:
+            if queue.reclaim():
+                continue
+            if len(queue.leases()) == 0:
+                break
+            time.sleep(poll)
+            continue
+
+        resonances.logger.info(f'Worker {worker} runs the chunk {index}')
+        stop = threading.Event()
+        beat = threading.Thread(target=_beat, args=(queue, index, worker, heartbeat, stop), daemon=True)
+        beat.start()
+        try:
+            run_chunk(directory, index)
+        finally:
+            stop.set()
+            beat.join()
+        queue.release(index, worker)
+        done.append(index)
+    return done
+
+
+def _beat(queue: WorkQueue, index: int, worker: str, interval: float, stop: threading.Event):
+    while not stop.wait(interval):
+        if not queue.heartbeat(index, worker):
+            resonances.logger.warning(f'Worker {worker} has lost the lease of the chunk {index}')
+            return
@@ -0,0 +1,78 @@
+"""Execution of the chunks of a survey by local workers."""
+
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+import resonances
+from .cost import CostModel, chunk_features
+from .manifest import ELEMENTS, Manifest, read_catalog
+
+
+def create_chunk_simulation(manifest: Manifest, index: int, catalog: pd.DataFrame = None) -> resonances.Simulation:
+    """Simulation with the asteroids of the chunk and their resonances (not run)."""
+    catalog = read_catalog(manifest.catalog) if catalog is None else catalog
+    settings = {'save': None, 'plot': None, 'save_summary': False, **manifest.simulation}
+    # the saved data and plots of every chunk are in its own directory
+    settings.setdefault('save_path', str(manifest.directory / 'results' / f'{index:05d}'))
+    settings.setdefault('plot_path', str(manifest.directory / 'results' / f'{index:05d}'))
+    settings.setdefault('name', f'{manifest.directory.name}-{index:05d}')
+    sim = resonances.Simulation(**settings)
+    sim.create_solar_system()
+    # Nout is not a parameter of SimulationConfig, it is computed from tmax (as in the finders)
+    sim.config.Nout = manifest.simulation.get('Nout', sim.config.Nout)
+
+    bodies = catalog.loc[manifest.chunks[index], ELEMENTS]
+    for name, elem, found in zip(bodies.index, bodies.to_dict('records'), manifest.resonances_of(bodies)):
+        if len(found) > 0:
+            sim.add_body({key: float(value) for key, value in elem.items()}, found, name=name)
+    return sim
+
+
+def run_chunk(directory, index: int) -> dict:
+    """Run the chunk of the survey and mark it as done. Returns the completion record."""
+    manifest = Manifest.load(directory)
+    if manifest.is_done(index):
+        return manifest.record(index)
+
+    start = time.time()
+    sim = create_chunk_simulation(manifest, index)
+    sim.run()
+    summary = sim.data_manager.get_simulation_summary(sim.bodies)
+    # the features of the chunk calibrate the cost model of the next surveys
+    settings = {'tmax': sim.config.tmax, 'dt': sim.config.dt, 'Nout': sim.config.Nout, 'plot': sim.config.plot}
+    features = chunk_features(settings, [len(body.mmrs) + len(body.secular_resonances) for body in sim.bodies])
+    manifest.complete(index, summary, {'seconds': time.time() - start, **features})
+    return manifest.record(index)
+
+
+def run_survey(directory, workers: int = 1, chunks=None, cost_model: CostModel = None) -> pd.DataFrame:
+    """
+    Run all pending chunks of the survey (or only ``chunks``) with ``workers`` local processes.
+
+    The chunks that are done are skipped, so an interrupted survey continues from where it stopped. Returns the
+    merged summary (also written to ``summary.csv``).
+    """
+    manifest = Manifest.load(directory)
+    pending = [index for index in (manifest.pending() if chunks is None else chunks) if not manifest.is_done(index)]
+    total = len(manifest.chunks)
+    prediction = manifest.predict(workers, cost_model, pending)
+    resonances.logger.info(
+        f'Survey {directory}: {len(pending)} of {total} chunks to run with {workers} workers, '
+        f"predicted {prediction['seconds']:.0f}s and {prediction['memory'] / 1024**2:.0f} MB"
+    )
+
+    if workers <= 1:
+        for index in pending:
+            record = run_chunk(directory, index)
+            resonances.logger.info(f"Chunk {index + 1}/{total} is done in {record['seconds']:.1f}s")
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(run_chunk, str(Path(directory)), index): index for index in pending}
+            for future in as_completed(futures):
+                record = future.result()
+                resonances.logger.info(f"Chunk {futures[future] + 1}/{total} is done in {record['seconds']:.1f}s")
+
+    return manifest.merge()
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from resonances.matrix.secular_frequencies import laplace_coefficient, proper_frequencies
+from resonances.matrix.secular_matrix import SecularMatrix
+
+
+def test_laplace_coefficient():
+    alpha = 0.5
+    psi = np.linspace(0, 2 * np.pi, 20000, endpoint=False)
+    expected = 2 * np.mean(np.cos(psi) / (1 - 2 * alpha * np.cos(psi) + alpha**2) ** 1.5)
+    assert laplace_coefficient(1.5, 1, alpha) == pytest.approx(expected, rel=1e-10)
+
+
+def test_proper_frequencies():
+    # (4) Vesta: the proper frequencies are g = 36.9 and s = -39.6 arcsec/yr
+    g, s = proper_frequencies([2.3615], [0.09], [0.11])
+    assert g[0] == pytest.approx(36.9, abs=3)
+    assert s[0] == pytest.approx(-39.6, abs=3)
+
+    g, s = proper_frequencies(np.array([2.2, 2.5, 2.8, 1.2]), np.array([0.1, 0.1, 0.1, 0.2]))
+    assert np.all(np.diff(g[:3]) > 0)
+    assert np.isnan(g[3])  # crosses the orbit of the Earth
+    assert np.isnan(s[3])
+
+
+def test_combinations():
+    a = pd.Series([2.05, 2.36, 2.8], index=['nu6', 'vesta', 'outer'])
+    df = SecularMatrix.combinations(a, [0.1, 0.1, 0.1], [0.1, 0.1, 0.1], formulas=['g-g6', 's-s6', 'g5-g6', 'g-g4'])
+    assert list(df.columns) == ['g-g6', 's-s6', 'g5-g6', 'g-g4']
+    assert list(df.index) == ['nu6', 'vesta', 'outer']
+    assert abs(df.loc['nu6', 'g-g6']) < 3
+    assert df['g5-g6'].nunique() == 1  # no asteroid frequency
+    assert df['g-g4'].isna().all()  # g4 is not in the planetary frequencies
+
+
+def test_find_resonances():
+    formulas = [res.to_s() for res in SecularMatrix.find_resonances(2.05, 0.1, 0.1, 1.5, order=2)]
+    assert 'nu6_Saturn' in formulas
+    assert 'nu16_Saturn' not in formulas
+
+    assert SecularMatrix.find_resonances(2.8, 0.1, 0.1, 3.0, formulas=['g-g6', 's-s6']) == []
+    # the orbit crosses the Earth, nothing can be pruned
+    formulas = ['g-g5', 'g-g6', 's-s6', 's-s7']
+    assert len(SecularMatrix.find_resonances(1.2, 0.2, 0.1, 3.0, formulas=formulas)) == len(formulas)
+    assert len(SecularMatrix.find_resonances(2.36, 0.1, 0.1)) < len(SecularMatrix.build())
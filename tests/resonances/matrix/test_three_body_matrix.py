@@ -1,7 +1,9 @@
+import numpy as np
 import pytest
 import pandas as pd
 from pathlib import Path
 import shutil
+from unittest.mock import patch
 
 import resonances
 from resonances.matrix.three_body_matrix import ThreeBodyMatrix
@@ -11,6 +13,7 @@ from resonances.matrix.three_body_matrix import ThreeBodyMatrix
 def run_around_tests():
     resonances.config.set(ThreeBodyMatrix.catalog_file, 'cache/tests/mmr-3body-test.csv')
     Path('cache/tests').mkdir(parents=True, exist_ok=True)
+    ThreeBodyMatrix.clear_cache()
     yield
     shutil.rmtree('cache/tests')
 
@@ -91,3 +94,97 @@ def test_recreate():
     assert Path('cache/tests/mmr-3body-test.csv').is_file() is True
     ThreeBodyMatrix.load()
     assert Path('cache/tests/mmr-3body-test.csv').is_file() is True
+
+
+def test_find_resonances_index():
+    ThreeBodyMatrix.load()
+    df = ThreeBodyMatrix.matrix
+
+    for a, sigma, planets in [(2.39, 0.1, None), (3.17, 0.02, ['Jupiter', 'Saturn']), (2.0, 0.05, ['Mars', 'Jupiter', 'Saturn'])]:
+        mask = (df['a'] >= a - sigma) & (df['a'] <= a + sigma)
+        if planets is not None:
+            mask &= df['planet1'].isin(planets) & df['planet2'].isin(planets)
+        mmrs = ThreeBodyMatrix.find_resonances(a, sigma=sigma, planets=planets)
+        assert [mmr.to_short() for mmr in mmrs] == df.loc[mask, 'mmr'].tolist()
+
+    mmr = ThreeBodyMatrix.find_resonances(2.39, sigma=0.1, planets=['Jupiter', 'Saturn'])[0]
+    assert isinstance(mmr, resonances.ThreeBody)
+    assert mmr is ThreeBodyMatrix.find_resonances(2.39, sigma=0.1, planets=['Jupiter', 'Saturn'])[0]
+
+
+def test_find_resonances_batch():
+    ThreeBodyMatrix.load()
+    values = np.array([2.39, 3.17, 0.1, np.nan, 2.39])
+    df = ThreeBodyMatrix.find_resonances_batch(values, sigma=0.02, planets=['Jupiter', 'Saturn', 'Mars'])
+
+    assert list(df.columns) == ['index', 'mmr', 'a', 'distance']
+    for i, a in enumerate(values):
+        expected = ThreeBodyMatrix.find_resonances(a, sigma=0.02, planets=['Jupiter', 'Saturn', 'Mars'])
+        found = df[df['index'] == i]
+        assert found['mmr'].astype(str).tolist() == [mmr.to_short() for mmr in expected]
+        assert np.allclose(found['a'], [mmr.resonant_axis for mmr in expected], rtol=1e-6)
+        assert np.allclose(found['distance'], np.abs(found['a'] - a))
+    assert (df['distance'] <= 0.02).all()
+
+
+def test_build_matches_resonances():
+    ThreeBodyMatrix.planets = ['Jupiter', 'Saturn']
+    df = ThreeBodyMatrix.build()
+    for row in df.itertuples():
+        mmr = resonances.ThreeBody([row.m1, row.m2, row.m, 0, 0, -(row.m1 + row.m2 + row.m)], [row.planet1, row.planet2])
+        assert mmr.to_short() == row.mmr
+        assert mmr.resonant_axis == row.a
+        assert abs(mmr.coeff[5]) == row.q
+    assert df.dtypes[['m1', 'm2', 'm', 'q']].eq(np.int64).all()
+
+
+def test_variants():
+    ThreeBodyMatrix.planets = ['Jupiter', 'Saturn']
+    key = ThreeBodyMatrix.variant_key()
+    ThreeBodyMatrix.load()
+    jupiter_saturn = ThreeBodyMatrix.matrix
+    assert Path(ThreeBodyMatrix.binary_filename(key), 'meta.json').is_file() is True
+    assert '4J-2S-1' in [mmr.to_short() for mmr in ThreeBodyMatrix.find_resonances(2.39, sigma=0.1)]
+
+    # changing the planets switches to another variant without reload=True
+    ThreeBodyMatrix.planets = ['Mars', 'Jupiter']
+    assert ThreeBodyMatrix.variant_key() != key
+    assert ThreeBodyMatrix.is_stale() is True
+    mmrs = ThreeBodyMatrix.find_resonances(2.39, sigma=0.1)
+    assert '4J-2S-1' not in [mmr.to_short() for mmr in mmrs]
+    assert {mmr.planets_names[0] for mmr in mmrs} == {'Mars'}
+
+    # both variants are kept in the process
+    ThreeBodyMatrix.planets = ['Jupiter', 'Saturn']
+    ThreeBodyMatrix.load()
+    assert ThreeBodyMatrix.matrix is jupiter_saturn
+
+    # the binary cache is memory-mapped and equal to the built matrix
+    ThreeBodyMatrix.clear_cache()
+    ThreeBodyMatrix.load()
+    assert ThreeBodyMatrix.matrix is not jupiter_saturn
+    base = ThreeBodyMatrix.matrix['a'].to_numpy()
+    while not isinstance(base, np.memmap) and base is not None:
+        base = base.base
+    assert isinstance(base, np.memmap)
+    pd.testing.assert_frame_equal(ThreeBodyMatrix.matrix, jupiter_saturn, check_exact=True)
+
+    # the limits are part of the key
+    order_max = resonances.config.get('MATRIX_3BODY_ORDER_MAX')
+    resonances.config.set('MATRIX_3BODY_ORDER_MAX', 2)
+    try:
+        assert ThreeBodyMatrix.variant_key() != key
+        assert ThreeBodyMatrix.is_stale() is True
+        ThreeBodyMatrix.load()
+        assert ThreeBodyMatrix.matrix['q'].max() <= 2
+    finally:
+        resonances.config.set('MATRIX_3BODY_ORDER_MAX', order_max)
+
+
+def test_index_does_not_hash_the_variant():
+    ThreeBodyMatrix.planets = ['Jupiter', 'Saturn']
+    index = ThreeBodyMatrix.index()
+    # the queries only compare the settings with the ones of the load
+    with patch.object(ThreeBodyMatrix, 'variant_key', side_effect=AssertionError):
+        assert ThreeBodyMatrix.index() is index
+        assert ThreeBodyMatrix.is_stale() is False
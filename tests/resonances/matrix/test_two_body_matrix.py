@@ -11,6 +11,7 @@ from resonances.matrix.two_body_matrix import TwoBodyMatrix
 def run_around_tests():
     resonances.config.set(TwoBodyMatrix.catalog_file, 'cache/tests/mmr-2body-test.csv')
     Path('cache/tests').mkdir(parents=True, exist_ok=True)
+    TwoBodyMatrix.clear_cache()
     yield
     shutil.rmtree('cache/tests')
 
@@ -81,3 +82,55 @@ def test_find_resonances():
     mmrs_list = [mmr.to_short() for mmr in mmrs]
     assert '3J-2' in mmrs_list
     assert '1J-1' not in mmrs_list
+
+
+def test_find_resonances_index():
+    TwoBodyMatrix.planets = []
+    TwoBodyMatrix.build()
+    df = TwoBodyMatrix.matrix
+
+    for a, sigma, planets in [(3.97, 0.1, None), (2.5, 0.05, ['Jupiter', 'Saturn']), (30.0, 1.0, ['Neptune']), (100.0, 0.1, None)]:
+        mask = (df['a'] >= a - sigma) & (df['a'] <= a + sigma)
+        if planets is not None:
+            mask &= df['planet'].isin(planets)
+        mmrs = TwoBodyMatrix.find_resonances(a, sigma=sigma, planets=planets)
+        assert [mmr.to_short() for mmr in mmrs] == df.loc[mask, 'mmr'].tolist()
+
+    # the bounds are inclusive
+    row = df.loc[df['mmr'] == '3J-2'].iloc[0]
+    assert '3J-2' in [mmr.to_short() for mmr in TwoBodyMatrix.find_resonances(row['a'] + 0.01, sigma=0.01)]
+
+    # objects are created once
+    assert TwoBodyMatrix.find_resonances(3.97, sigma=0.1)[0] is TwoBodyMatrix.find_resonances(3.97, sigma=0.1)[0]
+
+    # the index follows the matrix
+    index = TwoBodyMatrix.index()
+    TwoBodyMatrix.planets = ['Jupiter']
+    TwoBodyMatrix.build()
+    assert TwoBodyMatrix.index() is not index
+    assert 'Saturn' not in {mmr.planets_names[0] for mmr in TwoBodyMatrix.find_resonances(5.0, sigma=5.0)}
+
+
+def test_find_resonances_batch():
+    TwoBodyMatrix.planets = []
+    TwoBodyMatrix.build()
+    catalog = pd.DataFrame({'a': [3.97, 5.2, 2.5]}, index=['1', '2', '3'])
+
+    df = TwoBodyMatrix.find_resonances_batch(catalog['a'], sigma=0.1)
+    for name, a in catalog['a'].items():
+        expected = [mmr.to_short() for mmr in TwoBodyMatrix.find_resonances(a, sigma=0.1)]
+        assert df.loc[df['index'] == name, 'mmr'].astype(str).tolist() == expected
+
+    assert len(TwoBodyMatrix.find_resonances_batch([], sigma=0.1)) == 0
+    TwoBodyMatrix.planets = ['Jupiter']
+
+
+def test_build_matches_resonances():
+    TwoBodyMatrix.planets = ['Mercury', 'Jupiter']
+    df = TwoBodyMatrix.build()
+    for row in df.itertuples():
+        mmr = resonances.TwoBody([row.m1, row.m, 0, -(row.m1 + row.m)], [row.planet])
+        assert mmr.to_short() == row.mmr
+        assert mmr.resonant_axis == row.a
+        assert abs(mmr.coeff[3]) == row.q
+    TwoBodyMatrix.planets = ['Jupiter']
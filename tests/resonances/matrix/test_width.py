@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+from pathlib import Path
+import shutil
+
+import resonances
+from resonances.matrix import width
+from resonances.matrix.three_body_matrix import ThreeBodyMatrix
+from resonances.matrix.two_body_matrix import TwoBodyMatrix
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    resonances.config.set(ThreeBodyMatrix.catalog_file, 'cache/tests/mmr-3body-test.csv')
+    resonances.config.set(TwoBodyMatrix.catalog_file, 'cache/tests/mmr-2body-test.csv')
+    Path('cache/tests').mkdir(parents=True, exist_ok=True)
+    ThreeBodyMatrix.planets = ['Jupiter', 'Saturn']
+    TwoBodyMatrix.planets = ['Jupiter']
+    yield
+    ThreeBodyMatrix.clear_cache()
+    TwoBodyMatrix.clear_cache()
+    shutil.rmtree('cache/tests')
+
+
+def test_two_body_half_width():
+    a = resonances.TwoBody('3J-1').resonant_axis
+    half_width = width.two_body_half_width('Jupiter', 3, -1, a, 0.1)
+    assert 0.005 < half_width < 0.02  # the Kirkwood gap 3:1
+    # the second order resonance: the width is proportional to e
+    assert width.two_body_half_width('Jupiter', 3, -1, a, 0.2) == pytest.approx(2 * half_width, rel=0.05)
+    assert width.two_body_half_width('Jupiter', 3, -1, a, 0.1, np.radians(20)) != half_width
+
+
+def test_half_widths():
+    df = TwoBodyMatrix.build()
+    assert 'width' not in df.columns  # calculated on the first query by the width
+    coefficients = width.two_body_coefficients(df)
+    assert np.isnan(coefficients[0][df['m'] > 0]).all()
+    assert not np.isnan(coefficients[0][df['m'] < 0]).any()
+
+    widths = width.half_widths(df['q'], *coefficients, 0.1)
+    row = df.index[df['mmr'] == '3J-1'][0]
+    assert widths[row] == pytest.approx(width.two_body_half_width('Jupiter', 3, -1, df.loc[row, 'a'], 0.1))
+    assert width.half_widths(df['q'], *coefficients, 0.2)[row] == pytest.approx(2 * widths[row])
+    assert width.half_widths(df['q'], *coefficients, 0.1, np.radians(20))[row] == pytest.approx(coefficients[1][row] * 0.1)
+
+
+def test_widths_are_cached():
+    TwoBodyMatrix.load()
+    coefficients = TwoBodyMatrix.widths()
+    assert TwoBodyMatrix.widths() is coefficients
+    assert len(coefficients[0]) == len(TwoBodyMatrix.matrix)
+
+    factor = resonances.config.get('MATRIX_3BODY_WIDTH')
+    try:
+        ThreeBodyMatrix.load()
+        wide = ThreeBodyMatrix.widths()[0]
+        resonances.config.set('MATRIX_3BODY_WIDTH', float(factor) / 2)
+        assert ThreeBodyMatrix.widths()[0] == pytest.approx(wide / 2)
+    finally:
+        resonances.config.set('MATRIX_3BODY_WIDTH', factor)
+
+
+def test_find_resonances_in_width():
+    mmrs = [mmr.to_short() for mmr in ThreeBodyMatrix.find_resonances_in_width(2.3981, 0.1)]
+    assert mmrs == ['4J-2S-1']
+    assert ThreeBodyMatrix.find_resonances_in_width(2.42, 0.1) == []
+    assert '4J-2S-1' in [mmr.to_short() for mmr in ThreeBodyMatrix.find_resonances_in_width(2.42, 0.1, width_factor=10)]
+    assert ThreeBodyMatrix.find_resonances_in_width(2.3981, 0.1, planets=['Mars', 'Jupiter']) == []
+
+    mmrs = [mmr.to_short() for mmr in TwoBodyMatrix.find_resonances_in_width(2.50, 0.1)]
+    assert mmrs == ['3J-1']
+    assert TwoBodyMatrix.find_resonances_in_width(2.50, 0.01) == []
+
+
+def test_find_mmrs_width_factor():
+    mmrs = resonances.find_mmrs(2.3981, e=0.1, inc=0.05, width_factor=1.0)
+    assert [mmr.to_short() for mmr in mmrs] == ['4J-2S-1']
+    assert len(resonances.find_mmrs(2.3981)) > len(mmrs)
+
+    with pytest.raises(Exception, match='eccentricity'):
+        resonances.find_mmrs(2.3981, width_factor=1.0)
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+import resonances
+
+
+def test_find_mmrs_batch_same_as_find_mmrs():
+    catalog = pd.DataFrame({'a': [2.39, 3.17, 5.2, 2.75]}, index=[463, 1, 624, 10])
+
+    for kwargs in [{}, {'planets': ['Jupiter', 'Saturn']}, {'sigma': 0.05}]:
+        df = resonances.find_mmrs_batch(catalog['a'], **kwargs)
+        for number, a in catalog['a'].items():
+            expected = [mmr.to_short() for mmr in resonances.find_mmrs(a, **kwargs)]
+            assert df.loc[df['index'] == number, 'mmr'].astype(str).tolist() == expected
+
+
+def test_find_mmrs_batch_chunks():
+    values = np.linspace(2.0, 3.5, 1000)
+    df = resonances.find_mmrs_batch(values, sigma2=0.05, sigma3=0.01)
+    assert df['index'].is_monotonic_increasing
+    assert set(df['index']) <= set(range(1000))
+    assert '4J-2S-1' in df.loc[df['index'] == np.argmin(np.abs(values - 2.398)), 'mmr'].astype(str).tolist()
+
+    chunked = resonances.matrix.matrix.join_candidates(
+        values, [resonances.ThreeBodyMatrix.index(), resonances.TwoBodyMatrix.index()], [0.01, 0.05], chunk_size=7
+    )
+    pd.testing.assert_frame_equal(df, chunked)
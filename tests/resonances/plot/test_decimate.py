@@ -0,0 +1,74 @@
+import numpy as np
+
+from resonances.resonance.plot import decimate
+
+
+class TestDecimate:
+    """Test suite for the decimate function."""
+
+    def test_short_series_unchanged(self):
+        x = np.arange(100)
+        y = np.sin(x)
+        x_new, y_new = decimate(x, y, 1000)
+        assert np.array_equal(x_new, x)
+        assert np.array_equal(y_new, y)
+
+    def test_full_resolution(self):
+        x = np.arange(10000)
+        y = np.sin(x)
+        assert len(decimate(x, y, 0)[0]) == 10000
+        assert len(decimate(x, y, None)[0]) == 10000
+
+    def test_none(self):
+        assert decimate(np.arange(10), None, 4) is None
+
+    def test_points_from_series_in_order(self):
+        x = np.linspace(0, 1000, 300001)
+        y = np.sin(x)
+        x_new, y_new = decimate(x, y, 4000)
+        assert len(x_new) < len(x) / 4
+        assert np.all(np.diff(x_new) > 0)
+        assert np.array_equal(np.sin(x_new), y_new)
+
+    def test_backward_time(self):
+        x = -np.linspace(0, 1000, 300001)
+        x_new, _ = decimate(x, np.sin(x), 4000)
+        assert np.all(np.diff(x_new) < 0)
+
+    def test_shape_kept(self):
+        # fast oscillation inside a slow envelope with a jump (like the resonant angle crossing 2pi)
+        x = np.linspace(0, 100, 400001)
+        y = (1 + x / 100) * np.sin(500 * x)
+        y[x > 50] += 2 * np.pi
+        x_new, y_new = decimate(x, y, 5000, columns=100, rows=50)
+        cell = (np.max(y) - np.min(y)) / 50
+
+        # every occupied cell of the grid is still occupied
+        def cells(indices):
+            row = np.minimum(((y[indices] - y.min()) / cell).astype(int), 49)
+            return set(zip(indices * 100 // len(y), row))
+
+        assert cells(np.searchsorted(x, x_new)) == cells(np.arange(len(y)))
+        for left in range(0, 100, 10):
+            window, window_new = (x > left) & (x <= left + 10), (x_new > left) & (x_new <= left + 10)
+            assert abs(y_new[window_new].max() - y[window].max()) < cell
+            assert abs(y_new[window_new].min() - y[window].min()) < cell
+
+    def test_nan_values_skipped(self):
+        x = np.arange(10000, dtype=float)
+        y = np.sin(x)
+        y[:100] = np.nan
+        x_new, y_new = decimate(x, y, 1000)
+        assert np.all(np.isfinite(y_new))
+        assert x_new[0] >= 100
+
+    def test_output_bounded_by_max_points(self):
+        # a circulating angle with noise fills almost every cell of the default grid
+        rng = np.random.default_rng(1)
+        x = np.linspace(0, 1000, 500000)
+        y = np.mod(x * 3 + rng.normal(0, 0.5, len(x)), 2 * np.pi)
+        for max_points in (100, 2000, 4000):
+            x_new, y_new = decimate(x, y, max_points)
+            assert len(x_new) <= max_points
+            assert len(x_new) > max_points / 2
+            assert np.all(np.diff(x_new) > 0)
@@ -39,3 +39,48 @@ def test_body():
     resonances.resonance.plot.body(sim, body, mmr)
     file_path = f"{sim.config.save_path}/asteroid_4J-2S-1+0+0-1.png"
     assert Path(file_path).is_file() is False
+
+
+def test_body_plotter_reuse():
+    sim = tools.create_test_simulation_for_solar_system()
+    sim.add_body(tools.get_3body_elements_sample(), resonances.ThreeBody('4J-2S-1'))
+    sim.add_body(tools.get_2body_elements_sample(), resonances.TwoBody('1J-1'))
+    sim.run()
+
+    plotter = resonances.resonance.plot.BodyPlotter()
+    filenames = []
+    for body in sim.bodies:
+        data = resonances.resonance.plot.plot_data(sim, body, body.mmrs[0])
+        filename = resonances.resonance.plot.plot_filename(sim.config.plot_path, body.name, data['resonance_key'])
+        plotter.render(data, filename)
+        filenames.append(filename)
+
+    assert len(plotter.fig.axes) == 7
+    for filename in filenames:
+        assert Path(filename).is_file() is True
+        os.remove(filename)
+
+
+def test_render_batch():
+    sim = tools.create_test_simulation_for_solar_system()
+    sim.add_body(tools.get_3body_elements_sample(), resonances.ThreeBody('4J-2S-1'))
+    sim.add_body(tools.get_2body_elements_sample(), resonances.TwoBody('1J-1'))
+    sim.run()
+
+    filenames = resonances.resonance.plot.render_batch(sim, [(body, body.mmrs[0]) for body in sim.bodies], workers=2)
+    assert len(filenames) == 2
+    for filename in filenames:
+        assert Path(filename).is_file() is True
+        os.remove(filename)
+
+
+def test_data_manager_plot_workers():
+    sim = tools.create_test_simulation_for_solar_system(save=None, plot='all')
+    sim.config.plot_type = 'save'
+    sim.config.plot_workers = 2
+    sim.add_body(tools.get_3body_elements_sample(), resonances.ThreeBody('4J-2S-1'))
+    sim.run()
+
+    file_path = f"{sim.config.plot_path}/asteroid_4J-2S-1+0+0-1.png"
+    assert Path(file_path).is_file() is True
+    os.remove(file_path)
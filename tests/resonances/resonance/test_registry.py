@@ -0,0 +1,87 @@
+import subprocess
+import sys
+
+import pytest
+import numpy as np
+
+import resonances
+from resonances.matrix.secular_matrix import SecularMatrix
+from resonances.resonance.registry import ResonanceRegistry, registry, resonance_id
+from resonances.simulation.body_manager import BodyManager
+from resonances.simulation.config import SimulationConfig
+
+
+def test_create_resonance_is_shared():
+    mmr = resonances.create_resonance('4J-2S-1')
+    assert mmr is resonances.create_resonance('4J-2S-1')
+    assert mmr.key == '4J-2S-1+0+0-1'
+    assert mmr.to_s() == mmr.key
+    assert registry.get(mmr.id) is mmr
+    assert registry.get(mmr.key) is mmr
+    assert mmr.index_of_planets == [5, 6]
+
+    nu6 = resonances.create_resonance('nu6')
+    assert nu6 is resonances.create_resonance('g-g6')
+    assert nu6.id != mmr.id
+    assert nu6.index_of_planets == [6]
+
+    # the factories for a single type still create new objects
+    assert resonances.create_mmr('4J-2S-1') is not mmr
+
+
+def test_shared_resonance_is_immutable():
+    mmr = resonances.create_resonance('2J-1')
+    with pytest.raises(AttributeError, match='shared'):
+        mmr.planets_names = ['Saturn']
+    with pytest.raises(AttributeError, match='shared'):
+        mmr.resonant_axis = 1.0
+    with pytest.raises(ValueError):
+        mmr.coeff[0] = 3
+    assert mmr.resonant_axis == pytest.approx(3.277, abs=0.01)
+
+
+def test_registry():
+    r = ResonanceRegistry()
+    first = r.create('3J-1', resonances.create_mmr)
+    assert first.id == resonance_id('3J-1+0-2')
+    assert r.create('3J-1', resonances.create_mmr) is first
+    assert r.intern(resonances.create_mmr('3J-1')) is first
+    second = r.intern(resonances.create_mmr('5J-2'))
+    assert second.id != first.id
+    assert len(r) == 2
+    assert '5J-2+0-3' in r
+    assert list(r) == [first, second]
+
+    r.clear()
+    assert len(r) == 0
+    # the ids do not depend on the order of registration
+    assert r.intern(resonances.create_mmr('5J-2')).id == second.id
+    assert r.intern(first) is first
+    assert r.get(first.id) is first
+
+
+def test_id_is_the_same_in_other_processes():
+    script = "import resonances; print(resonances.create_resonance('5J-2S-2').id)"
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+    assert int(output.split()[-1]) == resonances.create_resonance('5J-2S-2').id
+
+
+def test_find_resonances_and_add_body_share_objects():
+    mmrs = resonances.ThreeBodyMatrix.find_resonances(2.39, planets=['Jupiter', 'Saturn'])
+    mmr = [m for m in mmrs if m.to_short() == '4J-2S-1'][0]
+    assert mmr is resonances.create_resonance('4J-2S-1')
+    assert SecularMatrix.build(formulas=['g-g6', 'g+s-s7-g5'])[0] is resonances.create_resonance('nu6')
+
+    body_manager = BodyManager(SimulationConfig())
+    elem = {'a': 2.39, 'e': 0.1, 'inc': 0.1, 'Omega': 0.1, 'omega': 0.1, 'M': 0.1}
+    body_manager.add_body(elem, ['4J-2S-1', 'nu6'], 'first')
+    body_manager.add_body(elem, ['4J-2S-1', 'nu6'], 'second')
+    first, second = body_manager.bodies
+    assert first.mmrs[0] is second.mmrs[0] is mmr
+    assert first.secular_resonances[0] is second.secular_resonances[0]
+
+    # the objects created by users are completed as before
+    own = resonances.ThreeBody('5J-2S-2')
+    body_manager.add_body(elem, own, 'third')
+    assert own.index_of_planets == [5, 6]
+    assert np.array_equal(own.coeff, [5, -2, -2, 0, 0, -1])
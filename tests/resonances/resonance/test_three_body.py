@@ -1,3 +1,4 @@
+import numpy as np
 import resonances
 import pytest
 
@@ -150,3 +151,13 @@ def test_calc_angle():
     angle = mmr.calc_angle(body, [body1, body2])
     # 4*0.4 + (-2)*0.1 + (-1)*0.3 + 0 + 0 + (-1)*(0.1+0.1)
     assert 0.9 == pytest.approx(angle)
+
+
+def test_calculate_resonant_axes():
+    m1, m2, m = [4, 5, 1, 2], [-2, -2, 1, 1], [-1, -2, 1, -1]
+    axes = resonances.ThreeBody.calculate_resonant_axes('Jupiter', 'Saturn', m1, m2, m)
+    for i in (0, 1, 3):
+        assert axes[i] == resonances.ThreeBody([m1[i], m2[i], m[i], 0, 0, -(m1[i] + m2[i] + m[i])], ['Jupiter', 'Saturn']).resonant_axis
+    assert np.isnan(axes[2])  # negative mean motion
+    with pytest.raises(Exception, match='Something weird'):
+        resonances.ThreeBody([1, 1, 1, 0, 0, -3], ['Jupiter', 'Saturn']).resonant_axis
@@ -1,3 +1,4 @@
+import numpy as np
 import resonances
 import pytest
 
@@ -124,3 +125,10 @@ def test_calc_angle():
     angle = mmr.calc_angle(body, [body1])
     # 2*0.4 + (-1)*0.3 + 0 + (-1)*(0.1+0.2)
     assert 0.2 == pytest.approx(angle)
+
+
+def test_calculate_resonant_axes():
+    m1, m = np.array([1, 2, 3, 7]), np.array([-1, -1, -1, -2])
+    axes = resonances.TwoBody.calculate_resonant_axes('Jupiter', m1, m)
+    for i in range(len(m1)):
+        assert axes[i] == resonances.TwoBody([m1[i], m[i], 0, -(m1[i] + m[i])], ['Jupiter']).resonant_axis
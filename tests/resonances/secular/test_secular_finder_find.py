@@ -188,3 +188,16 @@ class TestSecularFinderFind:
         assert sim.integration_engine.config is sim.config
         assert sim.integration_engine.config.integrator == test_params['integrator']
         assert sim.integration_engine.config.dt == test_params['dt']
+
+
+def test_find_with_tolerance(monkeypatch):
+    elements = {'a': 2.05, 'e': 0.1, 'inc': 0.1, 'Omega': 0.0, 'omega': 0.0, 'M': 0.0, 'epoch': 60000.0}
+    monkeypatch.setattr(resonances.simulation.body_manager.BodyManager, 'get_body_elements', lambda self, elem: dict(elements))
+
+    sim = resonances.finder.secular_finder.find(asteroids=[1, 2], order=2, integration_years=50000, tolerance=1.5)
+    assert len(sim.bodies) == 2
+    assert [res.to_s() for res in sim.bodies[0].secular_resonances] == ['nu6_Saturn']
+
+    elements['a'] = 2.8
+    sim = resonances.finder.secular_finder.find(asteroids=1, formulas=['g-g6'], integration_years=50000, tolerance=1.5)
+    assert len(sim.bodies) == 0
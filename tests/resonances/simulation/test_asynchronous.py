@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest.mock import patch
+
+import numpy as np
+
+from resonances.simulation import asynchronous
+from resonances.simulation.asynchronous import RateLimiter
+from tests.tools import create_test_simulation_for_solar_system, get_2body_elements_sample, get_3body_elements_sample
+
+
+def test_add_bodies_async_is_concurrent_and_limited():
+    sim = create_test_simulation_for_solar_system()
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def get_body_elements(num):
+        if isinstance(num, dict):
+            return num
+        with lock:
+            active.append(num)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(num)
+        return {**get_3body_elements_sample(), 'a': 2.39 + int(num) / 1000}
+
+    sim.body_manager.get_body_elements = get_body_elements
+    asyncio.run(sim.add_bodies_async([1, 2, 3, 4, 5, 6], '4J-2S-1', concurrency=2))
+    assert [body.name for body in sim.bodies] == ['1', '2', '3', '4', '5', '6']
+    assert [body.initial_data['a'] for body in sim.bodies] == [2.39 + i / 1000 for i in range(1, 7)]
+    assert max(peak) == 2
+
+
+def test_rate_limiter():
+    async def calls():
+        limiter = RateLimiter(20)
+        start = time.monotonic()
+        for _ in range(5):
+            await limiter.wait()
+        return time.monotonic() - start
+
+    assert asyncio.run(calls()) >= 0.2 - 1e-3
+
+
+def create_simulation():
+    sim = create_test_simulation_for_solar_system()
+    sim.add_body(get_3body_elements_sample(), '4J-2S-1', name='463')
+    sim.add_body(get_2body_elements_sample(), '1J-1', name='624')
+    sim.add_body({**get_3body_elements_sample(), 'a': 2.4}, ['4J-2S-1', '7J-3'], name='other')
+    return sim
+
+
+def test_run_async_matches_run():
+    expected = create_simulation()
+    expected.run()
+
+    sim = create_simulation()
+    with ProcessPoolExecutor(2, mp_context=multiprocessing.get_context('fork')) as executor:
+        asyncio.run(sim.run_async(executor=executor))
+    for body, other in zip(sim.bodies, expected.bodies):
+        assert body.statuses == other.statuses
+        assert np.allclose(body.axis, other.axis)
+    # the bodies keep their resonances
+    assert sim.bodies[2].mmrs[1] is expected.bodies[2].mmrs[1]
+    assert len(sim.times) == 10
+
+
+def test_results_async():
+    sim = create_simulation()
+
+    async def collect():
+        return [body async for body in sim.results_async(chunk_size=2)]
+
+    bodies = asyncio.run(collect())
+    assert sorted(body.name for body in bodies) == ['463', '624', 'other']
+    assert all(body is sim.bodies[[b.name for b in sim.bodies].index(body.name)] for body in bodies)
+    assert all(len(body.statuses) == len(body.mmrs) for body in bodies)
+
+
+def test_default_parts():
+    sim = create_simulation()
+    parts = []
+    run_part = asynchronous.run_part
+
+    def record(part):
+        parts.append([body.name for body in part.bodies])
+        return run_part(part)
+
+    with patch.object(asynchronous, 'run_part', side_effect=record), ThreadPoolExecutor(2) as executor:
+        asyncio.run(sim.run_async(executor=executor))
+    assert sorted(parts) == [['463', '624'], ['other']]
+
+    # without an executor, the bodies are one part
+    parts.clear()
+    with patch.object(asynchronous, 'run_part', side_effect=record):
+        asyncio.run(create_simulation().run_async())
+    assert parts == [['463', '624', 'other']]
@@ -102,6 +102,22 @@ class TestDataManager:
         self.config.plot = None
         assert self.data_manager.should_plot_body(mock_body, mock_resonance) is False
 
+    def test_flush_closes_all_when_writer_fails(self):
+        """The renderer and the report are closed even if the writer raises."""
+        writer, renderer, report = Mock(), Mock(), Mock()
+        writer.flush.side_effect = OSError('disk full')
+        self.data_manager._writer, self.data_manager._renderer, self.data_manager._report = writer, renderer, report
+
+        with patch.object(self.data_manager, 'save_report') as save_report:
+            with pytest.raises(OSError):
+                self.data_manager.flush()
+
+        renderer.close.assert_called_once()
+        save_report.assert_called_once_with(report)
+        assert self.data_manager._writer is None
+        assert self.data_manager._renderer is None
+        assert self.data_manager._report is None
+
 
 if __name__ == '__main__':
     pytest.main([__file__])
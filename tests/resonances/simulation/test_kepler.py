@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import rebound
+
+from resonances.simulation import kepler
+
+
+def create_elements(n=500):
+    rng = np.random.default_rng(42)
+    elements = {
+        'a': rng.uniform(0.5, 40, n),
+        'e': rng.uniform(0, 0.99, n),
+        'inc': rng.uniform(0, np.pi, n),
+        'Omega': rng.uniform(-7, 7, n),
+        'omega': rng.uniform(-7, 7, n),
+        'M': rng.uniform(-20, 20, n),
+    }
+    # unbound orbits have a < 0 as in REBOUND
+    elements['e'][:20] = rng.uniform(1.01, 3, 20)
+    elements['a'][:20] *= -1
+    return elements
+
+
+def states(sim):
+    xyz, vxvyvz = np.empty(3 * sim.N), np.empty(3 * sim.N)
+    sim.serialize_particle_data(xyz=xyz, vxvyvz=vxvyvz)
+    return xyz.reshape(-1, 3), vxvyvz.reshape(-1, 3)
+
+
+def test_eccentric_anomaly():
+    M = np.array([0.0, 1.0, 3.0, 6.2, -1.0, 0.5, -4.0])
+    e = np.array([0.0, 0.5, 0.95, 0.999, 0.1, 1.5, 3.0])
+    E = kepler.eccentric_anomaly(M, e)
+    elliptic = e < 1
+    assert np.allclose((E - e * np.sin(E))[elliptic], np.mod(M, 2 * np.pi)[elliptic], atol=1e-14)
+    assert np.allclose((e * np.sinh(E) - E)[~elliptic], M[~elliptic], atol=1e-14)
+
+
+def test_matches_rebound():
+    elements = create_elements()
+    expected = rebound.Simulation()
+    expected.add(m=1.0, x=0.1, y=-0.2, z=0.01, vx=0.001, vy=0.002, vz=-0.0003)
+    sim = expected.copy()
+    for i in range(len(elements['a'])):
+        expected.add(m=1e-10, primary=expected.particles[0], **{key: values[i] for key, values in elements.items()})
+
+    sun = sim.particles[0]
+    xyz, vxvyvz = kepler.elements_to_cartesian(sim.G * (sun.m + 1e-10), **elements)
+    assert kepler.add_particles(sim, np.full(len(xyz), 1e-10), xyz + sun.xyz, vxvyvz + sun.vxyz) == 1
+
+    assert sim.N == expected.N
+    assert sim.particles[-1].m == 1e-10
+    for actual, other in zip(states(sim), states(expected)):
+        assert np.allclose(actual[21:], other[21:], rtol=1e-12, atol=1e-12)
+        assert np.allclose(actual[:21], other[:21], rtol=1e-9, atol=1e-9)
+
+
+def test_invalid_elements():
+    with pytest.raises(ValueError):
+        kepler.elements_to_cartesian(1.0, [2.0], [1.0], [0.0], [0.0], [0.0], [0.0])
+    with pytest.raises(ValueError):
+        kepler.elements_to_cartesian(1.0, [-2.0], [0.5], [0.0], [0.0], [0.0], [0.0])
+    with pytest.raises(ValueError):
+        kepler.elements_to_cartesian(1.0, [2.0], [-0.1], [0.0], [0.0], [0.0], [0.0])
@@ -0,0 +1,92 @@
+import os
+import shutil
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from resonances.simulation.integration import IntegrationEngine
+from resonances.service import response_entry
+from resonances.simulation.result_cache import ResultCache, body_entry, result_key
+from tests.tools import create_test_simulation_for_solar_system, get_3body_elements_sample
+
+PATH = 'cache/tests/results'
+
+
+@pytest.fixture(autouse=True)
+def cache_path():
+    shutil.rmtree(PATH, ignore_errors=True)
+    yield PATH
+    shutil.rmtree(PATH, ignore_errors=True)
+
+
+def create_simulation(series=False, **elements):
+    sim = create_test_simulation_for_solar_system(save=None, plot=None)
+    sim.config.result_cache = True
+    sim.config.result_cache_path = PATH
+    sim.config.result_cache_series = series
+    sim.add_body({**get_3body_elements_sample(), **elements}, ['4J-2S-1', 'nu6'], name='first')
+    sim.add_body({**get_3body_elements_sample(), 'a': 2.5}, '4J-2S-1', name='second')
+    return sim
+
+
+def test_cached_bodies_are_not_integrated():
+    first = create_simulation()
+    first.run()
+
+    second = create_simulation()
+    second.bodies[1].secular_resonances = first.bodies[0].secular_resonances  # a new resonance
+    with patch.object(IntegrationEngine, 'run_integration', autospec=True, side_effect=IntegrationEngine.run_integration) as run:
+        second.run()
+    assert [body.name for body in run.call_args.args[1]] == ['second']
+    assert second.bodies[0].axis is None
+    for key in ['4J-2S-1+0+0-1', 'nu6_Saturn']:
+        assert second.bodies[0].statuses[key] == first.bodies[0].statuses[key]
+        assert second.bodies[0].libration_metrics[key] == pytest.approx(first.bodies[0].libration_metrics[key])
+    summary = second.data_manager.get_simulation_summary(second.bodies)
+    assert len(summary) == 4
+
+    # other elements or settings are other keys
+    assert result_key(first.config, first.bodies[0], first.bodies[0].mmrs[0]) != result_key(
+        first.config, first.bodies[1], first.bodies[1].mmrs[0]
+    )
+    third = create_simulation(e=0.11)
+    third.config.libration_period_critical = 1000
+    with patch.object(IntegrationEngine, 'run_integration', autospec=True, side_effect=IntegrationEngine.run_integration) as run:
+        third.run()
+    assert len(run.call_args.args[1]) == 2
+
+
+def test_cached_series():
+    first = create_simulation(series=True)
+    first.run()
+    second = create_simulation(series=True)
+    with patch.object(IntegrationEngine, 'run_integration', side_effect=AssertionError):
+        second.run()
+    assert np.array_equal(second.bodies[0].axis, first.bodies[0].axis)
+    assert np.array_equal(second.bodies[0].angle(first.bodies[0].mmrs[0]), first.bodies[0].angle(first.bodies[0].mmrs[0]))
+
+    # the streamed summaries, the cached entries and the responses of the service have the same shape
+    body, resonance = second.bodies[0], second.bodies[0].mmrs[0]
+    summary = body.summary(series=True)['resonances'][resonance.to_s()]
+    assert {key: value for key, value in summary.items() if key != 'type'} == {
+        **body_entry(body, resonance),
+        **body.resonance_series(resonance),
+    }
+    assert set(response_entry(body, resonance)) == {'resonance', 'type', *body_entry(body, resonance)}
+
+
+def test_eviction():
+    cache = ResultCache(PATH, max_size=1000)
+    for i in range(10):
+        cache.put(f'{i:064x}', {'status': i, 'padding': 'x' * 200})
+        past = time.time() - 100 + i
+        os.utime(cache.filename(f'{i:064x}'), (past, past))
+        cache.get(f'{0:064x}')  # the first entry is used all the time
+    assert cache.size() <= 1000
+    assert cache.get(f'{0:064x}')['status'] == 0
+    assert cache.get(f'{9:064x}')['status'] == 9
+    assert cache.get(f'{1:064x}') is None
+    cache.clear()
+    assert cache.get(f'{0:064x}') is None
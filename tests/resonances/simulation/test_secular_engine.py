@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+import resonances
+import resonances.finder.secular_finder
+from resonances.data import const
+from resonances.matrix.secular_frequencies import ARCSEC_IN_RADIAN, proper_frequencies
+from resonances.simulation.secular_engine import PlanetarySolution
+from tests.tools import create_test_simulation_for_solar_system
+
+
+def planets_elements(e=0.05, inc=0.02):
+    return {
+        planet: {'a': const.PLANETS_AXIS[planet], 'e': e, 'inc': inc, 'Omega': 0.3 * i, 'omega': 0.5 * i}
+        for i, planet in enumerate(const.SOLAR_SYSTEM)
+    }
+
+
+def test_planetary_solution():
+    solution = PlanetarySolution(planets_elements())
+    z, zeta = solution.z(np.array([0.0, 1000.0])), solution.zeta(np.array([0.0, 1000.0]))
+    assert np.allclose(np.abs(z[:, 0]), 0.05)
+    assert np.allclose(np.abs(zeta[:, 0]), 0.02)
+    assert np.allclose(np.angle(z[4, 0]), 2.0 + 1.2 - 2 * np.pi)
+    assert np.min(np.abs(solution.s)) < 1e-12  # the invariable plane
+
+    # the linear theory underestimates g6, the observed frequencies replace it
+    g6 = 28.24552984
+    assert abs(np.max(solution.g) * ARCSEC_IN_RADIAN - g6) > 3
+    calibrated = PlanetarySolution(planets_elements(), frequencies={'g6': g6, 's6': -26.34496354})
+    assert np.max(calibrated.g) * ARCSEC_IN_RADIAN == pytest.approx(g6)
+    assert np.min(calibrated.s) * ARCSEC_IN_RADIAN == pytest.approx(-26.34496354)
+
+
+def test_propagate():
+    solution = PlanetarySolution(planets_elements(e=0.0, inc=0.0))
+    t = np.linspace(0, 100000, 11)
+    z, zeta = solution.propagate([2.3], [0.1], [0.05], [1.0], [2.0], t)
+    assert np.allclose(z[0, 0], 0.1 * np.exp(3j))
+    assert np.allclose(zeta[0, 0], 0.05 * np.exp(1j))
+
+    # without the forced terms, the elements precess with the proper frequencies of the linear theory
+    g, s = proper_frequencies([2.3])
+    assert np.allclose(np.abs(z), 0.1)
+    assert np.allclose(z[0], 0.1 * np.exp(1j * (3.0 + g[0] / ARCSEC_IN_RADIAN * t)))
+    assert np.allclose(zeta[0], 0.05 * np.exp(1j * (1.0 + s[0] / ARCSEC_IN_RADIAN * t)))
+
+
+def test_secular_engine():
+    sim = create_test_simulation_for_solar_system()
+    sim.config.engine = 'secular'
+    sim.config.tmax = int(1000000 * 2 * np.pi)
+    sim.config.Nout = 10000
+    sim.config.libration_period_min = 10000
+    sim.config.libration_period_critical = 200000
+    sim.config.periodogram_frequency_min = 0.000001
+    sim.config.periodogram_frequency_max = 0.0002
+
+    elem = {'a': 2.0, 'e': 0.1, 'inc': 0.1, 'Omega': 1.0, 'omega': 2.0, 'M': 0.5}
+    sim.add_body(elem, ['nu6', 'nu16'], name='inside')
+    sim.add_body({**elem, 'a': 2.6}, ['nu6', 'nu16'], name='outside')
+    sim.run()
+
+    inside, outside = sim.bodies
+    assert len(inside.angle(resonances.create_resonance('nu6'))) == 10000
+    assert np.all(inside.axis == 2.0)
+    assert inside.ecc[0] == pytest.approx(0.1)
+    assert inside.statuses['nu6_Saturn'] == 2
+    assert outside.statuses['nu6_Saturn'] == 0
+    assert outside.statuses['nu16_Saturn'] == 0
+
+    nbody = resonances.finder.secular_finder.escalate(sim)
+    assert nbody.config.engine == 'nbody'
+    assert nbody.config.tmax == sim.config.tmax
+    assert nbody.config.Nout == 10000
+    assert [body.name for body in nbody.bodies] == ['inside']
+    assert [res.to_s() for res in nbody.bodies[0].secular_resonances] == ['nu6_Saturn']
+
+
+def test_secular_engine_mmr():
+    sim = create_test_simulation_for_solar_system()
+    sim.config.engine = 'secular'
+    sim.add_body({'a': 2.4, 'e': 0.1, 'inc': 0.1, 'Omega': 1.0, 'omega': 2.0, 'M': 0.5}, '4J-2S-1', name='asteroid')
+    with pytest.raises(Exception, match='cannot check mean motion resonances'):
+        sim.run()
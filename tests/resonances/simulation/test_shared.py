@@ -0,0 +1,75 @@
+from unittest.mock import patch
+
+import numpy as np
+import rebound
+
+import resonances
+from resonances.simulation.body_manager import BodyManager
+from resonances.simulation.shared import SharedIntegration, share_integration
+from tests.tools import create_test_simulation_for_solar_system, get_3body_elements_sample
+
+
+def create_pair():
+    mmr_sim = create_test_simulation_for_solar_system(save=False, plot=False)
+    mmr_sim.config.Nout = 10
+    mmr_sim.config.dt = 0.1
+    mmr_sim.add_body(get_3body_elements_sample(), '4J-2S-1', name='asteroid')
+    secular_sim = create_test_simulation_for_solar_system(save=False, plot=False)
+    secular_sim.config.tmax = 50
+    secular_sim.config.Nout = 7
+    secular_sim.config.dt = 0.1
+    secular_sim.add_body(get_3body_elements_sample(), 'nu6', name='asteroid')
+    return mmr_sim, secular_sim
+
+
+def test_shared_integration():
+    expected = create_pair()
+    for sim in expected:
+        sim.config.planets_cache = False
+        sim.run()
+
+    mmr_sim, secular_sim = create_pair()
+    assert share_integration([mmr_sim, secular_sim])
+    mmr_sim.config.planets_cache = secular_sim.config.planets_cache = False
+    with patch.object(rebound.Simulation, 'integrate', autospec=True, side_effect=rebound.Simulation.integrate) as integrate:
+        mmr_sim.run()
+        secular_sim.run()
+    # one integration for the union of the outputs: 10 + 7 - 1 (t=0 is common)
+    assert integrate.call_count == 16
+
+    # the same outputs, the results differ only by the integration error (the steps are adjusted to more outputs)
+    for sim, other in zip([mmr_sim, secular_sim], expected):
+        body, other_body = sim.bodies[0], other.bodies[0]
+        assert np.array_equal(sim.times, other.times)
+        for resonance in body.mmrs + body.secular_resonances:
+            assert np.allclose(body.angle(resonance), other_body.angle(resonance), rtol=0, atol=1e-4)
+        assert np.allclose(body.axis, other_body.axis, rtol=0, atol=1e-5)
+        assert body.statuses == other_body.statuses
+        assert len(body.axis_filtered) == len(sim.times)
+    assert mmr_sim.bodies[0].secular_resonances == []
+
+
+def test_shared_integration_is_not_used():
+    mmr_sim, secular_sim = create_pair()
+    secular_sim.config.integrator = 'SABA(10,6,4)'
+    assert not share_integration([mmr_sim, secular_sim])
+
+    # the settings are changed after the simulations have been paired
+    mmr_sim, secular_sim = create_pair()
+    share_integration([mmr_sim, secular_sim])
+    secular_sim.config.dt = 0.5
+    assert not mmr_sim.shared_integration.fill(mmr_sim)
+    mmr_sim.run()
+    assert len(mmr_sim.bodies[0].axis) == 10
+
+
+def test_check_shares_integration():
+    elements = {'a': 2.39, 'e': 0.1, 'inc': 0.1, 'Omega': 0.1, 'omega': 0.1, 'M': 0.1}
+    with patch.object(BodyManager, 'get_body_elements', return_value=elements) as get_body_elements:
+        mmr_sim, secular_sim = resonances.check([463, 1234], ['4J-2S-1', 'nu6'], date='2023-02-25', Nout=20)
+    # the elements are taken once per asteroid
+    assert [call.args[0] for call in get_body_elements.call_args_list if not isinstance(call.args[0], dict)] == [463, 1234]
+    assert isinstance(mmr_sim.shared_integration, SharedIntegration)
+    assert mmr_sim.shared_integration is secular_sim.shared_integration
+    assert [body.name for body in secular_sim.bodies] == ['463', '1234']
+    assert secular_sim.bodies[0].initial_data == elements
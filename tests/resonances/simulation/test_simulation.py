@@ -162,6 +162,12 @@ def test_add_bodies_to_simulation():
 
     # Should have added the asteroid
     assert sim.integration_engine.sim.N > initial_n
+    assert sim.bodies[0].index_in_simulation == initial_n
+
+    # the bulk insertion puts the body on the same orbit as ``sim.add`` with the elements
+    orbit = sim.integration_engine.sim.particles[initial_n].orbit(primary=sim.integration_engine.sim.particles[0])
+    for key in ['a', 'e', 'inc', 'Omega', 'omega', 'M']:
+        assert getattr(orbit, key) == pytest.approx(sim.bodies[0].initial_data[key], rel=1e-10)
 
 
 def test_run():
@@ -254,3 +260,34 @@ def test_data_manager_universal_methods():
     body.statuses[mmr.to_s()] = -1
     assert sim.data_manager.should_save_body(body, mmr) is True  # save='all'
     assert sim.data_manager.should_plot_body(body, mmr) is False  # plot='resonant' and status=-1
+
+
+def test_iter_results():
+    sim = tools.create_test_simulation_for_solar_system(save='all', save_summary=True)
+    sim.add_body(tools.get_3body_elements_sample(), ['4J-2S-1', '5J-2S-2'], name='463')
+    sim.add_body(tools.get_2body_elements_sample(), '1J-1', name='624')
+
+    analysed = []
+    original = sim.identify_body_librations
+    sim.identify_body_librations = lambda body: (analysed.append(body.name), original(body))
+    results = sim.iter_results(series=True, release=True)
+
+    # the first body is yielded before the next one is analysed
+    first = next(results)
+    assert analysed == ['463']
+    assert first['name'] == '463' and list(first['resonances']) == ['4J-2S-1+0+0-1', '5J-2S-2+0+0-1']
+    entry = first['resonances']['4J-2S-1+0+0-1']
+    assert entry['status'] == sim.bodies[0].statuses['4J-2S-1+0+0-1']
+    assert len(entry['angle']) == 10 and len(first['series']['axis']) == 10 and len(first['series']['times']) == 10
+
+    second = next(results)
+    assert second['name'] == '624' and analysed == ['463', '624']
+    # the series are released, the classification is kept
+    assert sim.bodies[0].axis is None and sim.bodies[0].angles == {}
+    assert sim.bodies[0].statuses['4J-2S-1+0+0-1'] == entry['status']
+
+    with pytest.raises(StopIteration):
+        next(results)
+    # the data are saved from the copies of the bodies, the summary after the last body
+    assert Path(f'{sim.config.save_path}/data-463-4J-2S-1+0+0-1.csv').exists()
+    assert Path(f'{sim.config.save_path}/summary.csv').exists()
@@ -0,0 +1,105 @@
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import rebound
+
+import resonances
+from resonances.simulation.trajectory import PlanetaryTrajectory, trajectory_key
+from tests.tools import create_test_simulation_for_solar_system, get_3body_elements_sample
+
+
+@pytest.fixture(autouse=True)
+def trajectory_file():
+    original = resonances.config.get('PLANETS_TRAJECTORY_FILE')
+    resonances.config.set('PLANETS_TRAJECTORY_FILE', 'cache/tests/planets.npz')
+    PlanetaryTrajectory.clear_cache()
+    yield
+    for path in Path('cache/tests').glob('planets-*.npz'):
+        path.unlink()
+    PlanetaryTrajectory.clear_cache()
+    resonances.config.set('PLANETS_TRAJECTORY_FILE', original)
+
+
+def run_simulation(elements=None, **settings):
+    sim = create_test_simulation_for_solar_system()
+    sim.config.Nout = 50
+    # the cache of the planets is opt-in
+    for name, value in {'planets_cache': True, **settings}.items():
+        setattr(sim.config, name, value)
+    sim.add_body({**get_3body_elements_sample(), **(elements or {})}, ['4J-2S-1', 'nu6'], name='asteroid')
+    sim.run()
+    return sim
+
+
+def test_trajectory_is_reused():
+    first = run_simulation()
+    key = trajectory_key(first.config, first.times)
+    assert Path(PlanetaryTrajectory.filename(key)).exists()
+
+    # the orbits of the planets are not computed anymore
+    with patch.object(rebound.Simulation, 'orbits', side_effect=AssertionError):
+        second = run_simulation()
+    for resonance in first.bodies[0].mmrs + first.bodies[0].secular_resonances:
+        assert np.array_equal(first.bodies[0].angle(resonance), second.bodies[0].angle(resonance))
+    assert np.array_equal(first.bodies[0].ecc, second.bodies[0].ecc)
+
+    # loaded from the file in a new process
+    PlanetaryTrajectory.clear_cache()
+    trajectory = PlanetaryTrajectory.load(key, _state(first), first.times)
+    assert trajectory is not None
+    assert trajectory.elements['a'].shape == (9, 50)
+    assert trajectory.planet(5).a[0] == pytest.approx(5.2, abs=0.1)
+
+
+def _state(sim):
+    with np.load(PlanetaryTrajectory.filename(trajectory_key(sim.config, sim.times))) as data:
+        return data['state']
+
+
+def test_trajectory_is_verified():
+    sim = run_simulation()
+    key = trajectory_key(sim.config, sim.times)
+    state = _state(sim)
+    PlanetaryTrajectory.clear_cache()
+
+    changed = state.copy()
+    changed[5, 1] += 1e-12
+    assert PlanetaryTrajectory.load(key, changed, sim.times) is None
+    assert PlanetaryTrajectory.load(key, state, sim.times[:-1]) is None
+    assert PlanetaryTrajectory.load('missing', state, sim.times) is None
+    assert PlanetaryTrajectory.load(key, state, sim.times) is not None
+
+
+def test_trajectory_is_not_cached():
+    sim = run_simulation(planets_cache=False)
+    assert not Path(PlanetaryTrajectory.filename(trajectory_key(sim.config, sim.times))).exists()
+
+    sim = run_simulation(Nout=40)
+    other = run_simulation()
+    assert trajectory_key(sim.config, sim.times) != trajectory_key(other.config, other.times)
+
+    # a massive body changes the trajectories of the planets
+    PlanetaryTrajectory.clear_cache()
+    for path in Path('cache/tests').glob('planets-*.npz'):
+        path.unlink()
+    sim = run_simulation(elements={'mass': 1e-6})
+    assert not Path(PlanetaryTrajectory.filename(trajectory_key(sim.config, sim.times))).exists()
+
+
+def test_caches_are_bounded(monkeypatch):
+    times = np.linspace(0, 10, 5)
+    state = np.zeros((10, 7))
+    monkeypatch.setattr(PlanetaryTrajectory, 'memory_size', 2)
+    for i, key in enumerate(['first', 'second', 'third']):
+        PlanetaryTrajectory.record(key, state, times).store()
+        os.utime(PlanetaryTrajectory.filename(key), (i, i))
+    assert list(PlanetaryTrajectory._trajectories) == ['second', 'third']
+
+    # reading a file makes it the most recently used one
+    assert PlanetaryTrajectory.load('first', state, times) is not None
+    size = Path(PlanetaryTrajectory.filename('first')).stat().st_size
+    PlanetaryTrajectory.evict(2.5 * size)
+    assert [Path(PlanetaryTrajectory.filename(key)).exists() for key in ['first', 'second', 'third']] == [True, False, True]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for AsyncWriter Component
+===============================
+
+This module tests the background writer used by DataManager.
+"""
+
+import threading
+import pytest
+
+from resonances.simulation import AsyncWriter, SimulationConfig, DataManager
+
+
+class TestAsyncWriter:
+    """Test the AsyncWriter component."""
+
+    def test_sync_mode(self):
+        """Tasks are executed immediately if there are no workers."""
+        writer = AsyncWriter(workers=0)
+        result = []
+        writer.submit(result.append, 1)
+        assert result == [1]
+        writer.flush()
+
+    def test_flush_waits_for_tasks(self):
+        """All queued tasks are done after flush."""
+        writer = AsyncWriter(workers=2, queue_size=4)
+        result = []
+        lock = threading.Lock()
+
+        def task(i):
+            with lock:
+                result.append(i)
+
+        for i in range(20):
+            writer.submit(task, i)
+        writer.flush()
+
+        assert sorted(result) == list(range(20))
+        assert writer._threads == []
+
+    def test_backpressure(self):
+        """submit blocks while the queue is full."""
+        writer = AsyncWriter(workers=1, queue_size=1)
+        release = threading.Event()
+        writer.submit(release.wait)  # occupies the worker
+        writer.submit(lambda: None)  # fills the queue
+
+        submitted = threading.Event()
+
+        def producer():
+            writer.submit(lambda: None)
+            submitted.set()
+
+        thread = threading.Thread(target=producer)
+        thread.start()
+        assert submitted.wait(0.2) is False
+
+        release.set()
+        assert submitted.wait(5) is True
+        thread.join()
+        writer.flush()
+
+    def test_errors_are_raised_on_flush(self):
+        """A failed task does not stop the writer, but its exception is raised by flush."""
+        writer = AsyncWriter(workers=1)
+        result = []
+
+        def fail():
+            raise ValueError('Test error')
+
+        writer.submit(fail)
+        writer.submit(result.append, 1)
+        with pytest.raises(ValueError):
+            writer.flush()
+        assert result == [1]
+
+        writer.flush()  # errors are reported only once
+
+
+def test_data_manager_writer_from_config():
+    config = SimulationConfig(save_workers=3, save_queue_size=5)
+    data_manager = DataManager(config)
+
+    assert data_manager.writer.workers == 3
+    assert data_manager.writer.queue_size == 5
+
+    data_manager.flush()
+    config.save_workers = 0
+    assert data_manager.writer.is_async is False
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
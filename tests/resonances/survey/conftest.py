@@ -0,0 +1,12 @@
+import shutil
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def directory(request):
+    """The directory of the survey of the test module (its ``DIRECTORY``), removed before and after every test."""
+    path = request.module.DIRECTORY
+    shutil.rmtree(path, ignore_errors=True)
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import pytest
+
+from resonances.__main__ import main
+from resonances.survey import CostModel, Manifest, lpt, makespan, run_survey
+from resonances.survey.cost import chunk_features
+from tests.tools import SIMULATION
+
+DIRECTORY = 'cache/tests/survey-cost'
+
+
+def test_lpt():
+    costs = [7, 5, 4, 3, 3, 2]
+    bins = lpt(costs, 2)
+    assert sorted(sum(costs[i] for i in group) for group in bins) == [12, 12]
+    assert sorted(i for group in bins for i in group) == list(range(6))
+    assert [len(group) for group in lpt([0.0] * 4, 2)] == [2, 2]
+    assert len(lpt([1.0], 3)) == 1
+
+    assert makespan([4, 3, 3, 2], 2) == 6
+    assert makespan([4, 3, 3, 2], 1) == 12
+    # the chunks are taken in the given order, not the best one
+    assert makespan([1, 1, 4], 2) == 5
+
+
+def test_cost_model():
+    settings = {'tmax': 1000, 'dt': 0.5, 'Nout': 100, 'plot': None}
+    features = chunk_features(settings, [1, 3])
+    assert features == {'chunk': 1.0, 'steps': 2000, 'body_steps': 4000, 'body_outputs': 200, 'resonance_outputs': 400, 'plots': 0.0}
+    assert chunk_features({**settings, 'plot': 'all'}, [1, 3])['plots'] == 4
+
+    model = CostModel()
+    assert model.body_seconds(settings, 3) > model.body_seconds(settings, 1) > 0
+    assert model.memory(settings, [1, 3]) > model.memory(settings, [1])
+
+    # the coefficients are recovered from the records
+    truth = CostModel({'chunk': 0.5, 'steps': 1e-4, 'body_steps': 2e-6, 'body_outputs': 0, 'resonance_outputs': 1e-5, 'plots': 0})
+    records = []
+    for tmax, counts in [(1000, [1]), (2000, [1, 2]), (500, [3, 3, 3]), (4000, [2] * 10), (1000, [1] * 20)]:
+        features = chunk_features({**settings, 'tmax': tmax}, counts)
+        records.append({**features, 'seconds': truth.seconds(features)})
+    calibrated = CostModel.calibrate(records)
+    for name in ['chunk', 'steps', 'body_steps', 'resonance_outputs']:
+        assert calibrated.coefficients[name] == pytest.approx(truth.coefficients[name], rel=1e-6, abs=1e-12)
+    assert calibrated.coefficients['plots'] == model.coefficients['plots']  # not in the records
+    assert CostModel.calibrate([]).coefficients == model.coefficients
+
+
+def test_balanced_survey():
+    model = CostModel({'resonance_outputs': 1.0})
+    resonances = ['4J-2S-1', '3J-1', '5J-2S-2']
+    manifest = Manifest.create(
+        DIRECTORY,
+        'tests/fixtures/small.csv',
+        chunk_size=4,
+        schedule='lpt',
+        workers=2,
+        cost_model=model,
+        simulation=SIMULATION,
+        resonances=resonances,
+    )
+    # 3 chunks of 4 asteroids are rounded up to 4 chunks for 2 workers
+    assert sorted(len(chunk) for chunk in manifest.chunks) == [2, 2, 3, 3]
+    assert sorted(name for chunk in manifest.chunks for name in chunk) == sorted(str(i) for i in range(1, 11))
+    assert manifest.counts[0] == [3] * len(manifest.chunks[0])
+
+    prediction = manifest.predict(2, model)
+    assert prediction['chunks'][0] == max(prediction['chunks'])
+    assert prediction['seconds'] == makespan(prediction['chunks'], 2)
+    assert prediction['memory'] > manifest.predict(1, model)['memory']
+
+    run_survey(DIRECTORY)
+    record = Manifest.load(DIRECTORY).record(0)
+    assert record['resonance_outputs'] == 10 * 3 * len(manifest.chunks[0])
+    assert record['seconds'] > 0
+    assert CostModel.from_surveys([DIRECTORY]).coefficients != model.coefficients
+
+
+def test_predict_command(capsys):
+    args = ['survey', 'tests/fixtures/small.csv', '-o', DIRECTORY, '-r', '4J-2S-1', '--schedule', 'lpt', '-w', '2', '--chunk-size', '3']
+    assert main(args + ['--tmax', '628', '--dt', '1', '--predict']) == 0
+    assert 'peak memory' in capsys.readouterr().out
+    # the prediction does not create the survey, so it can be repeated with other settings
+    assert not Path(DIRECTORY).exists()
+    assert main(args[:-1] + ['5', '--tmax', '628', '--dt', '1', '--predict']) == 0
+    assert '2 chunks with 2 workers' in capsys.readouterr().out
+    assert not Path(DIRECTORY).exists()
+
+    # the prediction for an existing survey uses its chunks
+    assert main(args + ['--tmax', '628', '--dt', '1', '--queue']) == 0
+    assert Manifest.load(DIRECTORY).pending() == [0, 1, 2, 3]
+    capsys.readouterr()
+    assert main(args + ['--tmax', '628', '--dt', '1', '--predict']) == 0
+    assert '4 chunks with 2 workers' in capsys.readouterr().out
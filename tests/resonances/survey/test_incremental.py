@@ -0,0 +1,109 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from resonances.survey import Manifest, create_incremental, diff_catalogs, load_snapshot, run_survey
+from resonances.survey import runner
+from resonances.survey.manifest import read_catalog, snapshot
+from tests.tools import SIMULATION
+
+DIRECTORY = 'cache/tests/incremental'
+PREVIOUS = f'{DIRECTORY}/previous'
+CURRENT = f'{DIRECTORY}/current'
+
+
+def refreshed_catalog() -> str:
+    """The small catalog without 10, with 11, a changed orbit of 2, a tiny change of 3 and another M of 4."""
+    df = read_catalog('tests/fixtures/small.csv')
+    df.loc['2', 'a'] += 0.01
+    df.loc['3', 'e'] += 1e-7
+    df.loc['4', 'M'] += 0.5
+    df.loc['11'] = df.loc['1']
+    df = df.drop('10')
+    path = f'{DIRECTORY}/catalog.csv'
+    Path(DIRECTORY).mkdir(parents=True, exist_ok=True)
+    df.to_csv(path)
+    return path
+
+
+def test_diff_catalogs():
+    previous = snapshot(read_catalog('tests/fixtures/small.csv'), '2023-02-25')
+    current = snapshot(read_catalog(refreshed_catalog()), '2023-02-25')
+
+    diff = diff_catalogs(previous, current)
+    assert diff.new == ['11']
+    assert diff.changed == ['2']
+    assert diff.unchanged == ['1', '3', '4', '5', '6', '7', '8', '9']
+    assert diff.removed == ['10']
+    assert diff.work == ['11', '2']
+
+    # without the tolerances, any change of the elements or of the epoch is a change
+    assert diff_catalogs(previous, current, {}).changed == ['2', '3', '4']
+    assert diff_catalogs(previous, snapshot(read_catalog('tests/fixtures/small.csv'), '2024-01-01'), {}).unchanged == []
+
+    # the angles are compared modulo 2pi
+    current.loc['5', 'Omega'] += 2 * np.pi
+    assert '5' in diff_catalogs(previous, current).unchanged
+
+
+def test_incremental_survey():
+    settings = {'resonances': ['4J-2S-1'], 'simulation': SIMULATION, 'chunk_size': 4}
+    Manifest.create(PREVIOUS, 'tests/fixtures/small.csv', **settings)
+    previous = run_survey(PREVIOUS)
+    assert len(load_snapshot(PREVIOUS)) == 10
+
+    manifest, diff = create_incremental(CURRENT, refreshed_catalog(), PREVIOUS, **settings)
+    assert manifest.chunks == [['2', '11']]
+    with patch.object(runner, 'run_chunk', side_effect=runner.run_chunk) as run:
+        summary = run_survey(CURRENT)
+    assert run.call_count == 1
+    assert sorted(summary['name'].tolist(), key=int) == ['1', '2', '3', '4', '5', '6', '7', '8', '9', '11']
+
+    # the unchanged results are carried forward as they are
+    carried = summary[summary['name'].isin(diff.unchanged)].set_index('name').sort_index()
+    expected = previous[previous['name'].isin(diff.unchanged)].set_index('name').sort_index()
+    pd.testing.assert_frame_equal(carried, expected, check_dtype=False)
+
+    # the snapshot has the whole new catalog, and the next survey with the same catalog has nothing to run
+    assert len(load_snapshot(CURRENT)) == 10
+    manifest, diff = create_incremental(f'{DIRECTORY}/next', refreshed_catalog(), CURRENT, **settings)
+    assert diff.work == [] and manifest.chunks == []
+    assert len(run_survey(f'{DIRECTORY}/next')) == 10
+
+
+def test_snapshot_from_summary():
+    Manifest.create(PREVIOUS, 'tests/fixtures/small.csv', resonances=['4J-2S-1'], simulation=SIMULATION, chunk_size=10)
+    run_survey(PREVIOUS)
+    expected = load_snapshot(PREVIOUS)
+
+    # the surveys without the snapshot use the initial elements in the summary
+    (Manifest.load(PREVIOUS).directory / 'elements.csv').unlink()
+    assert load_snapshot(PREVIOUS)['hash'].tolist() == expected['hash'].tolist()
+
+
+def test_drift_within_tolerance_does_not_accumulate():
+    settings = {'resonances': ['4J-2S-1'], 'simulation': SIMULATION, 'chunk_size': 4}
+    Manifest.create(PREVIOUS, 'tests/fixtures/small.csv', **settings)
+    run_survey(PREVIOUS)
+    original = read_catalog('tests/fixtures/small.csv').loc['3', 'a']
+
+    # every refresh moves the asteroid 3 by less than the tolerance of a (1e-4)
+    previous, diffs, snapshots = PREVIOUS, [], []
+    for generation in range(1, 3):
+        df = read_catalog('tests/fixtures/small.csv')
+        df.loc['3', 'a'] += 9e-5 * generation
+        catalog = f'{DIRECTORY}/catalog-{generation}.csv'
+        df.to_csv(catalog)
+        current = f'{DIRECTORY}/generation-{generation}'
+        _, diff = create_incremental(current, catalog, previous, **settings)
+        diffs.append(diff)
+        snapshots.append(load_snapshot(current).loc['3', 'a'])
+        run_survey(current)
+        previous = current
+
+    # the carried asteroid keeps the elements of its result, so the second refresh is a change
+    assert '3' in diffs[0].unchanged and snapshots[0] == original
+    assert diffs[1].changed == ['3'] and snapshots[1] == pytest.approx(original + 1.8e-4)
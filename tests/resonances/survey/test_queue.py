@@ -0,0 +1,64 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from resonances.__main__ import main
+from resonances.survey import Manifest, WorkQueue, work
+from tests.tools import SIMULATION
+
+DIRECTORY = 'cache/tests/survey-queue'
+
+
+@pytest.fixture(autouse=True)
+def manifest(directory):
+    return Manifest.create(directory, 'tests/fixtures/small.csv', chunk_size=2, resonances=['4J-2S-1'], simulation=SIMULATION)
+
+
+def expire(queue, index, worker):
+    past = time.time() - 1000
+    os.utime(queue.lease_path(index, worker), (past, past))
+
+
+def test_leases():
+    queue = WorkQueue.create(DIRECTORY, lease_timeout=10)
+    assert queue.waiting() == [0, 1, 2, 3, 4]
+    assert queue.acquire('first') == 0
+    assert queue.acquire('second') == 1
+    assert [(index, worker) for index, worker, _ in queue.leases()] == [(0, 'first'), (1, 'second')]
+
+    expire(queue, 0, 'first')
+    assert queue.status()['expired'] == 1
+    assert queue.reclaim() == [0]
+    assert not queue.heartbeat(0, 'first')
+    assert queue.heartbeat(1, 'second')
+    assert queue.waiting() == [0, 2, 3, 4]
+
+    # a new queue of the same survey keeps the leased chunks out
+    assert WorkQueue.create(DIRECTORY).waiting() == [0, 2, 3, 4]
+
+
+def _work(name):
+    work(DIRECTORY, worker=name, lease_timeout=30, heartbeat=0.2, poll=0.1)
+
+
+def test_workers():
+    queue = WorkQueue.create(DIRECTORY, lease_timeout=30)
+    # the chunk of a dead worker is taken back
+    assert queue.acquire('dead') == 0
+    expire(queue, 0, 'dead')
+
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_work, args=(f'worker{i}',)) for i in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=120)
+        assert process.exitcode == 0
+
+    assert queue.waiting() == [] and queue.leases() == []
+    assert Manifest.load(DIRECTORY).pending() == []
+    assert main(['status', DIRECTORY, '--merge']) == 0
+    assert len(Manifest.load(DIRECTORY).summary()) == 10
+    assert os.path.exists(f'{DIRECTORY}/summary.csv')
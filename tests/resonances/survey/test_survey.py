@@ -0,0 +1,82 @@
+from unittest.mock import patch
+
+import pytest
+
+import resonances
+from resonances.__main__ import main
+from resonances.survey import Manifest, run_chunk, run_survey
+from resonances.survey.manifest import read_catalog
+from resonances.survey import runner
+from tests.tools import SIMULATION
+
+DIRECTORY = 'cache/tests/survey'
+
+
+def create_manifest(**settings):
+    settings = {'resonances': ['4J-2S-1'], 'simulation': SIMULATION, **settings}
+    return Manifest.create(DIRECTORY, 'tests/fixtures/small.csv', chunk_size=4, **settings)
+
+
+def test_manifest():
+    manifest = create_manifest()
+    assert manifest.chunks == [['1', '2', '3', '4'], ['5', '6', '7', '8'], ['9', '10']]
+    assert manifest.pending() == [0, 1, 2]
+
+    # the same settings resume the survey, other settings are an error
+    assert create_manifest().chunks == manifest.chunks
+    with pytest.raises(ValueError, match='other settings'):
+        create_manifest(sigma2=0.2)
+
+
+def test_survey_resumes():
+    create_manifest()
+    record = run_chunk(DIRECTORY, 1)
+    assert record['bodies'] == 4 and record['rows'] == 4
+    assert Manifest.load(DIRECTORY).pending() == [0, 2]
+
+    with patch.object(runner, 'run_chunk', side_effect=runner.run_chunk) as run:
+        summary = run_survey(DIRECTORY)
+    assert [call.args[1] for call in run.call_args_list] == [0, 2]
+    assert summary['name'].tolist() == [str(i) for i in range(1, 11)]
+    assert set(summary['resonance']) == {'4J-2S-1+0+0-1'}
+    assert Manifest.load(DIRECTORY).pending() == []
+
+
+def test_survey_finds_resonances():
+    manifest = create_manifest(resonances=None, planets=['Jupiter'], sigma2=0.05)
+    sim = runner.create_chunk_simulation(manifest, 0)
+    for body in sim.bodies:
+        for mmr in body.mmrs:
+            assert abs(mmr.resonant_axis - body.initial_data['a']) <= 0.05
+            assert mmr.planets_names == ['Jupiter']
+
+    # the resonances of the whole chunk are found at once, as find_mmrs finds them for every asteroid
+    catalog = read_catalog(manifest.catalog)
+    found = manifest.resonances_of(catalog)
+    for a, mmrs in zip(catalog['a'], found):
+        assert mmrs == resonances.find_mmrs(a, planets=['Jupiter'], sigma2=0.05, sigma3=manifest.sigma3)
+    assert manifest.resonance_counts(catalog) == [len(mmrs) for mmrs in found]
+
+
+def test_cli():
+    args = ['survey', 'tests/fixtures/small.csv', '-o', DIRECTORY, '-r', '4J-2S-1', '-r', '3J-1', '--chunk-size', '5', '-w', '2']
+    args += [
+        '--date',
+        '2023-02-25',
+        '--tmax',
+        '20',
+        '--dt',
+        '1',
+        '--Nout',
+        '10',
+        '--integrator',
+        'whfast',
+        '--set',
+        'integrator_corrector=null',
+    ]
+    args += ['--set', 'libration_period_min=1']
+    assert main(args) == 0
+    manifest = Manifest.load(DIRECTORY)
+    assert manifest.simulation['integrator_corrector'] is None
+    assert manifest.resonances == ['4J-2S-1', '3J-1']
+    assert len(manifest.summary()) == 20
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+import resonances
+
+HEAVY = ['pandas', 'matplotlib', 'astropy', 'astroquery', 'scipy', 'astdys', 'sqlite3']
+
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import resonances
+seconds = time.perf_counter() - start
+sim = resonances.Simulation(date='2023-02-25', tmax=20, dt=1, integrator='whfast', save=None, plot=None)
+sim.add_body({'a': 2.77, 'e': 0.07, 'inc': 0.18, 'Omega': 1.4, 'omega': 1.28, 'M': 3.58}, '4J-2S-1', name='x')
+print(json.dumps({'seconds': seconds, 'modules': sorted(sys.modules)}))
+"""
+
+
+def run_script(tmp_path):
+    env = {**os.environ, 'LOG_FILE': str(tmp_path / 'logs' / 'resonances.log')}
+    output = subprocess.run([sys.executable, '-c', SCRIPT], env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_import_is_lazy(tmp_path):
+    result = run_script(tmp_path)
+    loaded = [name for name in HEAVY if name in result['modules']]
+    assert loaded == []
+    # the log file (and its directory) is created by the first message, not by the import
+    assert not (tmp_path / 'logs').exists()
+    # it takes seconds with the plots, Horizons and the periodograms imported
+    assert result['seconds'] < 1.5
+
+
+def test_lazy_attributes():
+    assert resonances.results.ResultsCatalog is not None
+    assert resonances.resonance.plot.body is not None
+    assert resonances.ThreeBodyMatrix.__name__ == 'ThreeBodyMatrix'
+    from resonances import TwoBodyMatrix
+
+    assert TwoBodyMatrix is resonances.TwoBodyMatrix
@@ -0,0 +1,140 @@
+import base64
+import json
+import re
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import resonances
+from resonances.report import SurveyReport, encode_series, from_directory
+import tests.tools as tools
+
+REPORT_PATH = 'cache/tests/report'
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    Path(REPORT_PATH).mkdir(parents=True, exist_ok=True)
+    yield
+    shutil.rmtree(REPORT_PATH)
+
+
+def decode_cells(series, columns, rows):
+    """Set of occupied (column, row) cells, the same way as the browser draws them."""
+    if 'runs' in series:
+        runs = np.frombuffer(base64.b64decode(series['runs']), dtype=np.uint8).reshape(-1, 3)
+        return {(int(c), r) for c, first, last in runs for r in range(first, last + 1)}
+    bits = np.unpackbits(np.frombuffer(base64.b64decode(series['bits']), dtype=np.uint8))[: columns * rows]
+    return {(int(i) // rows, int(i) % rows) for i in np.flatnonzero(bits)}
+
+
+def expected_cells(y, columns, rows):
+    column = np.arange(len(y)) * columns // len(y)
+    row = np.minimum(((y - y.min()) / (y.max() - y.min()) * rows).astype(int), rows - 1)
+    return set(zip(column.tolist(), row.tolist()))
+
+
+def report_payload(filename):
+    with open(filename) as f:
+        content = f.read()
+    return json.loads(re.search(r'<script type="application/json" id="data">(.*?)</script>', content, re.S).group(1))
+
+
+def create_summary(names, statuses):
+    return pd.DataFrame(
+        {
+            'name': names,
+            'resonance': '4J-2S-1+0+0-1',
+            'type': 'MMR',
+            'status': statuses,
+            'pure': True,
+            'num_libration_periods': 1,
+            'max_libration_length': 1000.0,
+            'monotony': 0.5,
+            'a': 2.4,
+            'e': 0.1,
+            'inc': 0.1,
+        }
+    )
+
+
+class TestEncodeSeries:
+    def test_curve_as_runs(self):
+        y = np.sin(np.linspace(0, 10, 5000))
+        series = encode_series(y, 200, 48)
+        assert 'runs' in series
+        assert series['min'] == y.min() and series['max'] == y.max()
+        assert decode_cells(series, 200, 48) == expected_cells(y, 200, 48)
+
+    def test_scatter_as_bits(self):
+        y = np.random.default_rng(0).random(5000)
+        series = encode_series(y, 100, 20)
+        assert 'bits' in series
+        assert decode_cells(series, 100, 20) == expected_cells(y, 100, 20)
+
+    def test_no_data(self):
+        assert encode_series(None) is None
+        assert encode_series(np.array([np.nan, np.nan])) is None
+        assert encode_series(np.ones(10), 10, 5)['min'] == 1.0
+
+    def test_grid_limit(self):
+        with pytest.raises(ValueError):
+            encode_series(np.ones(10), 300, 10)
+
+
+def test_report_html():
+    report = SurveyReport('Test </script> survey')
+    report.add_summary(create_summary(['1', '2</script>'], [1, -2]))
+    times = np.linspace(0, 1000, 500)
+    report.add_series('1', '4J-2S-1+0+0-1', times, np.mod(times / 30, 2 * np.pi), 2.4 + np.sin(times) * 1e-3, None)
+    filename = report.write(f'{REPORT_PATH}/report.html')
+
+    with open(filename) as f:
+        content = f.read()
+    assert '<title>Test &lt;/script&gt; survey</title>' in content
+    assert content.count('</script>') == 2
+
+    payload = report_payload(filename)
+    assert payload['columns'][:4] == ['name', 'resonance', 'type', 'status']
+    assert len(payload['rows']) == 2
+    assert payload['rows'][0][-1] == 0
+    assert payload['rows'][1][-1] == -1
+    assert payload['rows'][1][0] == '2</script>'
+    assert payload['charts'][0]['t'] == [0.0, 1000.0]
+    assert payload['charts'][0]['ecc'] is None
+
+
+def test_from_directory():
+    sim = tools.create_test_simulation_for_solar_system(save='all', save_summary=True)
+    sim.config.save_path = REPORT_PATH
+    sim.config.plot = None
+    tools.add_test_asteroid_to_simulation(sim)
+    sim.run()
+
+    filename = from_directory(REPORT_PATH)
+    assert filename == f'{REPORT_PATH}/report.html'
+    payload = report_payload(filename)
+    assert len(payload['rows']) == 1
+    assert len(payload['charts']) == 1
+    assert payload['charts'][0]['angle'] is not None
+
+    with pytest.raises(FileNotFoundError):
+        from_directory('cache/tests/report/missing')
+
+
+def test_data_manager_report():
+    sim = tools.create_test_simulation_for_solar_system(save=None, plot='all')
+    sim.config.plot_type = 'report'
+    sim.config.plot_path = REPORT_PATH
+    sim.add_body(tools.get_3body_elements_sample(), resonances.ThreeBody('4J-2S-1'))
+    sim.add_body(tools.get_2body_elements_sample(), resonances.TwoBody('1J-1'))
+    sim.run()
+
+    assert list(Path(REPORT_PATH).glob('*.png')) == []
+    payload = report_payload(f'{REPORT_PATH}/report.html')
+    assert len(payload['rows']) == 2
+    assert len(payload['charts']) == 2
+    assert {row[0] for row in payload['rows']} == {body.name for body in sim.bodies}
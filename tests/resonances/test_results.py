@@ -0,0 +1,94 @@
+import pytest
+import shutil
+from pathlib import Path
+from multiprocessing import Pool
+
+import resonances
+from resonances.results import ResultsCatalog
+from resonances.simulation import SimulationConfig, DataManager
+import tests.tools as tools
+
+DB_FILE = 'cache/tests/results/results-test.sqlite'
+
+
+@pytest.fixture(autouse=True)
+def run_around_tests():
+    Path('cache/tests/results').mkdir(parents=True, exist_ok=True)
+    yield
+    shutil.rmtree('cache/tests/results')
+
+
+def create_summary(names, statuses, resonance='4J-2S-1'):
+    data_manager = DataManager(SimulationConfig())
+    bodies = []
+    for name, status in zip(names, statuses):
+        body = resonances.Body()
+        body.name = name
+        body.initial_data = tools.get_3body_elements_sample()
+        body.mmrs = [resonances.create_mmr(resonance)]
+        body.statuses[body.mmrs[0].to_s()] = status
+        bodies.append(body)
+    return data_manager.get_simulation_summary(bodies)
+
+
+def _write_run(i):
+    catalog = ResultsCatalog(DB_FILE)
+    run_id = catalog.add_run(SimulationConfig(name=f'run{i}'))
+    catalog.add_results(run_id, create_summary([f'{i}-{j}' for j in range(50)], [2] * 50), batch_size=10)
+    return run_id
+
+
+def test_add_and_query():
+    catalog = ResultsCatalog(DB_FILE)
+    run1 = catalog.add_run(SimulationConfig(name='run1'))
+    catalog.add_results(run1, create_summary(['463', '490', '1'], [2, 0, -1]))
+    run2 = catalog.add_run(SimulationConfig(name='run2'))
+    catalog.add_results(run2, create_summary(['463'], [1]))
+    catalog.add_results(run2, create_summary(['624'], [2], resonance='1J-1'))
+
+    df = catalog.query()
+    assert len(df) == 5
+    assert {'run_id', 'run_name', 'name', 'resonance', 'status', 'a'}.issubset(df.columns)
+
+    df = catalog.query(resonance='4J-2S-1', min_status=1)
+    assert sorted(df['status'].tolist()) == [1, 2]
+    assert set(df['name']) == {'463'}
+    assert set(df['run_name']) == {'run1', 'run2'}
+
+    df = catalog.query(resonance=['4J-2S-1+0+0-1', resonances.create_mmr('1J-1')], status=2)
+    assert sorted(df['name'].tolist()) == ['463', '624']
+
+    assert len(catalog.query(name=463)) == 2
+    assert len(catalog.query(run_id=run2)) == 2
+    assert len(catalog.query(run_name='run1', status=[0, -1])) == 2
+
+    df = resonances.results.query(DB_FILE, resonance='1J-1')
+    assert len(df) == 1
+    assert not df.iloc[0]['pure']
+
+
+def test_wal_mode():
+    catalog = ResultsCatalog(DB_FILE)
+    conn = catalog._connect()
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    conn.close()
+
+
+def test_concurrent_writers():
+    ResultsCatalog(DB_FILE)
+    with Pool(4) as pool:
+        run_ids = pool.map(_write_run, range(4))
+
+    df = ResultsCatalog(DB_FILE).query()
+    assert len(set(run_ids)) == 4
+    assert len(df) == 200
+
+
+def test_data_manager_sqlite_backend():
+    config = SimulationConfig(summary_backend='sqlite', results_db=DB_FILE, save_path='cache/tests/results/run')
+    data_manager = DataManager(config)
+    df = create_summary(['463'], [2])
+
+    run_id = data_manager.save_summary_to_catalog(df)
+    assert data_manager.save_summary_to_catalog(df) == run_id
+    assert len(resonances.results.query(DB_FILE, run_id=run_id)) == 2
@@ -0,0 +1,123 @@
+import http.client
+import json
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from resonances.service import CheckRequest, CheckService, create_server
+from tests.tools import SIMULATION, get_3body_elements_sample
+
+
+@pytest.fixture
+def service():
+    service = CheckService(SIMULATION, window=0.2).start()
+    yield service
+    service.stop()
+
+
+def test_check(service):
+    response = service.check({'asteroid': get_3body_elements_sample(), 'resonance': ['4J-2S-1', '5J-2S-2']}, timeout=60)
+    assert [result['resonance'] for result in response['results']] == ['4J-2S-1+0+0-1', '5J-2S-2+0+0-1']
+    assert all(result['status'] in (-2, -1, 0, 1, 2) for result in response['results'])
+    assert set(response['latency']) == {'queue', 'elements', 'run', 'total'}
+    assert response['latency']['total'] >= response['latency']['run']
+
+    # without the resonances, the MMRs are found by the semi-major axis
+    response = service.check({'asteroid': get_3body_elements_sample(), 'planets': ['Jupiter', 'Saturn']}, timeout=60)
+    assert '4J-2S-1+0+0-1' in [result['resonance'] for result in response['results']]
+
+    with pytest.raises(ValueError):
+        service.check({'resonance': '4J-2S-1'})
+
+
+def test_concurrent_requests_share_simulation(service):
+    elem = get_3body_elements_sample()
+    requests = [{'asteroid': {**elem, 'a': elem['a'] + 0.001 * i}, 'resonance': '4J-2S-1'} for i in range(4)]
+    with ThreadPoolExecutor(4) as executor:
+        responses = list(executor.map(lambda request: service.check(request, timeout=60), requests))
+    assert [response['batch'] for response in responses] == [4] * 4
+    assert service.health()['batches'] == 1 and service.health()['snapshots'] == 1
+
+    # other settings are another simulation, the snapshot of the Solar System is reused for the same date
+    response = service.check({**requests[0], 'simulation': {'tmax': 30}}, timeout=60)
+    assert response['batch'] == 1
+    assert service.health()['batches'] == 2 and service.health()['snapshots'] == 1
+
+
+def request(connection, method, path, data=None):
+    connection.request(method, path, body=None if data is None else json.dumps(data), headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+class UnixConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+@pytest.mark.parametrize('unix', [False, True])
+def test_http(service, tmp_path, unix):
+    server = create_server(service, port=0, socket_path=str(tmp_path / 'service.sock') if unix else None)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        connection = UnixConnection(server.server_address) if unix else http.client.HTTPConnection(*server.server_address)
+        status, data = request(connection, 'POST', '/check', {'asteroid': get_3body_elements_sample(), 'resonance': '4J-2S-1'})
+        assert status == 200 and data['results'][0]['resonance'] == '4J-2S-1+0+0-1'
+        assert request(connection, 'GET', '/health')[1]['served'] == 1
+        assert request(connection, 'POST', '/check', {})[0] == 400
+        # the paths and the saving cannot be set by a request
+        status, data = request(connection, 'POST', '/check', {'asteroid': 463, 'simulation': {'save': 'all', 'save_path': str(tmp_path)}})
+        assert status == 400 and 'save_path' in data['error']
+        # a form (i.e. sent by a web page) is not accepted
+        connection.request('POST', '/check', body='{"asteroid": 463}', headers={'Content-Type': 'text/plain'})
+        response = connection.getresponse()
+        assert response.status == 415
+        response.read()
+        assert request(connection, 'GET', '/unknown')[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_request_settings_are_restricted(service):
+    with pytest.raises(ValueError, match='save_path'):
+        service.submit({'asteroid': 463, 'simulation': {'save': 'all', 'save_path': '/tmp/written', 'save_summary': True}})
+    request = CheckRequest({'asteroid': 463, 'simulation': {'tmax': 30, 'libration_period_min': 2}}, {'save': 'all', 'plot': 'all'})
+    assert request.simulation == {
+        'tmax': 30,
+        'libration_period_min': 2,
+        'save': None,
+        'plot': None,
+        'save_summary': False,
+        'planets_cache': False,
+        'result_cache': False,
+    }
+
+
+def test_caches_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = CheckService(SIMULATION, max_elements=2, max_snapshots=1)
+    # the Solar System is not taken from Horizons
+    with patch('rebound.Simulation.add'):
+        sim = service.create_simulation(service.simulation)
+        service.create_simulation({**service.simulation, 'date': '2020-01-01 00:00'})
+    # a new date replaces the snapshot, and nothing is written to the cache files
+    assert len(service.snapshots) == 1
+    assert list(tmp_path.rglob('*')) == []
+
+    fetched = []
+    with patch.object(sim.body_manager, 'get_body_elements', side_effect=lambda number: fetched.append(number) or {'a': number}):
+        for number in [1, 2, 1, 3, 2]:
+            assert service.get_elements(sim, number) == {'a': number}
+    # 1 is used again before 3 is added, so 2 is the least recently used one
+    assert fetched == [1, 2, 3, 2]
+    assert [key[2] for key in service.elements] == ['3', '2']
@@ -31,6 +31,18 @@ def get_2body_elements_sample():
     }
 
 
+# settings of a short simulation (like create_test_simulation_for_solar_system) for the surveys and the service
+SIMULATION = {
+    'date': '2023-02-25',
+    'tmax': 20,
+    'dt': 1,
+    'Nout': 10,
+    'integrator': 'whfast',
+    'integrator_corrector': None,
+    'libration_period_min': 1,
+}
+
+
 @pytest.fixture(autouse=True)
 def setup_test_config():
     """Setup test configuration before each test and restore after."""